@@ -0,0 +1,28 @@
+# Gunicorn settings for the web tier: `gunicorn -c gunicorn.conf.py src.app:app`.
+#
+# The routes are I/O bound (Redis, the database, SSE streams that stay open),
+# so the default is gevent: each worker process serves WEB_CONNECTIONS
+# connections as greenlets instead of one request per thread. Set
+# WEB_WORKER_CLASS=gthread (or sync) to fall back to threads.
+import os
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', '4'))
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gevent')
+# gevent: concurrent connections per worker; gthread: threads per worker
+worker_connections = int(os.environ.get('WEB_CONNECTIONS', '1000'))
+threads = int(os.environ.get('WEB_THREADS', '16'))
+timeout = int(os.environ.get('WEB_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """Make psycopg2 yield to other greenlets while it waits on Postgres."""
+    if worker_class != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        return
+    patch_psycopg()
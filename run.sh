@@ -4,7 +4,7 @@ set -euo pipefail
 trap 'echo -e "\033[0;31m❌ Error occurred. Exiting...\033[0m"; exit 1' ERR
 
 # Constants
-CONTAINERS=("Speak2Summary-flask" "Speak2Summary-celery" "Speak2Summary-redis")
+CONTAINERS=("Speak2Summary-flask" "Speak2Summary-celery" "Speak2Summary-celery-long" "Speak2Summary-redis")
 COMPOSE_FILE="docker-compose.yml"
 
 log() {
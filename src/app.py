@@ -1,16 +1,17 @@
 # cython: language_level=3
-from src.config import app
+from src.config import app, MIGRATIONS_DIR
 from src.models import db
 from src.routes import audio_bp
-from flask_migrate import Migrate
+from src.search import include_object
+from flask_migrate import Migrate, upgrade
 
 
-migrate = Migrate(app, db)
-
-with app.app_context():
-    db.create_all()
+# the schema is managed by Alembic: `flask --app src.app db upgrade` before serving
+migrate = Migrate(app, db, directory=MIGRATIONS_DIR, render_as_batch=True, include_object=include_object)
 
 app.register_blueprint(audio_bp)
 
 if __name__ == '__main__':
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
     app.run(debug=True, port=5001, host='0.0.0.0')
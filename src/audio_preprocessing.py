@@ -0,0 +1,138 @@
+# cython: language_level=3
+import os
+import subprocess
+from contextlib import contextmanager
+
+import numpy as np
+from transmeet.utils.general_utils import get_logger
+
+from src.config import TRANSCODE_FORMAT, TRANSCODE_SAMPLE_RATE
+
+logger = get_logger(__name__)
+
+# format -> (file extension, ffmpeg output options)
+TRANSCODE_FORMATS = {
+    'flac': ('flac', ['-c:a', 'flac', '-compression_level', '8', '-f', 'flac']),
+    'opus': ('ogg', ['-c:a', 'libopus', '-b:a', '24k', '-application', 'voip', '-f', 'ogg']),
+}
+
+
+def get_transcode_format(name=None):
+    name = name or TRANSCODE_FORMAT
+    if name not in TRANSCODE_FORMATS:
+        raise ValueError(f"Unsupported transcode format: {name}")
+    return TRANSCODE_FORMATS[name]
+
+
+def normalized_audio_path(file_path, fmt=None):
+    """Where the mono 16 kHz copy of an upload is cached: next to the upload itself."""
+    extension = get_transcode_format(fmt)[0]
+    return f"{file_path}.{TRANSCODE_SAMPLE_RATE // 1000}k.{extension}"
+
+
+def transcode_audio(input_path, output_path, fmt=None, sample_rate=TRANSCODE_SAMPLE_RATE):
+    """
+    Stream input_path through ffmpeg into mono audio at sample_rate. Output goes to a
+    temporary name first and is renamed into place, so a concurrent reader never
+    sees a half-written file.
+    """
+    options = get_transcode_format(fmt)[1]
+    partial_path = f"{output_path}.{os.getpid()}.part"
+    command = [
+        "ffmpeg", "-nostdin", "-v", "error", "-y",
+        "-i", input_path,
+        "-vn", "-ac", "1", "-ar", str(sample_rate),
+        *options,
+        partial_path,
+    ]
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        error = result.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg could not transcode {input_path}: {error}")
+    os.replace(partial_path, output_path)
+    return output_path
+
+
+def normalize_audio_file(file_path, fmt=None):
+    """
+    Cached mono 16 kHz copy of an upload for transcription. Deduplicated uploads
+    share the stored file, so they share this artifact as well.
+    """
+    output_path = normalized_audio_path(file_path, fmt)
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(file_path):
+        logger.info(f"Using cached normalized audio {output_path}")
+        return output_path
+
+    transcode_audio(file_path, output_path, fmt)
+    logger.info(
+        f"Transcoded {file_path} ({os.path.getsize(file_path) / (1024 * 1024):.1f} MB) "
+        f"to {output_path} ({os.path.getsize(output_path) / (1024 * 1024):.1f} MB)"
+    )
+    return output_path
+
+
+def remove_normalized_audio(file_path):
+    """Delete every cached normalized copy of an upload."""
+    for fmt in TRANSCODE_FORMATS:
+        path = normalized_audio_path(file_path, fmt)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def probe_duration(file_path):
+    """Duration of a media file in seconds from its container header, or None if ffprobe can't tell."""
+    command = [
+        "ffprobe", "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1",
+        file_path,
+    ]
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=30)
+        return float(result.stdout.decode().strip())
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None
+
+
+def open_pcm_stream(input_path, sample_rate):
+    """Decode any ffmpeg-readable file to mono 16-bit PCM on a pipe, never fully in memory."""
+    return subprocess.Popen(
+        [
+            "ffmpeg", "-nostdin", "-v", "error",
+            "-i", input_path,
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate),
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def read_pcm_blocks(stream, block_samples):
+    """Yield int16 sample arrays of block_samples (the last one may be shorter)."""
+    block_bytes = block_samples * 2
+    while True:
+        data = stream.read(block_bytes)
+        if not data:
+            return
+        if len(data) % 2:
+            # a pipe may split a sample across reads
+            data += stream.read(1)
+        yield np.frombuffer(data, dtype="<i2")
+
+
+@contextmanager
+def pcm_blocks(input_path, sample_rate, block_samples):
+    """Blocks of mono int16 samples decoded from input_path; raises if ffmpeg fails."""
+    process = open_pcm_stream(input_path, sample_rate)
+    try:
+        yield read_pcm_blocks(process.stdout, block_samples)
+    finally:
+        process.stdout.close() #type: ignore
+        error = process.stderr.read().decode("utf-8", "replace").strip() #type: ignore
+        process.stderr.close() #type: ignore
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode {input_path}: {error}")
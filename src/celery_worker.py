@@ -1,13 +1,70 @@
 # cython: language_level=3
+import os
+import time
+import uuid
 import traceback
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from celery import Celery
-from transmeet import transcribe_audio_file
+from celery import Celery, chord
+from celery.signals import worker_ready, worker_process_init, before_task_publish
 from transmeet.utils.general_utils import get_logger
 
-from src.config import app, REDIS_URI, redis_client
-from src.models import db, TranscriptEntry
+from src.config import (
+    app,
+    REDIS_URI,
+    redis_client,
+    PARALLEL_CHUNKS,
+    TRANSCRIPTION_MAX_WORKERS,
+    TRANSCODE,
+    VAD,
+    NOISE_REDUCTION,
+    JOB_LOCK_TTL_SECONDS,
+    RERENDER_BATCH_SIZE,
+    LONG_AUDIO_SECONDS,
+    QUEUE_SHORT,
+    QUEUE_LONG,
+    QUEUE_LLM,
+    RATE_LIMIT_RETRY_MAX,
+    VISIBILITY_TIMEOUT,
+    HEARTBEAT_TTL,
+    JOB_RESULT_TTL,
+    UPLOAD_SWEEP_INTERVAL,
+)
+from src.audio_preprocessing import normalize_audio_file, probe_duration
+from src.checkpoints import (
+    run_token,
+    claim_run,
+    heartbeat,
+    heartbeat_key,
+    touch_heartbeat,
+    is_alive,
+    load_checkpoint,
+    start_checkpoint,
+    save_chunk,
+    get_chunk,
+    clear_checkpoint,
+)
+from src.dedup import file_digest, find_cached_transcripts, load_transcript_artifacts
+from src.events import publish_file_event
+from src.extractors import extract_text
+from src.noise_reduction import denoise_audio_file
+from src.metrics import timed, record_queue_wait, job_stage_timings, clear_stage_timings, size_label
+from src.models import db, TranscriptEntry, Artifact
+from src.rate_limit import is_rate_limit_error, provider_error, backoff_seconds
+from src.transcription import (
+    get_chunk_size_mb,
+    split_audio_file,
+    remove_chunks,
+    transcribe_chunk_file,
+)
+from src.render_cache import store_rendered_minutes
+from src.search import index_entry, copy_entry_document
+from src.status_cache import cache_entries, get_docs
+from src.summarizer import generate_minutes, generate_mind_map, condense_transcript, normalize_transcript
+from src.vad import trim_silence
+from src.upload_sessions import sweep_expired_sessions
+from src.utils import RENDERER_VERSION
 
 logger = get_logger(__name__)
 
@@ -21,8 +78,58 @@ celery.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    task_track_started=True,
+    # short recordings, long recordings and LLM-only work each have a queue, so a
+    # 4-hour upload never sits in front of a standup; see audio_queue()
+    task_default_queue=QUEUE_SHORT,
+    # a worker holds no more tasks than it is running, so long jobs don't hoard short ones
+    worker_prefetch_multiplier=1,
+    # acknowledge a task only once it has run, and requeue it if its worker dies,
+    # so a restart re-runs the job instead of losing it; the tasks are idempotent
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    broker_transport_options={'visibility_timeout': VISIBILITY_TIMEOUT},
+    # results live as long as the job ids handed out for them (see issued_job_file)
+    result_expires=JOB_RESULT_TTL,
 )
 
+# bytes per second of a typical compressed recording (128 kbps), for when ffprobe can't tell
+FALLBACK_AUDIO_BYTES_PER_SECOND = 16000
+
+def queue_for_duration(seconds):
+    return QUEUE_LONG if seconds >= LONG_AUDIO_SECONDS else QUEUE_SHORT
+
+def estimated_audio_queue(file_path):
+    """
+    The queue for a recording judged by its size alone, for the upload request:
+    no ffprobe subprocess per file. The worker probes and re-routes if it guessed wrong.
+    """
+    return queue_for_duration(os.path.getsize(file_path) / FALLBACK_AUDIO_BYTES_PER_SECOND)
+
+def audio_queue(file_path):
+    """The queue a recording is transcribed on: 'long' from LONG_AUDIO_MINUTES up, else 'short'."""
+    duration = probe_duration(file_path)
+    if duration is None:
+        return estimated_audio_queue(file_path)
+    return queue_for_duration(duration)
+
+def current_queue(task):
+    """Queue the running task was delivered from, so its follow-up work stays on it."""
+    return (task.request.delivery_info or {}).get('routing_key') or QUEUE_SHORT
+
+def should_retry(task, error):
+    """A provider rate limit the task still has retries left for."""
+    return is_rate_limit_error(error) and task.request.retries < RATE_LIMIT_RETRY_MAX
+
+def retry_later(task, file_id, error):
+    """Put the task back on its queue with exponential backoff; raise the result."""
+    countdown = backoff_seconds(task.request.retries, error)
+    logger.warning(
+        f"Rate limited while processing file {file_id}, retry "
+        f"{task.request.retries + 1}/{RATE_LIMIT_RETRY_MAX} in {countdown:.0f}s: {error}"
+    )
+    return task.retry(countdown=countdown, max_retries=RATE_LIMIT_RETRY_MAX, queue=current_queue(task))
+
 # Reusable functions to handle progress and file updates
 def update_file_status(file_id, status, error_message=None):
     """Update file record status in the database."""
@@ -32,125 +139,743 @@ def update_file_status(file_id, status, error_message=None):
         if error_message:
             file_record.error_message = error_message
         db.session.commit()
+        cache_entries([file_record])
+        publish_file_event(file_id, status=status)
 
 def update_progress(file_id, progress_value):
     """Update the progress of a file processing task in Redis."""
     redis_client.set(f"file:{file_id}:progress", progress_value)
+    publish_file_event(file_id, progress=progress_value)
+
+def record_speech_stats(file_id, stats):
+    """Store the silence trimming results (speech ratio, saved seconds, offset map)."""
+    file_record = TranscriptEntry.query.get(file_id)
+    if file_record:
+        file_record.speech_ratio = stats['speech_ratio']
+        file_record.silence_seconds_saved = stats['silence_seconds_saved']
+        file_record.speech_segments = stats['speech_segments']
+        db.session.commit()
+
+
+def complete_transcription(file_id, transcript):
+    """Store the transcript of a file and mark it as completed."""
+    file_record = TranscriptEntry.query.get(file_id)
+    if not file_record:
+        return
+    update_progress(file_id, 90)
+    file_record.transcript = transcript
+    file_record.minutes = None
+    file_record.status = 'completed'
+    file_record.completion_time = datetime.utcnow()
+    file_record.mind_map = None
+    # the commit's own time reaches the entry with the next stage stored (minutes, mind map)
+    file_record.stage_timings = job_stage_timings(file_id, clear=True)
+    index_entry(file_record)
+    with timed('db_commit', file_id):
+        db.session.commit()
+    cache_entries([file_record])
+    publish_file_event(file_id, status='completed')
+
+    update_progress(file_id, 100)
+
+def complete_from_duplicate(file_record):
+    """
+    Hash an upload that was queued without a content hash (a resumable upload)
+    and, if the same audio was already transcribed with the same model, complete
+    the entry with that transcript. Returns whether it was completed.
+    """
+    file_record.content_hash = file_digest(file_record.file_path)
+    cached_entry = find_cached_transcripts(
+        [file_record.content_hash], file_record.transcription_client, file_record.transcription_model
+    ).get(file_record.content_hash)
+    transcripts = load_transcript_artifacts([cached_entry]) if cached_entry else {}
+    if not cached_entry or cached_entry.id not in transcripts:
+        db.session.commit()
+        return False
+
+    # same as a duplicate caught at upload: reuse the transcript and keep one copy on disk
+    upload_path = file_record.file_path
+    file_record.file_path = cached_entry.file_path
+    file_record.status = 'completed'
+    file_record.completion_time = datetime.utcnow()
+    file_record.transcript_available = True
+    file_record.artifacts['transcript'] = transcripts[cached_entry.id].copy()
+    copy_entry_document(cached_entry.id, file_record.id, 'transcript')
+    db.session.commit()
+    cache_entries([file_record])
+    publish_file_event(file_record.id, status='completed')
+    if upload_path != cached_entry.file_path and os.path.exists(upload_path):
+        os.remove(upload_path)
+    return True
+
+def dispatch_chunked_transcription(file_id, file_path, transcription_client, transcription_model,
+                                   queue=QUEUE_SHORT, size=None):
+    """Split the audio up front and fan the chunks out as a chord of celery tasks on queue."""
+    with timed('split', file_id, size=size):
+        chunk_paths = split_audio_file(file_id, file_path, get_chunk_size_mb(transcription_client))
+    done = load_checkpoint(file_id, len(chunk_paths))
+    start_checkpoint(file_id, len(chunk_paths))
+
+    redis_client.set(f"file:{file_id}:chunks_total", len(chunk_paths))
+    redis_client.set(f"file:{file_id}:chunks_done", len(done))
+    update_progress(file_id, 25)
+    # the chunk tasks keep the file marked as alive from here on
+    touch_heartbeat(file_id, JOB_LOCK_TTL_SECONDS)
+
+    header = [
+        transcribe_chunk.s(file_id, idx, chunk_path, transcription_client, transcription_model, size=size).set(queue=queue) #type: ignore
+        for idx, chunk_path in enumerate(chunk_paths)
+    ]
+    callback = finalize_chunked_transcription.s(file_id).set(queue=queue) #type: ignore
+    # a failed chunk means the callback never runs; the error callback cleans up instead
+    callback.on_error(chunked_transcription_failed.s(file_id).set(queue=queue)) #type: ignore
+    chord(header)(callback)
+    return len(chunk_paths)
+
+def transcribe_chunk_timed(file_id, chunk_path, transcription_client, transcription_model, size=None):
+    with timed('transcription_chunk', file_id, transcription_model, size):
+        return transcribe_chunk_file(chunk_path, transcription_client, transcription_model)
+
+def transcribe_chunks_checkpointed(file_id, file_path, transcription_client, transcription_model, size=None):
+    """
+    Transcribe the chunks of a file, TRANSCRIPTION_MAX_WORKERS at a time,
+    checkpointing each transcript in Redis as it arrives, so a job that is
+    interrupted (or fails on one chunk) resumes with only the missing chunks.
+    """
+    with timed('split', file_id, size=size):
+        chunk_paths = split_audio_file(file_id, file_path, get_chunk_size_mb(transcription_client))
+    done = load_checkpoint(file_id, len(chunk_paths))
+    if done:
+        logger.info(f"Resuming file {file_id}: {len(done)} of {len(chunk_paths)} chunk(s) already transcribed")
+    start_checkpoint(file_id, len(chunk_paths))
+
+    texts = dict(done)
+    error = None
+    with ThreadPoolExecutor(max_workers=TRANSCRIPTION_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(transcribe_chunk_timed, file_id, chunk_path, transcription_client, transcription_model, size): idx
+            for idx, chunk_path in enumerate(chunk_paths) if idx not in done
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                texts[idx] = future.result()
+            except Exception as e:
+                if error is None:
+                    # stop sending new chunks; the ones in flight still finish and are kept
+                    error = e
+                    for pending in futures:
+                        pending.cancel()
+                continue
+            save_chunk(file_id, idx, texts[idx])
+            update_progress(file_id, 25 + int(65 * len(texts) / len(chunk_paths)))
+    if error is not None:
+        raise error
+    return " ".join(texts[idx] for idx in range(len(chunk_paths))).strip()
+
+def job_lock_key(kind, file_id):
+    return f"file:{file_id}:job:{kind}"
+
+def issued_job_key(job_id):
+    return f"job:{job_id}:file"
+
+def issued_job_file(job_id):
+    """The file a job id was issued for, or None for ids this app never issued (or that expired)."""
+    file_id = redis_client.get(issued_job_key(job_id))
+    return file_id.decode('utf-8') if file_id is not None else None #type: ignore
+
+def enqueue_file_job(task, kind, file_id, *args):
+    """
+    Queue a per-file job unless one of the same kind is already pending.
+    Returns (job_id, created); concurrent callers all get the first job's id.
+    """
+    job_id = str(uuid.uuid4())
+    if redis_client.set(job_lock_key(kind, file_id), job_id, nx=True, ex=JOB_LOCK_TTL_SECONDS):
+        # recorded before publishing, so a poll can never see an id it does not know
+        redis_client.set(issued_job_key(job_id), file_id, ex=JOB_RESULT_TTL)
+        task.apply_async(args=(file_id, *args), task_id=job_id)
+        return job_id, True
+
+    existing = redis_client.get(job_lock_key(kind, file_id))
+    if existing is None:
+        # the running job finished between our SET and GET; try again
+        return enqueue_file_job(task, kind, file_id, *args)
+    return existing.decode('utf-8'), False #type: ignore
+
+def release_file_job(kind, file_id):
+    redis_client.delete(job_lock_key(kind, file_id))
 
 @celery.task(bind=True)
 def process_audio_file(self, file_id, file_path, transcription_client, transcription_model):
-    """Process audio file and generate transcript and minutes."""
+    """
+    Process audio file and generate transcript and minutes. Safe to run again
+    for the same file: a finished file is skipped, a copy of a job that is still
+    running elsewhere backs off, and a rerun resumes from the checkpointed chunks.
+    """
+    with app.app_context():
+        # Retrieve the file record and update its status to 'processing'
+        file_record = TranscriptEntry.query.get(file_id)
+        if not file_record:
+            return {'error': 'File record not found'}
+        if file_record.status == 'completed':
+            return {'status': 'skipped', 'file_id': file_id, 'message': 'Already completed'}
+
+        # the upload only guessed the queue from the file size; the duration decides
+        if not self.request.is_eager and os.path.exists(file_path):
+            queue = audio_queue(file_path)
+            if queue != current_queue(self):
+                self.apply_async(args=(file_id, file_path, transcription_client, transcription_model), queue=queue)
+                return {'status': 'rerouted', 'file_id': file_id, 'queue': queue}
+
+        token = run_token(self.request.id)
+        if not claim_run(file_id, token):
+            logger.info(f"File {file_id} is being processed by another worker, skipping this delivery")
+            return {'status': 'skipped', 'file_id': file_id, 'message': 'Already running'}
+        # stages timed by an earlier attempt are not part of this run
+        clear_stage_timings(file_id)
+
+        with heartbeat(file_id, token):
+            try:
+                logger.info(f"Processing file: {file_record.filename}")
+                size = size_label(os.path.getsize(file_path)) if os.path.exists(file_path) else None
+                record_queue_wait(self, file_id, transcription_model, size)
+                if file_record.content_hash is None and os.path.exists(file_path):
+                    with timed('hash', file_id, size=size):
+                        deduplicated = complete_from_duplicate(file_record)
+                    if deduplicated:
+                        return {'status': 'deduplicated', 'file_id': file_id}
+                update_file_status(file_id, 'processing')
+                update_progress(file_id, 5)
+
+                # progress: preprocessing up to 25, then by transcribed chunk up to 90
+                if TRANSCODE:
+                    # mono 16 kHz is all speech needs and is several times fewer provider chunks
+                    with timed('transcode', file_id, size=size):
+                        file_path = normalize_audio_file(file_path)
+                    update_progress(file_id, 10)
+
+                if VAD:
+                    with timed('vad', file_id, size=size):
+                        file_path, speech_stats = trim_silence(file_id, file_path)
+                    record_speech_stats(file_id, speech_stats)
+                    update_progress(file_id, 15)
+
+                if NOISE_REDUCTION:
+                    # the denoised copy lives in the chunk directory and goes away with it
+                    with timed('noise_reduction', file_id, size=size):
+                        file_path = denoise_audio_file(file_id, file_path)
+                    update_progress(file_id, 20)
+
+                if PARALLEL_CHUNKS:
+                    chunk_count = dispatch_chunked_transcription(
+                        file_id, file_path, transcription_client, transcription_model, current_queue(self), size
+                    )
+                    return {
+                        'status': 'dispatched',
+                        'file_id': file_id,
+                        'chunks': chunk_count,
+                    }
+
+                transcript = transcribe_chunks_checkpointed(
+                    file_id, file_path, transcription_client, transcription_model, size
+                )
+                remove_chunks(file_id)
+
+                # Update file record with results and mark as completed
+                complete_transcription(file_id, transcript)
+                clear_checkpoint(file_id)
+
+                return {
+                    'status': 'success',
+                    'file_id': file_id,
+                    'message': 'Processing completed successfully',
+                }
+
+            except Exception as e:
+                if should_retry(self, e):
+                    # back in line instead of failed; finished chunks stay checkpointed for the retry
+                    remove_chunks(file_id)
+                    update_file_status(file_id, 'queued')
+                    raise retry_later(self, file_id, e)
+
+                error_message = str(e)
+                stack_trace = traceback.format_exc()
+                logger.error(f"Error processing file {file_id}: {error_message}\n{stack_trace}")
+
+                # Update file record to 'failed' and store the error
+                update_file_status(file_id, 'failed', f"{error_message}\n\n{stack_trace}")
+
+                # Clear progress in Redis and any preprocessed audio
+                redis_client.delete(f"file:{file_id}:progress")
+                remove_chunks(file_id)
+                clear_checkpoint(file_id)
+
+                return {
+                    'status': 'error',
+                    'file_id': file_id,
+                    'error_message': error_message
+                }
+
+
+@celery.task(bind=True)
+def transcribe_chunk(self, file_id, chunk_index, chunk_path, transcription_client, transcription_model, size=None):
+    """
+    Transcribe one chunk of a chunked transcription and report per-chunk progress.
+    A chunk already checkpointed (by an earlier run of the file) is not sent again.
+    """
     with app.app_context():
+        text = get_chunk(file_id, chunk_index)
+        if text is not None:
+            return {'index': chunk_index, 'text': text}
+
+        # once a sibling chunk failed the file (or it was deleted), don't pay for this one
+        doc, = get_docs([file_id])
+        if doc is None or doc['status'] == 'failed':
+            logger.info(f"Skipping chunk {chunk_index} of file {file_id}: the file is failed or gone")
+            return {'index': chunk_index, 'text': None, 'skipped': True}
+
+        touch_heartbeat(file_id, JOB_LOCK_TTL_SECONDS)
+        record_queue_wait(self, None, transcription_model, size)
         try:
-            # Retrieve the file record and update its status to 'processing'
-            file_record = TranscriptEntry.query.get(file_id)
-            if not file_record:
-                return {'error': 'File record not found'}
-            
-            logger.info(f"Processing file: {file_record.filename}")
-            update_file_status(file_id, 'processing')
-            update_progress(file_id, 20)
-
-            if transcription_client == "groq":
-                audio_chunk_size_mb = 18
-            elif transcription_client == "openai":
-                audio_chunk_size_mb = 24
-            else:
-                audio_chunk_size_mb = 18
-
-            transcript = transcribe_audio_file(
-                file_path,
-                transcription_client,
-                transcription_model,
-                audio_chunk_size_mb=audio_chunk_size_mb
-            )
-            update_progress(file_id, 50)
-            update_progress(file_id, 60)
-
-            # if transcription starts with "Error:", update status and return
-            if transcript.startswith("Error:"):
-                logger.error(f"Transcription error for file {file_id}: {transcript}")
-                error_message = transcript
-                update_file_status(file_id, 'failed', error_message)
-                update_progress(file_id, 0)
-                return {'status': 'error', 'file_id': file_id, 'error_message': error_message}
-
-            update_progress(file_id, 70)
+            with timed('transcription_chunk', file_id, transcription_model, size):
+                text = transcribe_chunk_file(chunk_path, transcription_client, transcription_model)
+        except Exception as e:
+            if should_retry(self, e):
+                raise retry_later(self, file_id, e)
+            stack_trace = traceback.format_exc()
+            logger.error(f"Error transcribing chunk {chunk_index} of file {file_id}: {e}\n{stack_trace}")
+            update_file_status(file_id, 'failed', f"Chunk {chunk_index}: {e}\n\n{stack_trace}")
+            redis_client.delete(f"file:{file_id}:progress", heartbeat_key(file_id))
+            raise
 
-            update_progress(file_id, 80)
-            
-            # Update file record with results and mark as completed
-            update_progress(file_id, 90)
-            file_record.transcript = transcript
-            file_record.minutes = None
-            file_record.status = 'completed'
-            file_record.completion_time = datetime.utcnow()
-            file_record.mind_map = None
-            db.session.commit()
+        save_chunk(file_id, chunk_index, text)
+        done = redis_client.incr(f"file:{file_id}:chunks_done")
+        total = int(redis_client.get(f"file:{file_id}:chunks_total") or 1) #type: ignore
+        update_progress(file_id, 25 + int(65 * min(done, total) / total)) #type: ignore
 
-            update_progress(file_id, 100)
+        return {'index': chunk_index, 'text': text}
 
+
+def cleanup_chunked_transcription(file_id):
+    """Remove the chunk files and the Redis state of a chunked transcription."""
+    remove_chunks(file_id)
+    clear_checkpoint(file_id)
+    redis_client.delete(f"file:{file_id}:chunks_total", f"file:{file_id}:chunks_done", heartbeat_key(file_id))
+
+
+@celery.task(bind=True)
+def finalize_chunked_transcription(self, chunk_results, file_id):
+    """Chord callback: stitch the chunk transcripts back together in order."""
+    with app.app_context():
+        try:
+            if any(result.get('skipped') for result in chunk_results):
+                return {'status': 'error', 'file_id': file_id, 'error_message': 'Chunks were skipped'}
+            ordered = sorted(chunk_results, key=lambda result: result['index'])
+            transcript = " ".join(result['text'] for result in ordered).strip()
+            complete_transcription(file_id, transcript)
             return {
                 'status': 'success',
                 'file_id': file_id,
                 'message': 'Processing completed successfully',
             }
-
         except Exception as e:
             error_message = str(e)
             stack_trace = traceback.format_exc()
-            logger.error(f"Error processing file {file_id}: {error_message}\n{stack_trace}")
-
-            # Update file record to 'failed' and store the error
+            logger.error(f"Error finalizing file {file_id}: {error_message}\n{stack_trace}")
             update_file_status(file_id, 'failed', f"{error_message}\n\n{stack_trace}")
-            
-            # Clear progress in Redis
             redis_client.delete(f"file:{file_id}:progress")
-            
             return {
                 'status': 'error',
                 'file_id': file_id,
                 'error_message': error_message
             }
+        finally:
+            cleanup_chunked_transcription(file_id)
 
 
-@celery.task(bind=True)
+@celery.task
+def chunked_transcription_failed(request, exc, exc_traceback, file_id):
+    """
+    Chord error callback: a chunk task failed, so finalize never runs. Mark the
+    file failed (unless the chunk already did) and remove its chunks and checkpoint.
+    """
+    with app.app_context():
+        logger.error(f"Chunked transcription of file {file_id} failed in task {request.id}: {exc}")
+        file_record = TranscriptEntry.query.get(file_id)
+        if file_record and file_record.status != 'failed':
+            update_file_status(file_id, 'failed', f"Chunked transcription failed: {exc}")
+        redis_client.delete(f"file:{file_id}:progress")
+        cleanup_chunked_transcription(file_id)
+
+
+def run_generation(stage, file_id, generate, transcript, llm_client, llm_model):
+    """One LLM generation, timed as its own stage; runs on a pool thread, so no database access."""
+    with timed(stage, file_id, llm_model):
+        return generate(transcript, llm_client, llm_model)
+
+@celery.task(bind=True, queue=QUEUE_LLM)
 def process_transcript_file(self, file_id):
-    """Process transcript file and generate meeting minutes."""
+    """
+    Run the text pipeline of a pasted or uploaded transcript: extract, normalize,
+    generate the minutes and the mind map side by side, render and index. A rerun
+    (a retry, a recovered job) only generates what the entry is still missing.
+    """
     with app.app_context():
+        # Retrieve the file record and update its status to 'processing'
+        file_record = TranscriptEntry.query.get(file_id)
+        if not file_record:
+            return {'error': 'File record not found'}
+        if file_record.status == 'completed':
+            return {'status': 'skipped', 'file_id': file_id, 'message': 'Already completed'}
+
+        token = run_token(self.request.id)
+        if not claim_run(file_id, token):
+            logger.info(f"File {file_id} is being processed by another worker, skipping this delivery")
+            return {'status': 'skipped', 'file_id': file_id, 'message': 'Already running'}
+        # stages timed by an earlier attempt are not part of this run
+        clear_stage_timings(file_id)
+
+        with heartbeat(file_id, token):
+            try:
+                llm_client, llm_model = file_record.llm_client, file_record.llm_model
+                record_queue_wait(self, file_id, llm_model)
+                update_file_status(file_id, 'processing')
+
+                # uploaded transcript files arrive as files; extract their text here, not in the web tier
+                if file_record.transcript_available:
+                    transcript = file_record.transcript
+                else:
+                    with timed('extract_text', file_id):
+                        transcript = extract_text(file_record.file_path)
+                update_progress(file_id, 10)
+
+                with timed('normalize', file_id):
+                    normalized = normalize_transcript(transcript)
+                if not normalized:
+                    raise ValueError("No text found in the transcript")
+                if normalized != transcript or not file_record.transcript_available:
+                    file_record.transcript = normalized
+                    index_entry(file_record, 'transcript')
+                    db.session.commit()
+                    cache_entries([file_record])
+                update_progress(file_id, 20)
+
+                minutes_markdown = mindmap_data = None
+                if llm_client and llm_model:
+                    # condensed once, so the two reduce prompts share the chunk summaries
+                    with timed('llm_condense', file_id, llm_model):
+                        condensed = condense_transcript(normalized, llm_client, llm_model)
+                    update_progress(file_id, 40)
+
+                    # minutes and mind map at the same time: the job takes as long as the slower one
+                    with ThreadPoolExecutor(max_workers=2) as executor:
+                        minutes_job = mindmap_job = None
+                        if not file_record.minutes_available:
+                            minutes_job = executor.submit(
+                                run_generation, 'llm_minutes', file_id, generate_minutes, condensed, llm_client, llm_model
+                            )
+                        if not file_record.mind_map_available:
+                            mindmap_job = executor.submit(
+                                run_generation, 'llm_mind_map', file_id, generate_mind_map, condensed, llm_client, llm_model
+                            )
+                    update_progress(file_id, 80)
+
+                    minutes_error = mindmap_error = None
+                    if minutes_job:
+                        try:
+                            minutes_markdown = minutes_job.result()
+                            if minutes_markdown.startswith("Error:"):
+                                raise provider_error(minutes_markdown)
+                        except Exception as e:
+                            minutes_markdown, minutes_error = None, e
+                    if mindmap_job:
+                        try:
+                            mindmap_data = mindmap_job.result()
+                            if not isinstance(mindmap_data, dict):
+                                raise provider_error(str(mindmap_data))
+                        except Exception as e:
+                            mindmap_data, mindmap_error = None, e
+
+                    # keep whichever half succeeded, so a retry only redoes the other
+                    if minutes_markdown is not None:
+                        with timed('render', file_id):
+                            store_rendered_minutes(file_record, minutes_markdown)
+                        index_entry(file_record, 'minutes')
+                    if mindmap_data is not None:
+                        file_record.mind_map = mindmap_data
+                    if minutes_markdown is not None or mindmap_data is not None:
+                        # with the half they timed: a retry starts its own timings from zero
+                        file_record.stage_timings = {**(file_record.stage_timings or {}), **job_stage_timings(file_id, clear=True)}
+                        db.session.commit()
+                        cache_entries([file_record])
+                    update_progress(file_id, 90)
+
+                    if minutes_error:
+                        raise minutes_error
+                    if mindmap_error:
+                        if should_retry(self, mindmap_error):
+                            raise mindmap_error
+                        # the minutes are what the entry is for; the mind map can be generated later
+                        logger.warning(f"Mind map generation failed for file {file_id}: {mindmap_error}")
+
+                # Update file record with results and mark as completed
+                file_record.status = 'completed'
+                file_record.completion_time = datetime.utcnow()
+                file_record.stage_timings = {**(file_record.stage_timings or {}), **job_stage_timings(file_id, clear=True)}
+                with timed('db_commit', file_id):
+                    db.session.commit()
+                cache_entries([file_record])
+                publish_file_event(
+                    file_id,
+                    status='completed',
+                    minutes_available=file_record.minutes_available,
+                    mind_map=file_record.mind_map_available,
+                )
+                update_progress(file_id, 100)
+                return {
+                    'status': 'success',
+                    'file_id': file_id,
+                    'message': 'Processing completed successfully',
+                }
+            except Exception as e:
+                db.session.rollback()
+                if should_retry(self, e):
+                    update_file_status(file_id, 'queued')
+                    raise retry_later(self, file_id, e)
+
+                error_message = str(e)
+                stack_trace = traceback.format_exc()
+                logger.error(f"Error processing transcript file {file_id}: {error_message}\n{stack_trace}")
+
+                # Update file record to 'failed' and store the error
+                update_file_status(file_id, 'failed', f"{error_message}\n\n{stack_trace}")
+
+                # Clear progress in Redis
+                redis_client.delete(f"file:{file_id}:progress")
+
+                return {
+                    'status': 'error',
+                    'file_id': file_id,
+                    'error_message': error_message
+                }
+
+
+@celery.task(bind=True, queue=QUEUE_LLM)
+def generate_minutes_task(self, file_id, llm_client, llm_model):
+    """Generate and render meeting minutes for a transcribed file."""
+    with app.app_context():
+        retrying = False
         try:
-            # Retrieve the file record and update its status to 'processing'
             file_record = TranscriptEntry.query.get(file_id)
             if not file_record:
-                return {'error': 'File record not found'}
-
-            update_file_status(file_id, 'processing')
-            update_progress(file_id, 20)
-            
-            # Update file record with results and mark as completed
-            file_record.minutes = None
-            file_record.status = 'completed'
+                return {'status': 'error', 'file_id': file_id, 'error_message': 'File record not found'}
+
+            record_queue_wait(self, file_id, llm_model)
+            update_progress(file_id, 10)
+            with timed('llm_minutes', file_id, llm_model):
+                meeting_minutes_markdown = generate_minutes(file_record.transcript, llm_client, llm_model)
+            if meeting_minutes_markdown.startswith("Error:"):
+                raise provider_error(meeting_minutes_markdown)
+            update_progress(file_id, 80)
+
+            with timed('render', file_id):
+                store_rendered_minutes(file_record, meeting_minutes_markdown)
+            index_entry(file_record, 'minutes')
+            file_record.status = "completed"
             file_record.completion_time = datetime.utcnow()
-            db.session.commit()
-            update_progress(file_id, 100)   
+            file_record.stage_timings = {**(file_record.stage_timings or {}), **job_stage_timings(file_id, clear=True)}
+            with timed('db_commit', file_id):
+                db.session.commit()
+            cache_entries([file_record])
+            publish_file_event(file_id, status='completed', minutes_available=True)
+            update_progress(file_id, 100)
+
             return {
                 'status': 'success',
                 'file_id': file_id,
-                'message': 'Processing completed successfully',
+                'message': 'Meeting minutes generated successfully',
             }
         except Exception as e:
+            if should_retry(self, e):
+                # the job lock stays held, so the retry is still the one pending job
+                retrying = True
+                raise retry_later(self, file_id, e)
             error_message = str(e)
-            stack_trace = traceback.format_exc()
-            logger.error(f"Error processing transcript file {file_id}: {error_message}\n{stack_trace}")
+            logger.error(f"Error generating minutes for file {file_id}: {error_message}\n{traceback.format_exc()}")
+            return {'status': 'error', 'file_id': file_id, 'error_message': error_message}
+        finally:
+            if not retrying:
+                release_file_job('minutes', file_id)
+
+
+@celery.task(bind=True, queue=QUEUE_LLM)
+def generate_mindmap_task(self, file_id, llm_client, llm_model):
+    """Generate the mind map of a transcribed file."""
+    with app.app_context():
+        retrying = False
+        try:
+            file_record = TranscriptEntry.query.get(file_id)
+            if not file_record:
+                return {'status': 'error', 'file_id': file_id, 'error_message': 'File record not found'}
+
+            record_queue_wait(self, file_id, llm_model)
+            update_progress(file_id, 10)
+            with timed('llm_mind_map', file_id, llm_model):
+                mindmap_data = generate_mind_map(file_record.transcript, llm_client, llm_model)
+            if not isinstance(mindmap_data, dict):
+                raise provider_error(str(mindmap_data))
+            update_progress(file_id, 80)
+
+            file_record.mind_map = mindmap_data
+            file_record.status = "completed"
+            file_record.completion_time = datetime.utcnow()
+            file_record.stage_timings = {**(file_record.stage_timings or {}), **job_stage_timings(file_id, clear=True)}
+            with timed('db_commit', file_id):
+                db.session.commit()
+            cache_entries([file_record])
+            publish_file_event(file_id, status='completed', mind_map=True)
+            update_progress(file_id, 100)
 
-            # Update file record to 'failed' and store the error
-            update_file_status(file_id, 'failed', f"{error_message}\n\n{stack_trace}")
-            
-            # Clear progress in Redis
-            redis_client.delete(f"file:{file_id}:progress")
-            
             return {
-                'status': 'error',
+                'status': 'success',
                 'file_id': file_id,
-                'error_message': error_message
-            }
\ No newline at end of file
+                'message': 'Mind map generated successfully',
+            }
+        except Exception as e:
+            if should_retry(self, e):
+                retrying = True
+                raise retry_later(self, file_id, e)
+            error_message = str(e)
+            logger.error(f"Error generating mind map for file {file_id}: {error_message}\n{traceback.format_exc()}")
+            return {'status': 'error', 'file_id': file_id, 'error_message': error_message}
+        finally:
+            if not retrying:
+                release_file_job('mindmap', file_id)
+
+
+@celery.task(bind=True)
+def rerender_minutes(self, file_id):
+    """Refresh the stored minutes HTML of one file if an older renderer produced it."""
+    with app.app_context():
+        try:
+            file_record = TranscriptEntry.query.get(file_id)
+            if file_record and file_record.minutes_raw and file_record.minutes_render_version != RENDERER_VERSION:
+                store_rendered_minutes(file_record, file_record.minutes_raw)
+                db.session.commit()
+        finally:
+            release_file_job('render', file_id)
+
+
+@celery.task(bind=True)
+def rerender_stale_minutes(self):
+    """Re-render, batch by batch, every stored minutes document from an older renderer."""
+    with app.app_context():
+        total = 0
+        while True:
+            batch = TranscriptEntry.query.options(
+                db.selectinload(TranscriptEntry.artifacts).undefer(Artifact.data)
+            ).filter(
+                TranscriptEntry.artifacts.any(Artifact.kind == 'minutes_raw'),
+                db.or_(
+                    TranscriptEntry.minutes_render_version.is_(None),
+                    TranscriptEntry.minutes_render_version != RENDERER_VERSION,
+                ),
+            ).limit(RERENDER_BATCH_SIZE).all()
+            if not batch:
+                break
+            for file_record in batch:
+                store_rendered_minutes(file_record, file_record.minutes_raw)
+            db.session.commit()
+            total += len(batch)
+
+        logger.info(f"Re-rendered {total} minutes document(s) with renderer {RENDERER_VERSION}")
+        return {'status': 'success', 'rerendered': total}
+
+
+@worker_ready.connect
+def refresh_stale_renders(sender, **kwargs):
+    """After a deploy that changed TAG_STYLES or the renderer, refresh stored HTML once."""
+    if redis_client.set(f"render:refresh:{RENDERER_VERSION}", 1, nx=True, ex=JOB_LOCK_TTL_SECONDS):
+        rerender_stale_minutes.delay() #type: ignore
+
+
+@celery.task(bind=True)
+def recover_interrupted_jobs(self):
+    """
+    Re-queue files left 'processing' by a worker that died: no run holds their
+    heartbeat any more. Audio jobs resume from their checkpointed chunks.
+    """
+    with app.app_context():
+        stuck = db.session.execute(
+            db.select(
+                TranscriptEntry.id,
+                TranscriptEntry.file_path,
+                TranscriptEntry.transcription_client,
+                TranscriptEntry.transcription_model,
+            ).filter(TranscriptEntry.status == 'processing')
+        ).all()
+
+        recovered = 0
+        for file_id, file_path, transcription_client, transcription_model in stuck:
+            if is_alive(file_id):
+                continue
+            if not transcription_client:
+                # pasted or uploaded transcript: only the LLM part to redo
+                update_file_status(file_id, 'queued')
+                process_transcript_file.delay(file_id) #type: ignore
+            elif os.path.exists(file_path):
+                update_file_status(file_id, 'queued')
+                process_audio_file.apply_async( #type: ignore
+                    args=(file_id, file_path, transcription_client, transcription_model),
+                    queue=audio_queue(file_path),
+                )
+            else:
+                update_file_status(file_id, 'failed', 'Interrupted, and the uploaded audio is gone')
+                continue
+            recovered += 1
+
+        logger.info(f"Recovery sweep re-queued {recovered} interrupted file(s)")
+        return {'status': 'success', 'recovered': recovered}
+
+
+@worker_ready.connect
+def schedule_recovery_sweep(sender, **kwargs):
+    """
+    Once per fleet start, look for jobs a dead worker left behind. The sweep waits
+    a heartbeat TTL so runs that died just before this start have expired.
+    """
+    if redis_client.set("recovery:sweep", 1, nx=True, ex=HEARTBEAT_TTL):
+        recover_interrupted_jobs.apply_async(countdown=HEARTBEAT_TTL) #type: ignore
+
+
+@celery.task(bind=True)
+def sweep_upload_sessions(self):
+    """Remove the partial files of expired resumable uploads, then schedule the next sweep."""
+    with app.app_context():
+        swept = sweep_expired_sessions()
+        logger.info(f"Upload sweep removed the files of {swept} expired session(s)")
+    # the key outlives the countdown, so only a chain that died lets a worker start a new one
+    redis_client.set("uploads:sweep", 1, ex=UPLOAD_SWEEP_INTERVAL * 2)
+    self.apply_async(countdown=UPLOAD_SWEEP_INTERVAL)
+    return {'status': 'success', 'swept': swept}
+
+
+@worker_ready.connect
+def schedule_upload_sweep(sender, **kwargs):
+    """Start the periodic sweep of expired upload sessions unless one is already scheduled."""
+    if redis_client.set("uploads:sweep", 1, nx=True, ex=UPLOAD_SWEEP_INTERVAL * 2):
+        sweep_upload_sessions.apply_async(countdown=UPLOAD_SWEEP_INTERVAL) #type: ignore
+
+
+@before_task_publish.connect
+def stamp_enqueue_time(headers=None, **kwargs):
+    """Stamp every task message with its publish time; workers read it back as request.enqueued_at."""
+    if headers is not None:
+        headers['enqueued_at'] = time.time()
+
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    """Prefork children must not reuse pooled connections inherited from the parent."""
+    with app.app_context():
+        db.engine.dispose(close=False)
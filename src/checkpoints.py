@@ -0,0 +1,110 @@
+# cython: language_level=3
+"""
+Crash safety for transcription jobs: chunk transcripts are checkpointed in
+Redis as they complete, and a running job holds a heartbeat key so the
+startup recovery sweep can tell a live job from one whose worker died.
+"""
+import os
+import socket
+import threading
+from contextlib import contextmanager
+
+from src.config import redis_client, CHECKPOINT_TTL, HEARTBEAT_TTL
+
+
+def checkpoint_key(file_id):
+    return f"file:{file_id}:checkpoint"
+
+
+def heartbeat_key(file_id):
+    return f"file:{file_id}:heartbeat"
+
+
+def load_checkpoint(file_id, total_chunks):
+    """
+    Chunk index -> transcript of the chunks already done. A checkpoint for a
+    different split (another chunk count) no longer lines up and is dropped.
+    """
+    saved = redis_client.hgetall(checkpoint_key(file_id))
+    if not saved:
+        return {}
+    if int(saved.pop(b'total', -1)) != total_chunks: #type: ignore
+        clear_checkpoint(file_id)
+        return {}
+    return {int(idx): text.decode('utf-8') for idx, text in saved.items()} #type: ignore
+
+
+def start_checkpoint(file_id, total_chunks):
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hsetnx(checkpoint_key(file_id), 'total', total_chunks)
+    pipe.expire(checkpoint_key(file_id), CHECKPOINT_TTL)
+    pipe.execute()
+
+
+def save_chunk(file_id, chunk_index, text):
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(checkpoint_key(file_id), str(chunk_index), text)
+    pipe.expire(checkpoint_key(file_id), CHECKPOINT_TTL)
+    pipe.execute()
+
+
+def get_chunk(file_id, chunk_index):
+    text = redis_client.hget(checkpoint_key(file_id), str(chunk_index))
+    return text.decode('utf-8') if text is not None else None #type: ignore
+
+
+def clear_checkpoint(file_id):
+    redis_client.delete(checkpoint_key(file_id))
+
+
+def run_token(task_id):
+    """Identifies one execution: a redelivered copy of the same task elsewhere gets another token."""
+    return f"{socket.gethostname()}:{os.getpid()}:{task_id}"
+
+
+def claim_run(file_id, token, ttl=HEARTBEAT_TTL):
+    """
+    Take the file's heartbeat key for this run. False when another live run
+    holds it; the same run (e.g. an eager retry) may claim it again.
+    """
+    if redis_client.set(heartbeat_key(file_id), token, nx=True, ex=ttl):
+        return True
+    holder = redis_client.get(heartbeat_key(file_id))
+    return holder is not None and holder.decode('utf-8') == token #type: ignore
+
+
+def release_run(file_id, token):
+    holder = redis_client.get(heartbeat_key(file_id))
+    if holder is not None and holder.decode('utf-8') == token: #type: ignore
+        redis_client.delete(heartbeat_key(file_id))
+
+
+def touch_heartbeat(file_id, ttl=HEARTBEAT_TTL):
+    """Keep a file marked as being worked on, e.g. while its chunk tasks are queued."""
+    redis_client.set(heartbeat_key(file_id), 'chunks', ex=ttl)
+
+
+def is_alive(file_id):
+    return redis_client.exists(heartbeat_key(file_id)) > 0 #type: ignore
+
+
+@contextmanager
+def heartbeat(file_id, token, ttl=HEARTBEAT_TTL):
+    """Refresh the heartbeat of a claimed run from a background thread until the block exits."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(ttl / 3):
+            # once chunk tasks own the key (touch_heartbeat), leave their TTL alone
+            holder = redis_client.get(heartbeat_key(file_id))
+            if holder is not None and holder.decode('utf-8') == token: #type: ignore
+                redis_client.expire(heartbeat_key(file_id), ttl)
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{file_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+        release_run(file_id, token)
@@ -0,0 +1,36 @@
+# cython: language_level=3
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = ('zstd', 'zlib', 'none')
+
+
+def resolve_codec(codec):
+    """The configured codec, or zlib when zstd is asked for but zstandard is not installed."""
+    if codec not in CODECS:
+        raise ValueError(f"Unsupported compression codec: {codec}")
+    if codec == 'zstd' and zstandard is None:
+        return 'zlib'
+    return codec
+
+
+def compress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=9).compress(data) #type: ignore
+    if codec == 'zlib':
+        return zlib.compress(data, 6)
+    return data
+
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Artifact is zstd compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    return data
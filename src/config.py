@@ -1,7 +1,10 @@
 # cython: language_level=3
 import os
 import redis
+import sqlite3
 from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from configparser import ConfigParser
 
 from src.models import db
@@ -15,6 +18,11 @@ config_parser.read(config_path)
 ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_FOLDER = os.path.join(ROOT_DIR, config_parser.get('flask', 'UPLOAD_FOLDER'))
 MAX_CONTENT_LENGTH_MB = config_parser.getint('flask', 'MAX_CONTENT_LENGTH_MB')
+UPLOAD_BLOCK_SIZE = config_parser.getint('flask', 'UPLOAD_BLOCK_SIZE_KB') * 1024
+UPLOAD_SESSION_TTL = config_parser.getint('flask', 'UPLOAD_SESSION_TTL_HOURS') * 3600
+UPLOAD_SWEEP_INTERVAL = config_parser.getint('flask', 'UPLOAD_SWEEP_INTERVAL_MINUTES') * 60
+AUDIO_EXTENSIONS = {f".{ext.strip().lower()}" for ext in config_parser.get('flask', 'AUDIO_EXTENSIONS').split(',')}
+MAX_ARCHIVE_UNPACKED = config_parser.getint('flask', 'MAX_ARCHIVE_UNPACKED_MB') * 1024 * 1024
 DB_NAME = config_parser.get('flask', 'SQLALCHEMY_DB_NAME')
 SQLALCHEMY_TRACK_MODIFICATIONS = config_parser.getboolean('flask', 'SQLALCHEMY_TRACK_MODIFICATIONS')
 
@@ -22,15 +30,119 @@ SQLALCHEMY_TRACK_MODIFICATIONS = config_parser.getboolean('flask', 'SQLALCHEMY_T
 database_dir = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'database')
 os.makedirs(database_dir, exist_ok=True)
 
-SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(database_dir, DB_NAME)}"
+SQLALCHEMY_DATABASE_URI = (
+    os.environ.get('DATABASE_URL')
+    or config_parser.get('database', 'URI')
+    or f"sqlite:///{os.path.join(database_dir, DB_NAME)}"
+)
+MIGRATIONS_DIR = os.path.join(ROOT_DIR, 'migrations')
+
+# Database config values
+DB_POOL_SIZE = config_parser.getint('database', 'POOL_SIZE')
+DB_MAX_OVERFLOW = config_parser.getint('database', 'MAX_OVERFLOW')
+DB_POOL_TIMEOUT = config_parser.getint('database', 'POOL_TIMEOUT_SECONDS')
+DB_POOL_RECYCLE = config_parser.getint('database', 'POOL_RECYCLE_SECONDS')
+SQLITE_BUSY_TIMEOUT_MS = config_parser.getint('database', 'SQLITE_BUSY_TIMEOUT_MS')
+ARTIFACT_COMPRESSION = config_parser.get('database', 'ARTIFACT_COMPRESSION')
+
+SQLALCHEMY_ENGINE_OPTIONS = {
+    'pool_size': DB_POOL_SIZE,
+    'max_overflow': DB_MAX_OVERFLOW,
+    'pool_timeout': DB_POOL_TIMEOUT,
+    'pool_recycle': DB_POOL_RECYCLE,
+    # drop connections the server closed (Postgres restarts, idle timeouts) before use
+    'pool_pre_ping': True,
+}
+
+# API config values
+FILES_PAGE_SIZE = config_parser.getint('api', 'FILES_PAGE_SIZE')
+FILES_MAX_PAGE_SIZE = config_parser.getint('api', 'FILES_MAX_PAGE_SIZE')
+SEARCH_PAGE_SIZE = config_parser.getint('api', 'SEARCH_PAGE_SIZE')
+SEARCH_MAX_PAGE_SIZE = config_parser.getint('api', 'SEARCH_MAX_PAGE_SIZE')
+STATUS_MAX_IDS = config_parser.getint('api', 'STATUS_MAX_IDS')
+
+# Transcription config values
+TRANSCRIPTION_BACKEND = config_parser.get('transcription', 'BACKEND')
+PARALLEL_CHUNKS = config_parser.getboolean('transcription', 'PARALLEL_CHUNKS')
+TRANSCRIPTION_MAX_WORKERS = config_parser.getint('transcription', 'MAX_WORKERS')
+CHUNK_FOLDER = os.path.join(UPLOAD_FOLDER, 'chunks')
+
+# Audio preprocessing config values
+TRANSCODE = config_parser.getboolean('audio', 'TRANSCODE')
+TRANSCODE_FORMAT = config_parser.get('audio', 'TRANSCODE_FORMAT')
+TRANSCODE_SAMPLE_RATE = config_parser.getint('audio', 'TRANSCODE_SAMPLE_RATE')
+VAD = config_parser.getboolean('audio', 'VAD')
+VAD_MIN_SILENCE_SECONDS = config_parser.getfloat('audio', 'VAD_MIN_SILENCE_SECONDS')
+VAD_PADDING_SECONDS = config_parser.getfloat('audio', 'VAD_PADDING_SECONDS')
+VAD_ENERGY_THRESHOLD_DB = config_parser.getfloat('audio', 'VAD_ENERGY_THRESHOLD_DB')
+VAD_AGGRESSIVENESS = config_parser.getint('audio', 'VAD_AGGRESSIVENESS')
+NOISE_REDUCTION = config_parser.getboolean('audio', 'NOISE_REDUCTION')
+NOISE_REDUCTION_SAMPLE_RATE = config_parser.getint('audio', 'NOISE_REDUCTION_SAMPLE_RATE')
+NOISE_REDUCTION_BLOCK_SECONDS = config_parser.getfloat('audio', 'NOISE_REDUCTION_BLOCK_SECONDS')
+NOISE_REDUCTION_OVERLAP_SECONDS = config_parser.getfloat('audio', 'NOISE_REDUCTION_OVERLAP_SECONDS')
+
+# Summarization config values
+SUMMARIZATION_BACKEND = config_parser.get('summarization', 'BACKEND')
+SUMMARY_MAX_PROMPT_TOKENS = config_parser.getint('summarization', 'MAX_PROMPT_TOKENS')
+SUMMARY_CHUNK_TOKENS = config_parser.getint('summarization', 'CHUNK_TOKENS')
+SUMMARY_MAX_WORKERS = config_parser.getint('summarization', 'MAX_WORKERS')
+SUMMARY_CHUNK_CACHE_TTL = config_parser.getint('summarization', 'CHUNK_CACHE_TTL_DAYS') * 86400
+
+# Render config values
+RENDER_CACHE_TTL = config_parser.getint('render', 'CACHE_TTL_DAYS') * 86400
+RERENDER_BATCH_SIZE = config_parser.getint('render', 'RERENDER_BATCH_SIZE')
+
+# Celery config values
+JOB_LOCK_TTL_SECONDS = config_parser.getint('celery', 'JOB_LOCK_TTL_SECONDS')
+LONG_AUDIO_SECONDS = config_parser.getint('celery', 'LONG_AUDIO_MINUTES') * 60
+QUEUE_SHORT, QUEUE_LONG, QUEUE_LLM = 'short', 'long', 'llm'
+VISIBILITY_TIMEOUT = config_parser.getint('celery', 'VISIBILITY_TIMEOUT_HOURS') * 3600
+HEARTBEAT_TTL = config_parser.getint('celery', 'HEARTBEAT_TTL_SECONDS')
+CHECKPOINT_TTL = config_parser.getint('celery', 'CHECKPOINT_TTL_HOURS') * 3600
+JOB_RESULT_TTL = config_parser.getint('celery', 'JOB_RESULT_TTL_HOURS') * 3600
+
+# Rate limit config values
+def parse_rates(value):
+    """'groq:20, openai:50' -> {'groq': 20, 'openai': 50}"""
+    rates = {}
+    for item in value.split(','):
+        if item.strip():
+            client, rate = item.split(':')
+            rates[client.strip()] = int(rate)
+    return rates
+
+RATE_LIMITS = {
+    'transcription': parse_rates(config_parser.get('ratelimit', 'TRANSCRIPTION_REQUESTS_PER_MINUTE')),
+    'llm': parse_rates(config_parser.get('ratelimit', 'LLM_REQUESTS_PER_MINUTE')),
+}
+RATE_LIMIT_MAX_WAIT = config_parser.getint('ratelimit', 'MAX_WAIT_SECONDS')
+RATE_LIMIT_RETRY_MAX = config_parser.getint('ratelimit', 'RETRY_MAX')
+RATE_LIMIT_BACKOFF = config_parser.getint('ratelimit', 'RETRY_BACKOFF_SECONDS')
+RATE_LIMIT_BACKOFF_MAX = config_parser.getint('ratelimit', 'RETRY_BACKOFF_MAX_SECONDS')
 
 # Redis config values
 REDIS_HOST = config_parser.get('redis', 'HOST')
 REDIS_PORT = config_parser.getint('redis', 'PORT')
 REDIS_DB = config_parser.getint('redis', 'DB')
+EVENTS_CHANNEL = config_parser.get('redis', 'EVENTS_CHANNEL')
+EVENTS_HEARTBEAT_SECONDS = config_parser.getint('redis', 'EVENTS_HEARTBEAT_SECONDS')
+EVENTS_CLIENT_BUFFER = config_parser.getint('redis', 'EVENTS_CLIENT_BUFFER')
+REDIS_MAX_CONNECTIONS = config_parser.getint('redis', 'MAX_CONNECTIONS')
+REDIS_POOL_TIMEOUT = config_parser.getint('redis', 'POOL_TIMEOUT_SECONDS')
+STATUS_CACHE_TTL = config_parser.getint('redis', 'STATUS_CACHE_TTL_HOURS') * 3600
 
 REDIS_URI = f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}'
-redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+# One bounded pool per process, shared by every thread or greenlet. redis-py
+# resets it after a fork, and its sockets yield under gevent's monkey patching.
+redis_pool = redis.BlockingConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+    health_check_interval=30,
+)
+redis_client = redis.Redis(connection_pool=redis_pool)
 
 app = Flask(__name__)
 app.config.from_mapping(
@@ -38,9 +150,27 @@ app.config.from_mapping(
     MAX_CONTENT_LENGTH=MAX_CONTENT_LENGTH_MB * 1024 * 1024,
     SQLALCHEMY_DATABASE_URI=SQLALCHEMY_DATABASE_URI,
     SQLALCHEMY_TRACK_MODIFICATIONS=SQLALCHEMY_TRACK_MODIFICATIONS,
+    SQLALCHEMY_ENGINE_OPTIONS=SQLALCHEMY_ENGINE_OPTIONS,
+    ARTIFACT_COMPRESSION=ARTIFACT_COMPRESSION,
 )
 
 # Ensure upload folder exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 db.init_app(app)
+
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets the dashboard read while a worker commits a large transcript, and
+    busy_timeout makes writers wait for each other instead of failing with
+    "database is locked". synchronous=NORMAL is durable enough under WAL.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
@@ -0,0 +1,72 @@
+# cython: language_level=3
+import hashlib
+
+from src.config import redis_client, UPLOAD_BLOCK_SIZE
+from src.models import db, TranscriptEntry, Artifact
+
+DEDUP_HITS_KEY = "dedup:hits"
+DEDUP_MISSES_KEY = "dedup:misses"
+
+
+def file_digest(path):
+    """SHA-256 of a stored upload, read block by block."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(UPLOAD_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_cached_transcripts(content_hashes, transcription_client, transcription_model):
+    """
+    Map each content hash that was already transcribed with the same client and
+    model to its earliest completed entry, in one query. Every hash looked up
+    counts as a hit or a miss in Redis.
+    """
+    entries = TranscriptEntry.query.filter(
+        TranscriptEntry.content_hash.in_(set(content_hashes)),
+        TranscriptEntry.transcription_client == transcription_client,
+        TranscriptEntry.transcription_model == transcription_model,
+        TranscriptEntry.status == 'completed',
+        TranscriptEntry.transcript_available.is_(True),
+    ).order_by(TranscriptEntry.upload_time).all()
+
+    cached = {}
+    for entry in entries:
+        cached.setdefault(entry.content_hash, entry)
+
+    hits = sum(1 for content_hash in content_hashes if content_hash in cached)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.incrby(DEDUP_HITS_KEY, hits)
+    pipe.incrby(DEDUP_MISSES_KEY, len(content_hashes) - hits)
+    pipe.execute()
+    return cached
+
+
+def load_transcript_artifacts(entries):
+    """Entry id -> stored transcript artifact of the given entries, bodies included, in one query."""
+    artifacts = Artifact.query.options(db.undefer(Artifact.data)).filter(
+        Artifact.entry_id.in_([entry.id for entry in entries]),
+        Artifact.kind == 'transcript',
+    ).all()
+    return {artifact.entry_id: artifact for artifact in artifacts}
+
+
+def is_file_shared(file_path, excluding_id):
+    """Whether another entry still points at the same stored upload."""
+    return TranscriptEntry.query.filter(
+        TranscriptEntry.file_path == file_path,
+        TranscriptEntry.id != excluding_id,
+    ).first() is not None
+
+
+def get_dedup_stats():
+    hits, misses = redis_client.mget(DEDUP_HITS_KEY, DEDUP_MISSES_KEY)
+    hits = int(hits or 0) #type: ignore
+    misses = int(misses or 0) #type: ignore
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
@@ -0,0 +1,92 @@
+# cython: language_level=3
+import json
+import queue
+import threading
+from contextlib import contextmanager
+
+from transmeet.utils.general_utils import get_logger
+
+from src.config import redis_client, EVENTS_CHANNEL, EVENTS_CLIENT_BUFFER
+
+logger = get_logger(__name__)
+
+
+def publish_file_event(file_id, **fields):
+    """Publish a status/progress change for a file to every subscribed dashboard."""
+    redis_client.publish(EVENTS_CHANNEL, json.dumps({'id': file_id, **fields}))
+
+
+def publish_file_events(events):
+    """Publish many (file_id, fields) events in one Redis round trip."""
+    pipe = redis_client.pipeline(transaction=False)
+    for file_id, fields in events:
+        pipe.publish(EVENTS_CHANNEL, json.dumps({'id': file_id, **fields}))
+    pipe.execute()
+
+
+class EventHub:
+    """
+    Fan-out of the events channel inside one web process: a single Redis
+    subscription feeds a bounded queue per connected dashboard, so open SSE
+    streams cost no Redis connections. Under gevent the reader thread and the
+    queues are cooperative; under threaded workers they are ordinary threads.
+    """
+
+    def __init__(self, channel=EVENTS_CHANNEL, buffer=EVENTS_CLIENT_BUFFER):
+        self.channel = channel
+        self.buffer = buffer
+        self.clients = set()
+        self.lock = threading.Lock()
+        self.reader = None
+
+    def start(self):
+        with self.lock:
+            if self.reader is None or not self.reader.is_alive():
+                self.reader = threading.Thread(target=self.run, name="event-hub", daemon=True)
+                self.reader.start()
+
+    def run(self):
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self.broadcast(message['data'].decode('utf-8'))
+            except Exception as e:
+                logger.error(f"Event hub lost its Redis subscription, resubscribing: {e}")
+                threading.Event().wait(1)
+            finally:
+                pubsub.close()
+
+    def broadcast(self, data):
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.put_nowait(data)
+            except queue.Full:
+                # a client this far behind is gone or stuck; drop it, it reconnects and re-syncs
+                self.remove(client)
+                with client.mutex:
+                    client.queue.clear()
+                client.put_nowait(None)
+
+    def remove(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    @contextmanager
+    def subscribe(self):
+        """A queue of event payloads for one connection; None means it was dropped."""
+        self.start()
+        client = queue.Queue(maxsize=self.buffer)
+        with self.lock:
+            self.clients.add(client)
+        try:
+            yield client
+        finally:
+            self.remove(client)
+
+
+event_hub = EventHub()
@@ -0,0 +1,96 @@
+# cython: language_level=3
+"""
+Text extraction for uploaded transcript files, run by the worker. Each
+extractor is registered for its file extensions and yields the text piece by
+piece (a block, a page, a paragraph), so no format holds a second copy of
+the document in memory while it is read.
+"""
+import codecs
+import io
+import os
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from src.config import UPLOAD_BLOCK_SIZE
+
+EXTRACTORS = {}
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+def register_extractor(*extensions):
+    """Register the decorated generator as the extractor for the given extensions."""
+    def register(extractor):
+        for ext in extensions:
+            EXTRACTORS[ext] = extractor
+        return extractor
+    return register
+
+
+def is_extractable(filename):
+    return os.path.splitext(filename)[1].lower() in EXTRACTORS
+
+
+def extract_text(path):
+    """The text of an uploaded file, assembled from the pieces its extractor yields."""
+    ext = os.path.splitext(path)[1].lower()
+    extractor = EXTRACTORS.get(ext)
+    if extractor is None:
+        raise UnsupportedFormat(f"Cannot extract text from {ext or 'files without an extension'}")
+    text = io.StringIO()
+    for piece in extractor(path):
+        text.write(piece)
+    return text.getvalue()
+
+
+@register_extractor('.txt', '.md', '.py')
+def extract_plain_text(path):
+    """UTF-8 text, decoded block by block; a character split across two blocks is kept whole."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(UPLOAD_BLOCK_SIZE), b''):
+            yield decoder.decode(block)
+    yield decoder.decode(b'', final=True)
+
+
+@register_extractor('.pdf')
+def extract_pdf(path):
+    """PDF text one page at a time; pages are parsed only when reached."""
+    from PyPDF2 import PdfReader
+
+    with open(path, 'rb') as f:
+        reader = PdfReader(f)
+        for number, page in enumerate(reader.pages):
+            if number:
+                yield "\n"
+            yield page.extract_text() or ''
+
+
+@register_extractor('.docx')
+def extract_docx(path):
+    """
+    DOCX body text, streamed from word/document.xml with iterparse; each
+    paragraph is a line and its elements are freed once it has been read.
+    """
+    try:
+        archive = zipfile.ZipFile(path)
+        document = archive.open('word/document.xml')
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise UnsupportedFormat("Not a valid .docx file") from e
+
+    with archive, document:
+        for event, element in iterparse(document, events=('end',)):
+            tag = element.tag
+            if tag == f'{WORD_NAMESPACE}t':
+                yield element.text or ''
+            elif tag == f'{WORD_NAMESPACE}tab':
+                yield "\t"
+            elif tag in (f'{WORD_NAMESPACE}br', f'{WORD_NAMESPACE}cr'):
+                yield "\n"
+            elif tag == f'{WORD_NAMESPACE}p':
+                yield "\n"
+                element.clear()
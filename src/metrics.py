@@ -0,0 +1,137 @@
+# cython: language_level=3
+"""
+Stage timing for jobs. Every timed stage is added to the job's own durations
+(a Redis hash, copied onto the entry when the job finishes) and to a latency
+histogram per stage, model and file size. The histograms live in Redis so the
+Flask and Celery processes share them; /metrics renders them in the
+Prometheus text format.
+"""
+import time
+from contextlib import contextmanager
+
+from src.config import redis_client, JOB_LOCK_TTL_SECONDS
+
+METRIC_NAME = 'speak2summary_stage_seconds'
+# bucket upper bounds in seconds: sub-second DB commits up to hour-long transcriptions
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+# file size label boundaries in MB
+SIZE_BUCKETS_MB = (10, 50, 200)
+
+SERIES_KEY = "metrics:stage:series"
+
+
+def size_label(size_bytes):
+    """Coarse file size class for the histogram label, e.g. '10-50' (MB)."""
+    if size_bytes is None:
+        return ''
+    size_mb = size_bytes / (1024 * 1024)
+    lower = 0
+    for upper in SIZE_BUCKETS_MB:
+        if size_mb < upper:
+            return f"{lower}-{upper}"
+        lower = upper
+    return f"{lower}+"
+
+
+def series_key(stage, model, size):
+    return f"metrics:stage:{stage}|{model or ''}|{size or ''}"
+
+
+def stages_key(file_id):
+    return f"file:{file_id}:stages"
+
+
+def observe(stage, seconds, model=None, size=None):
+    """Add one observation to the stage's histogram."""
+    key = series_key(stage, model, size)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.sadd(SERIES_KEY, key)
+    pipe.hincrbyfloat(key, 'sum', seconds)
+    pipe.hincrby(key, 'count', 1)
+    for bound in STAGE_BUCKETS:
+        if seconds <= bound:
+            pipe.hincrby(key, f"le:{bound}", 1)
+    pipe.execute()
+
+
+def record_stage(file_id, stage, seconds, model=None, size=None):
+    """Add a stage duration to the job (stages that repeat, like chunks, add up) and to its histogram."""
+    observe(stage, seconds, model, size)
+    if file_id is None:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hincrbyfloat(stages_key(file_id), stage, seconds)
+    pipe.expire(stages_key(file_id), JOB_LOCK_TTL_SECONDS)
+    pipe.execute()
+
+
+@contextmanager
+def timed(stage, file_id=None, model=None, size=None):
+    """Time the block as one run of stage; a block that raises is not recorded."""
+    start = time.perf_counter()
+    yield
+    record_stage(file_id, stage, time.perf_counter() - start, model, size)
+
+
+def record_queue_wait(task, file_id=None, model=None, size=None):
+    """How long the task sat in its queue, from the time stamped on it at publish."""
+    enqueued_at = getattr(task.request, 'enqueued_at', None)
+    if enqueued_at:
+        record_stage(file_id, 'queue_wait', max(0.0, time.time() - float(enqueued_at)), model, size)
+
+
+def clear_stage_timings(file_id):
+    """Drop the durations of an earlier attempt, so a retried or recovered run starts from zero."""
+    redis_client.delete(stages_key(file_id))
+
+
+def job_stage_timings(file_id, clear=False):
+    """
+    Seconds per stage recorded for a job so far, rounded for storage on the
+    entry. With clear, the recorded stages are taken: stored once, never twice.
+    """
+    if clear:
+        # MULTI, so a stage recorded between the read and the delete is not lost
+        pipe = redis_client.pipeline()
+        pipe.hgetall(stages_key(file_id))
+        pipe.delete(stages_key(file_id))
+        timings, _ = pipe.execute()
+    else:
+        timings = redis_client.hgetall(stages_key(file_id))
+    return {stage.decode('utf-8'): round(float(seconds), 3) for stage, seconds in timings.items()} #type: ignore
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels) + '}'
+
+
+def render_histograms():
+    """The stage histograms in the Prometheus text exposition format."""
+    keys = sorted(key.decode('utf-8') for key in redis_client.smembers(SERIES_KEY)) #type: ignore
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.hgetall(key)
+
+    lines = [
+        f"# HELP {METRIC_NAME} Duration of job stages by model and file size.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    for key, values in zip(keys, pipe.execute()):
+        if not values:
+            continue
+        values = {field.decode('utf-8'): value for field, value in values.items()}
+        stage, model, size = key[len("metrics:stage:"):].split('|')
+        labels = [('stage', stage), ('model', model), ('size_mb', size)]
+        # every observation was counted in all the buckets it fits, so counts are cumulative
+        for bound in STAGE_BUCKETS:
+            cumulative = int(values.get(f"le:{bound}", 0))
+            lines.append(f"{METRIC_NAME}_bucket{format_labels(labels + [('le', bound)])} {cumulative}")
+        count = int(values.get('count', 0))
+        lines.append(f"{METRIC_NAME}_bucket{format_labels(labels + [('le', '+Inf')])} {count}")
+        lines.append(f"{METRIC_NAME}_sum{format_labels(labels)} {float(values.get('sum', 0))}")
+        lines.append(f"{METRIC_NAME}_count{format_labels(labels)} {count}")
+    return lines
@@ -0,0 +1,45 @@
+"""baseline transcription table
+
+Revision ID: 3f1c2a9d0b7e
+Revises: 
+Create Date: 2026-10-18 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d0b7e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # databases created by db.create_all() before migrations existed already have the table
+    if sa.inspect(op.get_bind()).has_table('transcription'):
+        return
+
+    op.create_table('transcription',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('file_path', sa.String(length=512), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('upload_time', sa.DateTime(), nullable=True),
+    sa.Column('completion_time', sa.DateTime(), nullable=True),
+    sa.Column('mind_map', sa.JSON(), nullable=True),
+    sa.Column('transcription_client', sa.String(length=50), nullable=True),
+    sa.Column('transcription_model', sa.String(length=50), nullable=True),
+    sa.Column('llm_client', sa.String(length=50), nullable=True),
+    sa.Column('llm_model', sa.String(length=50), nullable=True),
+    sa.Column('transcript', sa.Text(), nullable=True),
+    sa.Column('minutes_raw', sa.Text(), nullable=True),
+    sa.Column('minutes', sa.Text(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('transcription')
@@ -0,0 +1,48 @@
+"""listing index, dedup hash, render version and silence trimming columns
+
+Revision ID: 8b4e6d1f2c3a
+Revises: 3f1c2a9d0b7e
+Create Date: 2026-10-18 09:41:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e6d1f2c3a'
+down_revision = '3f1c2a9d0b7e'
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = [
+    ('content_hash', sa.String(length=64)),
+    ('minutes_render_version', sa.String(length=16)),
+    ('speech_ratio', sa.Float()),
+    ('silence_seconds_saved', sa.Float()),
+    ('speech_segments', sa.JSON()),
+]
+
+
+def upgrade():
+    # a database made by db.create_all() on a newer checkout may have some of these already
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('transcription')}
+    indexes = {index['name'] for index in inspector.get_indexes('transcription')}
+
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        for name, type_ in NEW_COLUMNS:
+            if name not in columns:
+                batch_op.add_column(sa.Column(name, type_, nullable=True))
+        if 'ix_transcription_content_hash' not in indexes:
+            batch_op.create_index(batch_op.f('ix_transcription_content_hash'), ['content_hash'], unique=False)
+        if 'ix_transcription_upload_time_id' not in indexes:
+            batch_op.create_index('ix_transcription_upload_time_id', ['upload_time', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        batch_op.drop_index('ix_transcription_upload_time_id')
+        batch_op.drop_index(batch_op.f('ix_transcription_content_hash'))
+        for name, _ in reversed(NEW_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,132 @@
+"""move transcript, minutes and mind map blobs to the artifact table
+
+Revision ID: c5a7e9b1d3f2
+Revises: 8b4e6d1f2c3a
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+import json
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+from src.compression import compress, decompress, resolve_codec
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7e9b1d3f2'
+down_revision = '8b4e6d1f2c3a'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+TEXT_KINDS = ('transcript', 'minutes_raw', 'minutes')
+
+transcription = sa.table(
+    'transcription',
+    sa.column('id', sa.String),
+    sa.column('transcript', sa.Text),
+    sa.column('minutes_raw', sa.Text),
+    sa.column('minutes', sa.Text),
+    sa.column('mind_map', sa.JSON),
+    sa.column('transcript_available', sa.Boolean),
+    sa.column('minutes_available', sa.Boolean),
+    sa.column('mind_map_available', sa.Boolean),
+    sa.column('mind_map_topic', sa.String),
+)
+
+artifact = sa.table(
+    'artifact',
+    sa.column('id', sa.Integer),
+    sa.column('entry_id', sa.String),
+    sa.column('kind', sa.String),
+    sa.column('codec', sa.String),
+    sa.column('size', sa.Integer),
+    sa.column('digest', sa.String),
+    sa.column('data', sa.LargeBinary),
+)
+
+
+def batches(ids):
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def upgrade():
+    op.create_table('artifact',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entry_id', sa.String(length=36), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('codec', sa.String(length=10), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('digest', sa.String(length=64), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['transcription.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entry_id', 'kind', name='uq_artifact_entry_kind')
+    )
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('transcript_available', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.add_column(sa.Column('minutes_available', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.add_column(sa.Column('mind_map_available', sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch_op.add_column(sa.Column('mind_map_topic', sa.String(length=255), nullable=True))
+
+    # copy the blobs a batch of rows at a time so multi-hour transcripts are not all in memory
+    conn = op.get_bind()
+    codec = resolve_codec(current_app.config['ARTIFACT_COMPRESSION'])
+    ids = [row.id for row in conn.execute(sa.select(transcription.c.id))]
+    for batch in batches(ids):
+        rows = conn.execute(sa.select(transcription).where(transcription.c.id.in_(batch))).all()
+        for row in rows:
+            bodies = {kind: getattr(row, kind) for kind in TEXT_KINDS}
+            if row.mind_map is not None:
+                bodies['mind_map'] = json.dumps(row.mind_map, ensure_ascii=False)
+            for kind, text in bodies.items():
+                if text is None:
+                    continue
+                raw = text.encode('utf-8')
+                conn.execute(artifact.insert().values(
+                    entry_id=row.id, kind=kind, codec=codec, size=len(raw),
+                    digest=hashlib.sha256(raw).hexdigest(), data=compress(raw, codec),
+                ))
+
+            topic = row.mind_map.get('Root Topic') if isinstance(row.mind_map, dict) else None
+            conn.execute(transcription.update().where(transcription.c.id == row.id).values(
+                transcript_available=row.transcript is not None,
+                minutes_available=row.minutes is not None,
+                mind_map_available=row.mind_map is not None,
+                mind_map_topic=str(topic)[:255] if topic is not None else None,
+            ))
+
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        batch_op.drop_column('mind_map')
+        batch_op.drop_column('minutes')
+        batch_op.drop_column('minutes_raw')
+        batch_op.drop_column('transcript')
+
+
+def downgrade():
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('transcript', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('minutes_raw', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('minutes', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('mind_map', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    ids = [row.id for row in conn.execute(sa.select(artifact.c.id))]
+    for batch in batches(ids):
+        rows = conn.execute(sa.select(artifact).where(artifact.c.id.in_(batch))).all()
+        for row in rows:
+            text = decompress(row.data, row.codec).decode('utf-8')
+            value = json.loads(text) if row.kind == 'mind_map' else text
+            conn.execute(transcription.update().where(transcription.c.id == row.entry_id).values(**{row.kind: value}))
+
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        batch_op.drop_column('mind_map_topic')
+        batch_op.drop_column('mind_map_available')
+        batch_op.drop_column('minutes_available')
+        batch_op.drop_column('transcript_available')
+
+    op.drop_table('artifact')
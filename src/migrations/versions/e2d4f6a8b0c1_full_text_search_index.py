@@ -0,0 +1,71 @@
+"""full-text search index over transcripts and minutes
+
+Revision ID: e2d4f6a8b0c1
+Revises: c5a7e9b1d3f2
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.compression import decompress
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2d4f6a8b0c1'
+down_revision = 'c5a7e9b1d3f2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 100
+# search document kind -> artifact kind it is built from
+KINDS = {'transcript': 'transcript', 'minutes': 'minutes_raw'}
+
+artifact = sa.table(
+    'artifact',
+    sa.column('id', sa.Integer),
+    sa.column('entry_id', sa.String),
+    sa.column('kind', sa.String),
+    sa.column('codec', sa.String),
+    sa.column('data', sa.LargeBinary),
+)
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql':
+        op.execute("""
+            CREATE TABLE search_document (
+                entry_id VARCHAR(36) NOT NULL REFERENCES transcription (id) ON DELETE CASCADE,
+                kind VARCHAR(20) NOT NULL,
+                body TEXT NOT NULL,
+                tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', body)) STORED,
+                PRIMARY KEY (entry_id, kind)
+            )
+        """)
+        op.execute("CREATE INDEX ix_search_document_tsv ON search_document USING GIN (tsv)")
+        insert = sa.text("INSERT INTO search_document (entry_id, kind, body) VALUES (:entry_id, :kind, :body)")
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "entry_id UNINDEXED, kind UNINDEXED, body, tokenize = 'porter unicode61')"
+        )
+        insert = sa.text("INSERT INTO search_index (entry_id, kind, body) VALUES (:entry_id, :kind, :body)")
+
+    # index what is already stored, a batch of artifacts at a time
+    source_kinds = {source: kind for kind, source in KINDS.items()}
+    ids = [row.id for row in conn.execute(sa.select(artifact.c.id).where(artifact.c.kind.in_(source_kinds)))]
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = conn.execute(sa.select(artifact).where(artifact.c.id.in_(ids[start:start + BATCH_SIZE]))).all()
+        conn.execute(insert, [{
+            'entry_id': row.entry_id,
+            'kind': source_kinds[row.kind],
+            'body': decompress(row.data, row.codec).decode('utf-8'),
+        } for row in rows])
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP TABLE search_document")
+    else:
+        op.execute("DROP TABLE search_index")
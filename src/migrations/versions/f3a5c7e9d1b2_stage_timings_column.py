@@ -0,0 +1,26 @@
+"""per-stage job durations
+
+Revision ID: f3a5c7e9d1b2
+Revises: e2d4f6a8b0c1
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a5c7e9d1b2'
+down_revision = 'e2d4f6a8b0c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('stage_timings', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('transcription', schema=None) as batch_op:
+        batch_op.drop_column('stage_timings')
@@ -1,35 +1,160 @@
 # cython: language_level=3
+import json
+import hashlib
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm.collections import attribute_keyed_dict
 from datetime import datetime
 
+from src.compression import compress, decompress, resolve_codec
+
 db = SQLAlchemy()
 
+
+class Artifact(db.Model):
+    """
+    A large text result of a transcription entry, stored compressed outside the
+    hot `transcription` row. `data` is deferred: listing the artifacts of an
+    entry reads only their size and digest until a body is actually needed.
+    """
+    __tablename__ = 'artifact'
+    __table_args__ = (
+        db.UniqueConstraint('entry_id', 'kind', name='uq_artifact_entry_kind'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.String(36), db.ForeignKey('transcription.id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # transcript, minutes_raw, minutes, mind_map
+    codec = db.Column(db.String(10), nullable=False)  # zstd, zlib, none
+    size = db.Column(db.Integer, nullable=False)  # uncompressed bytes
+    digest = db.Column(db.String(64), nullable=False)  # SHA-256 of the uncompressed bytes
+    data = db.deferred(db.Column(db.LargeBinary, nullable=False))
+
+    def get_text(self):
+        # decompressed once per loaded instance; templates read the same body several times
+        if '_text' not in self.__dict__:
+            self._text = decompress(self.data, self.codec).decode('utf-8')
+        return self._text
+
+    def copy(self):
+        """The same body for another entry, as a new row holding a copy of the compressed bytes."""
+        return Artifact(kind=self.kind, codec=self.codec, size=self.size, digest=self.digest, data=self.data)
+
+    def set_text(self, text):
+        raw = text.encode('utf-8')
+        self.codec = resolve_codec(current_app.config['ARTIFACT_COMPRESSION'])
+        self.data = compress(raw, self.codec)
+        self.size = len(raw)
+        self.digest = hashlib.sha256(raw).hexdigest()
+        self._text = text
+
+
 class TranscriptEntry(db.Model):
     __tablename__ = 'transcription'
-    
+    __table_args__ = (
+        # keyset pagination for the dashboard listing walks (upload_time, id)
+        db.Index('ix_transcription_upload_time_id', 'upload_time', 'id'),
+    )
+
     id = db.Column(db.String(36), primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(512), nullable=False)
     status = db.Column(db.String(50), default='queued')  # queued, processing, completed, failed
     upload_time = db.Column(db.DateTime, default=datetime.utcnow)
     completion_time = db.Column(db.DateTime, nullable=True)
-    mind_map = db.Column(db.JSON, nullable=True)
 
     # store information such as transcription client and model
     transcription_client = db.Column(db.String(50), nullable=True)
     transcription_model = db.Column(db.String(50), nullable=True)
     llm_client = db.Column(db.String(50), nullable=True)
     llm_model = db.Column(db.String(50), nullable=True)
+
+    # SHA-256 of the uploaded audio, used to reuse transcripts of duplicate uploads
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
     
-    # Store processing results
-    transcript = db.Column(db.Text, nullable=True)
-    minutes_raw = db.Column(db.Text, nullable=True)
-    minutes = db.Column(db.Text, nullable=True)
+    # Processing results live in `artifacts`; these flags let listings and status
+    # polls answer without touching them
+    transcript_available = db.Column(db.Boolean, nullable=False, default=False)
+    minutes_available = db.Column(db.Boolean, nullable=False, default=False)
+    mind_map_available = db.Column(db.Boolean, nullable=False, default=False)
+    mind_map_topic = db.Column(db.String(255), nullable=True)
+    artifacts = db.relationship(
+        'Artifact',
+        collection_class=attribute_keyed_dict('kind'),
+        # deleted through the ORM as well: SQLite does not enforce ON DELETE CASCADE by default
+        cascade='all, delete-orphan',
+    )
+    # RENDERER_VERSION that produced `minutes` from `minutes_raw`
+    minutes_render_version = db.Column(db.String(16), nullable=True)
     
+    # Silence trimming: share of the audio kept as speech, seconds not transcribed and
+    # [trimmed start, original start, duration] segments to map timestamps back
+    speech_ratio = db.Column(db.Float, nullable=True)
+    silence_seconds_saved = db.Column(db.Float, nullable=True)
+    speech_segments = db.Column(db.JSON, nullable=True)
+
+    # seconds spent per stage (queue_wait, transcode, vad, split, transcription_chunk, llm_minutes, ...)
+    stage_timings = db.Column(db.JSON, nullable=True)
+
     # Error handling
     error_message = db.Column(db.Text, nullable=True)
 
-        
+
+    def get_artifact_text(self, kind):
+        artifact = self.artifacts.get(kind)
+        return artifact.get_text() if artifact else None
+
+    def set_artifact_text(self, kind, text):
+        if text is None:
+            self.artifacts.pop(kind, None)
+            return
+        artifact = self.artifacts.get(kind)
+        if artifact is None:
+            artifact = self.artifacts[kind] = Artifact(kind=kind)
+        artifact.set_text(text)
+
+    def artifact_digest(self, kind):
+        artifact = self.artifacts.get(kind)
+        return artifact.digest if artifact else None
+
+    @property
+    def transcript(self):
+        return self.get_artifact_text('transcript')
+
+    @transcript.setter
+    def transcript(self, value):
+        self.set_artifact_text('transcript', value)
+        self.transcript_available = value is not None
+
+    @property
+    def minutes_raw(self):
+        return self.get_artifact_text('minutes_raw')
+
+    @minutes_raw.setter
+    def minutes_raw(self, value):
+        self.set_artifact_text('minutes_raw', value)
+
+    @property
+    def minutes(self):
+        return self.get_artifact_text('minutes')
+
+    @minutes.setter
+    def minutes(self, value):
+        self.set_artifact_text('minutes', value)
+        self.minutes_available = value is not None
+
+    @property
+    def mind_map(self):
+        text = self.get_artifact_text('mind_map')
+        return json.loads(text) if text is not None else None
+
+    @mind_map.setter
+    def mind_map(self, value):
+        self.set_artifact_text('mind_map', json.dumps(value, ensure_ascii=False) if value is not None else None)
+        self.mind_map_available = value is not None
+        topic = value.get('Root Topic') if isinstance(value, dict) else None
+        self.mind_map_topic = str(topic)[:255] if topic is not None else None
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -37,7 +162,10 @@ class TranscriptEntry(db.Model):
             'status': self.status,
             'upload_time': self.upload_time.isoformat(),
             'completion_time': self.completion_time.isoformat() if self.completion_time else None,
-            'transcript_available': self.transcript is not None,
-            'minutes_available': self.minutes is not None,
+            'transcript_available': self.transcript_available,
+            'minutes_available': self.minutes_available,
+            'speech_ratio': self.speech_ratio,
+            'silence_seconds_saved': self.silence_seconds_saved,
+            'stage_timings': self.stage_timings,
             'error_message': self.error_message
         }
\ No newline at end of file
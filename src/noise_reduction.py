@@ -1,25 +1,106 @@
 # cython: language_level=3
-# need to move into transmeet package
-from pydub import AudioSegment
-import noisereduce as nr
-import numpy as np
-from scipy.io import wavfile
 import os
+import wave
+
+import numpy as np
+from transmeet.utils.general_utils import get_logger
+
+from src.audio_preprocessing import pcm_blocks
+from src.config import (
+    CHUNK_FOLDER,
+    NOISE_REDUCTION_SAMPLE_RATE,
+    NOISE_REDUCTION_BLOCK_SECONDS,
+    NOISE_REDUCTION_OVERLAP_SECONDS,
+)
+
+logger = get_logger(__name__)
+
+try:
+    import noisereduce as nr
+except ImportError:
+    nr = None
+
+INT16_MIN, INT16_MAX = -32768, 32767
+
+
+def denoise_with_noisereduce(samples, sample_rate):
+    return nr.reduce_noise(y=samples, sr=sample_rate) #type: ignore
+
+
+def to_int16(samples):
+    """Round and clip float samples into the int16 range instead of letting them wrap."""
+    return np.clip(np.rint(samples), INT16_MIN, INT16_MAX).astype("<i2")
+
+
+def denoise_blocks(blocks, sample_rate, overlap_samples, denoise):
+    """
+    Denoise a stream of int16 blocks and yield int16 output blocks of the same
+    total length. Each window is the new block plus the last overlap_samples of
+    the previous one; the overlapping region of two consecutive windows is
+    crossfaded so block edges do not click. At most one window is held in memory.
+    """
+    carry = np.zeros(0, dtype=np.float32)    # raw input shared with the next window
+    pending = np.zeros(0, dtype=np.float32)  # denoised output for that same region
+
+    for block in blocks:
+        window = np.concatenate((carry, block.astype(np.float32)))
+        cleaned = np.asarray(denoise(window, sample_rate), dtype=np.float32)
+
+        lead = len(carry)
+        if lead:
+            fade_in = np.linspace(0.0, 1.0, lead, endpoint=False, dtype=np.float32)
+            cleaned[:lead] = pending * (1.0 - fade_in) + cleaned[:lead] * fade_in
+
+        keep = max(len(window) - overlap_samples, lead)
+        if keep:
+            yield to_int16(cleaned[:keep])
+        carry, pending = window[keep:], cleaned[keep:]
+
+    if len(pending):
+        yield to_int16(pending)
+
+
+def reduce_noise(input_path: str, output_path: str, sample_rate=NOISE_REDUCTION_SAMPLE_RATE, denoise=None):
+    """
+    Write a noise-reduced mono WAV of input_path to output_path. Audio is decoded,
+    denoised and written block by block, so memory stays bounded by the block
+    size whatever the length of the recording.
+    """
+    denoise = denoise or denoise_with_noisereduce
+    block_samples = int(NOISE_REDUCTION_BLOCK_SECONDS * sample_rate)
+    overlap_samples = min(int(NOISE_REDUCTION_OVERLAP_SECONDS * sample_rate), block_samples)
+
+    try:
+        with pcm_blocks(input_path, sample_rate, block_samples) as blocks, wave.open(output_path, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(sample_rate)
+            for cleaned in denoise_blocks(blocks, sample_rate, overlap_samples, denoise):
+                out.writeframes(cleaned.tobytes())
+    except Exception:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
 
-def reduce_noise(input_path: str, output_path: str):
-    audio = AudioSegment.from_file(input_path)    
-    temp_wav = "temp_audio.wav"
-    audio.export(temp_wav, format="wav")
 
-    rate, data = wavfile.read(temp_wav)
-    if len(data.shape) == 2:
-        data = data.mean(axis=1).astype(data.dtype)
+def denoise_audio_file(file_id, file_path):
+    """
+    Optional pipeline stage: noise-reduced copy of the upload in the file's work
+    directory (removed with its chunks). Returns the input path when noisereduce
+    is not installed.
+    """
+    if nr is None:
+        logger.warning("noisereduce is not installed, skipping noise reduction")
+        return file_path
 
-    reduced_noise = nr.reduce_noise(y=data, sr=rate)
-    wavfile.write(output_path, rate, reduced_noise.astype(np.int16))
-    os.remove(temp_wav)
-    # print(f"Noise-reduced audio saved to: {output_path}")
+    work_dir = os.path.join(CHUNK_FOLDER, file_id)
+    os.makedirs(work_dir, exist_ok=True)
+    output_path = os.path.join(work_dir, "denoised.wav")
+    reduce_noise(file_path, output_path)
+    logger.info(f"Noise-reduced {file_path} into {output_path}")
+    return output_path
 
 
 if __name__ == "__main__":
-    reduce_noise("/home/admin/Downloads/meeting.wav", "clean_meeting_audio.wav")
+    import sys
+    reduce_noise(sys.argv[1], sys.argv[2])
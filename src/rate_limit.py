@@ -0,0 +1,153 @@
+# cython: language_level=3
+"""
+Provider rate limiting shared by every worker: one Redis token bucket per
+(kind, client), where kind is 'transcription' or 'llm', plus the helpers
+tasks use to back off and retry when a provider answers 429 anyway.
+"""
+import re
+import time
+import random
+
+from transmeet.utils.general_utils import get_logger
+
+from src.config import (
+    redis_client,
+    RATE_LIMITS,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_BACKOFF,
+    RATE_LIMIT_BACKOFF_MAX,
+)
+
+logger = get_logger(__name__)
+
+# the SDKs' own 429 exceptions, for whichever providers are installed
+PROVIDER_RATE_LIMIT_ERRORS = ()
+try:
+    from openai import RateLimitError as OpenAIRateLimitError
+    PROVIDER_RATE_LIMIT_ERRORS += (OpenAIRateLimitError,)
+except ImportError:
+    pass
+try:
+    from groq import RateLimitError as GroqRateLimitError
+    PROVIDER_RATE_LIMIT_ERRORS += (GroqRateLimitError,)
+except ImportError:
+    pass
+
+# KEYS[1] bucket; ARGV: capacity, refill per second, now, tokens wanted.
+# Returns 0 when the tokens were taken, else the seconds until they will be there.
+TOKEN_BUCKET = redis_client.register_script("""
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local wanted = tonumber(ARGV[4])
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= wanted then
+    tokens = tokens - wanted
+else
+    wait = (wanted - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+""")
+
+# wording of throttling errors in messages (and transmeet's "Error: ..." strings) that
+# carry no status code; a bare 429 only counts next to "error"/"status", not inside
+# a file name, an id or a token count
+RATE_LIMIT_TEXT = re.compile(
+    r"\brate[ _-]?limit|\btoo many requests\b|\b(?:error|status)(?: code)?[:= ]+429\b",
+    re.IGNORECASE,
+)
+
+
+class RateLimited(RuntimeError):
+    """A provider request was throttled, locally or by the provider itself."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def bucket_key(kind, client):
+    return f"ratelimit:{kind}:{client}"
+
+
+def acquire(kind, client, tokens=1):
+    """Take tokens from the client's bucket; returns 0, or the seconds to wait for them."""
+    per_minute = RATE_LIMITS.get(kind, {}).get(client)
+    if not per_minute:
+        return 0
+    # a request for more than the bucket holds waits for a full bucket instead
+    tokens = min(tokens, per_minute)
+    wait = TOKEN_BUCKET(keys=[bucket_key(kind, client)], args=[per_minute, per_minute / 60, time.time(), tokens])
+    return float(wait)
+
+
+def throttle(kind, client, tokens=1, max_wait=RATE_LIMIT_MAX_WAIT):
+    """
+    Block until the client's bucket has tokens for this request. Raises
+    RateLimited when that would take longer than max_wait, so the task can
+    give its worker slot back and retry later.
+    """
+    waited = 0
+    while True:
+        wait = acquire(kind, client, tokens)
+        if not wait:
+            return
+        if waited + wait > max_wait:
+            raise RateLimited(f"{kind} rate limit for {client}: next slot in {wait:.0f}s", retry_after=wait)
+        time.sleep(wait)
+        waited += wait
+
+
+def status_code(error):
+    """HTTP status of a provider SDK error, on the exception or its response."""
+    code = getattr(error, 'status_code', None)
+    if code is None:
+        code = getattr(getattr(error, 'response', None), 'status_code', None)
+    return code
+
+
+def is_rate_limit_error(error):
+    """
+    True for a RateLimited, a provider SDK 429, or (for errors without a
+    status, like transmeet's "Error: ..." strings) a message about rate limits.
+    """
+    if isinstance(error, RateLimited) or isinstance(error, PROVIDER_RATE_LIMIT_ERRORS):
+        return True
+    code = status_code(error)
+    if isinstance(code, int):
+        return code == 429
+    return bool(RATE_LIMIT_TEXT.search(str(error)))
+
+
+def provider_error(message):
+    """Exception for an "Error: ..." result string, a RateLimited one when it is a 429."""
+    if is_rate_limit_error(message):
+        return RateLimited(message)
+    return RuntimeError(message)
+
+
+def retry_after(error):
+    """Seconds the provider (or our own bucket) asked us to wait, if it said."""
+    if getattr(error, 'retry_after', None):
+        return error.retry_after
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def backoff_seconds(retries, error=None):
+    """Exponential backoff with jitter, never shorter than what the provider asked for."""
+    ceiling = min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF * 2 ** retries)
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    return max(delay, retry_after(error) or 0)
@@ -0,0 +1,32 @@
+# cython: language_level=3
+import hashlib
+
+from src.config import redis_client, RENDER_CACHE_TTL
+from src.utils import RENDERER_VERSION, render_minutes_with_tailwind
+
+
+def render_cache_key(minutes_raw):
+    digest = hashlib.sha256(minutes_raw.encode('utf-8')).hexdigest()
+    return f"minutes_html:{RENDERER_VERSION}:{digest}"
+
+
+def get_cached_render(minutes_raw):
+    """Rendered HTML for this markdown and the current renderer, if already cached."""
+    cached = redis_client.get(render_cache_key(minutes_raw))
+    return cached.decode('utf-8') if cached is not None else None #type: ignore
+
+
+def render_minutes_cached(minutes_raw):
+    """Render minutes markdown, reusing the cached HTML when the same text was rendered before."""
+    html = get_cached_render(minutes_raw)
+    if html is None:
+        html = render_minutes_with_tailwind(minutes_raw)
+        redis_client.set(render_cache_key(minutes_raw), html, ex=RENDER_CACHE_TTL)
+    return html
+
+
+def store_rendered_minutes(file_record, minutes_raw):
+    """Set the markdown and its rendered HTML on a record, stamped with the renderer version."""
+    file_record.minutes_raw = minutes_raw
+    file_record.minutes = render_minutes_cached(minutes_raw)
+    file_record.minutes_render_version = RENDERER_VERSION
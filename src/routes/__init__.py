@@ -12,5 +12,8 @@ from . import (
     delete_routes,
     health_routes,
     home_routes,
-    mindmap_route
+    mindmap_route,
+    events_routes,
+    resumable_upload_routes,
+    metrics_routes
 )
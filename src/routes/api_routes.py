@@ -1,35 +1,124 @@
 # cython: language_level=3
+import base64
+import json
 from flask import jsonify
-from datetime import datetime
-from flask import request, jsonify
+import time
+from datetime import datetime, timedelta
+from flask import request, jsonify, url_for
+from src.celery_worker import celery, enqueue_file_job, issued_job_file, generate_minutes_task, generate_mindmap_task
+from src.config import FILES_PAGE_SIZE, FILES_MAX_PAGE_SIZE, SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE
+from src.dedup import get_dedup_stats
+from src.search import search
+from src.status_cache import index_page, member_position, get_docs, drop_from_index
 from src.models import TranscriptEntry, db
-from transmeet import generate_mind_map_from_transcript, generate_meeting_minutes_from_transcript
-from src.utils import render_minutes_with_tailwind
 from transmeet.utils.general_utils import get_logger
 from src.models import TranscriptEntry
 from . import audio_bp
 
 logger = get_logger(__name__)
 
+def encode_cursor(upload_time, file_id):
+    """Encode the (upload_time, id) keyset position of the last row of a page."""
+    payload = json.dumps([upload_time.isoformat(), file_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed."""
+    try:
+        upload_time, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(upload_time), str(file_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 @audio_bp.route('/api/files', methods=['GET'])
 def list_files():
-    files = TranscriptEntry.query.order_by(TranscriptEntry.upload_time.desc()).all()
-    return jsonify([{
-        'id': f.id,
-        'filename': f.filename,
-        'status': f.status,
-        'upload_time': f.upload_time.isoformat(),
-        'transcript_available': f.transcript is not None,
-        'minutes_available': f.minutes is not None,
-        'error_message': f.error_message,
-        'transcription_client': f.transcription_client,
-        'transcription_model': f.transcription_model,
-        'llm_client': f.llm_client,
-        'llm_model': f.llm_model,
-        'mind_map': f.mind_map is not None,
-        'topic': f.mind_map.get('Root Topic') if f.mind_map else None,
-
-    } for f in files])
+    """List files newest first, one keyset page at a time."""
+    limit = request.args.get('limit', FILES_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, FILES_MAX_PAGE_SIZE))
+
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    # the page comes from the Redis listing index, the rows from the status cache
+    members = index_page(limit + 1, after)
+    next_cursor = None
+    if len(members) > limit:
+        members = members[:limit]
+        next_cursor = encode_cursor(*member_position(members[-1]))
+
+    docs = get_docs([member_position(member)[1] for member in members])
+    drop_from_index([member for member, doc in zip(members, docs) if doc is None])
+    rows = [doc for doc in docs if doc is not None]
+
+    return jsonify({
+        'files': [{
+            'id': f['id'],
+            'filename': f['filename'],
+            'status': f['status'],
+            'upload_time': f['upload_time'],
+            'transcript_available': f['transcript_available'],
+            'minutes_available': f['minutes_available'],
+            'error_message': f['error_message'],
+            'transcription_client': f['transcription_client'],
+            'transcription_model': f['transcription_model'],
+            'llm_client': f['llm_client'],
+            'llm_model': f['llm_model'],
+            'mind_map': f['mind_map_available'],
+            'topic': f['mind_map_topic'],
+        } for f in rows],
+        'next_cursor': next_cursor,
+    })
+
+
+def parse_date(value, end=False):
+    """ISO date or datetime from a query string; a bare end date includes that whole day."""
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+@audio_bp.route('/api/search', methods=['GET'])
+def search_files():
+    """Ranked full-text matches in transcripts and minutes, with highlighted snippets."""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': "Missing 'q' parameter"}), 400
+
+    limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+    try:
+        date_from = parse_date(request.args['from']) if request.args.get('from') else None
+        date_to = parse_date(request.args['to'], end=True) if request.args.get('to') else None
+    except ValueError as e:
+        return jsonify({'error': f"Invalid date: {e}"}), 400
+
+    start = time.perf_counter()
+    results = search(query, limit, date_from, date_to, request.args.get('model') or None)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    return jsonify({
+        'query': query,
+        'results': [dict(
+            result,
+            upload_time=result['upload_time'].isoformat(),
+            view_url=url_for('audio.view_minutes', file_id=result['id']),
+        ) for result in results],
+        'took_ms': round(took_ms, 1),
+    })
+
+
+@audio_bp.route('/api/dedup/stats', methods=['GET'])
+def dedup_stats():
+    """Hit/miss counters of the upload dedup cache"""
+    return jsonify(get_dedup_stats())
 
 
 @audio_bp.route("/api/generate_mindmap", methods=["POST"])
@@ -50,28 +139,16 @@ def generate_mindmap_api():
     if not file_record:
         return jsonify({"error": f"No record found for id: {file_id}"}), 404
 
-    if file_record.mind_map:
+    if file_record.mind_map_available:
         return jsonify({"message": "Mind map already exists", "mind_map": file_record.mind_map}), 200
 
-    if not file_record.transcript:
+    if not file_record.transcript_available:
         return jsonify({"error": "Transcript not found for this file"}), 400
 
     if not llm_client or not llm_model:
         return jsonify({"error": "Missing 'llm_client' or 'llm_model' in request body"}), 400
 
-    # Generate the mind map
-    mindmap_data = generate_mind_map_from_transcript(
-        file_record.transcript,
-        llm_client=llm_client,
-        llm_model=llm_model
-    )
-
-    file_record.mind_map = mindmap_data
-    file_record.status = "completed"
-    file_record.completion_time = datetime.utcnow()
-    db.session.commit()
-
-    return jsonify({"message": "Mind map generated successfully", "mind_map": mindmap_data}), 200
+    return queued_job_response(generate_mindmap_task, 'mindmap', file_id, llm_client, llm_model)
 
 
 @audio_bp.route("/api/generate_meeting_minutes", methods=["POST"])
@@ -91,29 +168,42 @@ def generate_meeting_minutes_api():
     if not file_record:
         return jsonify({"error": f"No record found for id: {file_id}"}), 404
 
-    if file_record.minutes:
+    if file_record.minutes_available:
         return jsonify({"message": "Meeting minutes already exist", "minutes": file_record.minutes}), 200
     
-    if not file_record.transcript:
+    if not file_record.transcript_available:
         return jsonify({"error": "Transcript not found for this file"}), 400
 
     if not llm_client or not llm_model:
         return jsonify({"error": "Missing 'llm_client' or 'llm_model' in request body"}), 400
     
-    # Generate the meeting minutes
-    meeting_minutes_markdown = generate_meeting_minutes_from_transcript(
-        file_record.transcript,
-        llm_client=llm_client,
-        llm_model=llm_model
-    )
-    
-    # minutes_raw
-    meeting_minutes_html = render_minutes_with_tailwind(meeting_minutes_markdown)
-
-    file_record.minutes_raw = meeting_minutes_markdown
-    file_record.minutes = meeting_minutes_html
-    file_record.status = "completed"
-    file_record.completion_time = datetime.utcnow()
-    db.session.commit()
-    return jsonify({"message": "Meeting minutes generated successfully", "minutes": meeting_minutes_html}), 200
-
+    return queued_job_response(generate_minutes_task, 'minutes', file_id, llm_client, llm_model)
+
+
+def queued_job_response(task, kind, file_id, llm_client, llm_model):
+    """Queue (or join) the LLM job for a file and answer 202 Accepted with its id"""
+    job_id, created = enqueue_file_job(task, kind, file_id, llm_client, llm_model)
+    status_url = url_for('audio.job_status', job_id=job_id)
+    return jsonify({
+        "message": f"{kind} generation queued" if created else f"{kind} generation already in progress",
+        "job_id": job_id,
+        "status_url": status_url,
+    }), 202, {"Location": status_url}
+
+
+@audio_bp.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """State of a queued minutes/mind map job"""
+    # Celery reports PENDING for any id it has no result for, including made-up
+    # and expired ones; only ids this app issued are looked up
+    file_id = issued_job_file(job_id)
+    if file_id is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+
+    result = celery.AsyncResult(job_id)
+    response = {"job_id": job_id, "file_id": file_id, "state": result.state}
+    if result.state == "SUCCESS":
+        response["result"] = result.result
+    elif result.state == "FAILURE":
+        response["error"] = str(result.result)
+    return jsonify(response)
@@ -2,8 +2,13 @@
 import os
 from flask import jsonify
 
-from src.config import redis_client
+from src.audio_preprocessing import remove_normalized_audio
+from src.dedup import is_file_shared
+from src.events import publish_file_event
 from src.models import db, TranscriptEntry
+from src.search import remove_entry
+from src.status_cache import uncache_entry
+from src.transcription import remove_chunks
 from . import audio_bp
 
 
@@ -13,11 +18,17 @@ def delete_file(file_id):
     if not file:
         return jsonify({'error': 'File not found'}), 404
 
-    if os.path.exists(file.file_path):
+    # deduplicated uploads share one stored file
+    if os.path.exists(file.file_path) and not is_file_shared(file.file_path, file_id):
         os.remove(file.file_path)
+        remove_normalized_audio(file.file_path)
+    remove_chunks(file_id)
 
-    redis_client.delete(f"file:{file_id}:progress")
+    remove_entry(file_id)
+    upload_time = file.upload_time
     db.session.delete(file)
     db.session.commit()
+    uncache_entry(file_id, upload_time)
+    publish_file_event(file_id, deleted=True)
 
     return jsonify({'success': True})
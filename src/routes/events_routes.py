@@ -0,0 +1,36 @@
+# cython: language_level=3
+import queue
+from flask import Response, stream_with_context
+
+from src.config import EVENTS_HEARTBEAT_SECONDS
+from src.events import event_hub
+from src.models import db
+from . import audio_bp
+
+
+@audio_bp.route('/api/events', methods=['GET'])
+def file_events():
+    """Server-Sent Events stream of status and progress changes for all files."""
+    # the stream outlives the request's need for a DB connection
+    db.session.remove()
+
+    def stream():
+        with event_hub.subscribe() as events:
+            # tell EventSource how long to wait before reconnecting
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    data = events.get(timeout=EVENTS_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # comment line keeps proxies from closing an idle connection
+                    yield ': keep-alive\n\n'
+                    continue
+                if data is None:
+                    return
+                yield f"data: {data}\n\n"
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
@@ -1,7 +1,6 @@
 # cython: language_level=3
 from flask import render_template
 
-from src.models import TranscriptEntry
 from . import audio_bp
 
 import json
@@ -22,8 +21,9 @@ llm_model_list = list(llm_model_to_client.keys())
 
 @audio_bp.route('/', methods=['GET'])
 def index():
-    files = TranscriptEntry.query.order_by(TranscriptEntry.upload_time.desc()).all()
-    return render_template('index.html', files=files,         transcription_model_to_client=transcription_model_to_client,
+    # the file list is fetched page by page from /api/files by the dashboard
+    return render_template('index.html',
+        transcription_model_to_client=transcription_model_to_client,
         llm_model_to_client=llm_model_to_client,
         transcription_model_list=transcription_model_list,
         llm_model_list=llm_model_list)
@@ -0,0 +1,32 @@
+# cython: language_level=3
+from flask import Response
+
+from src.config import redis_client, QUEUE_SHORT, QUEUE_LONG, QUEUE_LLM
+from src.dedup import get_dedup_stats
+from src.metrics import render_histograms
+from . import audio_bp
+
+
+@audio_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint: stage latency histograms, queue depths and dedup counters."""
+    lines = render_histograms()
+
+    queues = (QUEUE_SHORT, QUEUE_LONG, QUEUE_LLM)
+    pipe = redis_client.pipeline(transaction=False)
+    for queue in queues:
+        pipe.llen(queue)
+    lines += [
+        "# HELP speak2summary_queue_length Tasks waiting in each Celery queue.",
+        "# TYPE speak2summary_queue_length gauge",
+    ]
+    lines += [f'speak2summary_queue_length{{queue="{queue}"}} {length}' for queue, length in zip(queues, pipe.execute())]
+
+    dedup = get_dedup_stats()
+    lines += [
+        "# HELP speak2summary_dedup_lookups_total Uploads checked against already transcribed audio.",
+        "# TYPE speak2summary_dedup_lookups_total counter",
+        f'speak2summary_dedup_lookups_total{{result="hit"}} {dedup["hits"]}',
+        f'speak2summary_dedup_lookups_total{{result="miss"}} {dedup["misses"]}',
+    ]
+    return Response("\n".join(lines) + "\n", content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,21 +1,17 @@
 # cython: language_level=3
-import uuid
 import json
 import os
-from datetime import datetime
-from flask import render_template, request
-from src.models import TranscriptEntry, db
-from transmeet import generate_mind_map_from_transcript
+import hashlib
+from flask import render_template, request, make_response
+from src.config import redis_client, RENDER_CACHE_TTL
+from src.celery_worker import enqueue_file_job, generate_mindmap_task
+from src.models import TranscriptEntry
 from transmeet.utils.general_utils import get_logger
 
 logger = get_logger(__name__)
 
 from . import audio_bp
 
-def generate_id():
-    """Generate a short UUID for node identification"""
-    return str(uuid.uuid4())[:8]
-
 def load_mindmap(file_path):
     """Load mind map data from JSON file with error handling"""
     try:
@@ -30,34 +26,51 @@ def load_mindmap(file_path):
         logger.error(f"Error loading mind map data: {e}")
         return {"Root Topic": "Error Loading Mind Map"}
 
-def convert_to_jsmind(data):
-    """Convert dictionary data structure to jsMind format with metadata and styling"""
-    root_id = generate_id()
+# Bump when convert_to_jsmind changes its output so memoized conversions are dropped
+JSMIND_CONVERTER_VERSION = 2
+
+# Colors for different levels
+LEVEL_COLORS = [
+    {"bg": "#06b6d4", "fg": "#ffffff"},  # Level 1
+    {"bg": "#0ea5e9", "fg": "#ffffff"},  # Level 2
+    {"bg": "#3b82f6", "fg": "#ffffff"},  # Level 3
+    {"bg": "#6366f1", "fg": "#ffffff"},  # Level 4
+    {"bg": "#8b5cf6", "fg": "#ffffff"},  # Level 5
+]
 
+def node_id(path):
+    """Stable node id derived from the node's index path in the tree"""
+    return "n-" + "-".join(str(i) for i in path)
+
+def convert_to_jsmind(data, created_at=None):
+    """
+    Convert dictionary data structure to jsMind format with metadata and styling.
+    The input is not modified and the same input always gives the same output.
+    """
     # check if there is a root topic, if not, check if there is only one key and all there are subtopics
-    if "Root Topic" not in data:
-        if len(data) == 1 and isinstance(list(data.values())[0], dict):
-            data["Root Topic"] = list(data.keys())[0]
-            # make the subtopic at same level as the root topic
-            data[data["Root Topic"]] = data.pop(list(data.keys())[0])
-        else:
-            data["Root Topic"] = "Mind Map"
+    if "Root Topic" in data:
+        root_topic = data["Root Topic"]
+    elif len(data) == 1 and isinstance(list(data.values())[0], dict):
+        root_topic = list(data.keys())[0]
+    else:
+        root_topic = "Mind Map"
+
+    root_id = "root"
 
-    
     # Create the base jsMind structure
     jsmind = {
         "meta": {
-            "name": data.get("Root Topic", "Mind Map"),
+            "name": root_topic,
             "author": "Speak2Summary",
             "version": "1.0",
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S") if created_at else "unknown"
         },
         "format": "node_array",
         "data": [
             {
-                "id": root_id, 
-                "isroot": True, 
-                "topic": data.get("Root Topic", "Mind Map"),
+                "id": root_id,
+                "isroot": True,
+                "topic": root_topic,
                 "direction": "right",
                 "expanded": True,
                 "background-color": "#2563eb",
@@ -65,63 +78,73 @@ def convert_to_jsmind(data):
             }
         ]
     }
-    
-    # Colors for different levels
-    level_colors = [
-        {"bg": "#06b6d4", "fg": "#ffffff"},  # Level 1
-        {"bg": "#0ea5e9", "fg": "#ffffff"},  # Level 2
-        {"bg": "#3b82f6", "fg": "#ffffff"},  # Level 3
-        {"bg": "#6366f1", "fg": "#ffffff"},  # Level 4
-        {"bg": "#8b5cf6", "fg": "#ffffff"},  # Level 5
-    ]
-    
-    def add_nodes(parent_id, children, level=0):
-        """Recursively add nodes to the jsMind structure with styling based on level"""
-        if not isinstance(children, dict):
-            return
-        
-        for k, v in children.items():
-            if k == "Root Topic":
-                continue
-                
-            child_id = generate_id()
-            color_index = min(level, len(level_colors)-1)
-            
-            # Create node with styling
-            node = {
-                "id": child_id, 
-                "parentid": parent_id, 
-                "topic": k,
-                "expanded": False,  # Default to collapsed
-                "background-color": level_colors[color_index]["bg"],
-                "foreground-color": level_colors[color_index]["fg"]
-            }
-            
-            # Add direction to first-level nodes
-            if level == 0:
-                # Alternate left/right for better layout
-                direction = "right" if len(jsmind["data"]) % 2 == 0 else "left"
-                node["direction"] = direction
-                
-            jsmind["data"].append(node)
-            
-            if isinstance(v, dict):
-                add_nodes(child_id, v, level + 1)
-            elif isinstance(v, list):
-                for item in v:
-                    leaf_id = generate_id()
-                    leaf_color_index = min(level + 1, len(level_colors)-1)
-                    jsmind["data"].append({
-                        "id": leaf_id, 
-                        "parentid": child_id, 
-                        "topic": item,
-                        "background-color": level_colors[leaf_color_index]["bg"],
-                        "foreground-color": level_colors[leaf_color_index]["fg"]
-                    })
-    
-    add_nodes(root_id, data)
+    nodes = jsmind["data"]
+
+    # Depth-first, pre-order walk; a stack of (parent id, children iterator, level, path)
+    # replaces the recursion so deep maps cannot hit the recursion limit
+    stack = [(root_id, iter(enumerate(data.items())), 0, ())]
+    while stack:
+        parent_id, children, level, path = stack[-1]
+        entry = next(children, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        index, (k, v) = entry
+        if k == "Root Topic":
+            continue
+
+        child_path = path + (index,)
+        child_id = node_id(child_path)
+        color = LEVEL_COLORS[min(level, len(LEVEL_COLORS) - 1)]
+
+        # Create node with styling
+        node = {
+            "id": child_id,
+            "parentid": parent_id,
+            "topic": k,
+            "expanded": False,  # Default to collapsed
+            "background-color": color["bg"],
+            "foreground-color": color["fg"]
+        }
+
+        # Alternate first-level nodes left/right for better layout
+        if level == 0:
+            node["direction"] = "right" if len(nodes) % 2 == 0 else "left"
+
+        nodes.append(node)
+
+        if isinstance(v, dict):
+            stack.append((child_id, iter(enumerate(v.items())), level + 1, child_path))
+        elif isinstance(v, list):
+            leaf_color = LEVEL_COLORS[min(level + 1, len(LEVEL_COLORS) - 1)]
+            for leaf_index, item in enumerate(v):
+                nodes.append({
+                    "id": node_id(child_path + (leaf_index,)),
+                    "parentid": child_id,
+                    "topic": item,
+                    "background-color": leaf_color["bg"],
+                    "foreground-color": leaf_color["fg"]
+                })
+
     return jsmind
 
+def convert_to_jsmind_cached(file_record, created_at=None):
+    """
+    convert_to_jsmind memoized in Redis by the digest of the stored mind map, so a
+    hit never decompresses the artifact; only created_at is per record
+    """
+    key = f"jsmind:v{JSMIND_CONVERTER_VERSION}:{file_record.artifact_digest('mind_map')}"
+    cached = redis_client.get(key)
+    if cached is not None:
+        jsmind = json.loads(cached) #type: ignore
+    else:
+        jsmind = convert_to_jsmind(file_record.mind_map)
+        redis_client.set(key, json.dumps(jsmind), ex=RENDER_CACHE_TTL)
+
+    if created_at:
+        jsmind["meta"]["created_at"] = created_at.strftime("%Y-%m-%d %H:%M:%S")
+    return jsmind
 
 @audio_bp.route("/mindmap", methods=["GET"])
 def mindmap():
@@ -136,42 +159,39 @@ def mindmap():
     if not file_record:
         return f"No record found for id: {file_id}", 404
 
-    if file_record.mind_map:
-        # Load mind map from JSON
-        mindmap_data = file_record.mind_map
-        jsmind_data = convert_to_jsmind(mindmap_data)
+    if file_record.mind_map_available:
+        created_at = file_record.completion_time or file_record.upload_time
         filename = file_record.filename
-        
+
+        # the page only changes with the mind map, the filename or the converter
+        etag = hashlib.sha256(
+            f"{JSMIND_CONVERTER_VERSION}:{file_record.artifact_digest('mind_map')}:{file_id}:{filename}:{created_at}".encode('utf-8')
+        ).hexdigest()[:32]
+        if request.if_none_match.contains(etag):
+            response = make_response("", 304)
+            response.set_etag(etag)
+            return response
+
+        jsmind_data = convert_to_jsmind_cached(file_record, created_at)
         root_title = jsmind_data.get("meta", {}).get("name", "Mind Map")
 
-        return render_template("mindmap.html", 
+        response = make_response(render_template("mindmap.html", 
                                jsmind_data=json.dumps(jsmind_data),
                                map_title=root_title,
                                filename=filename,
                                file_id=file_id,
                                creator_name = jsmind_data.get("meta", {}).get("author", "unknown"),
                                creation_date = jsmind_data.get("meta", {}).get("created_at", "unknown"),
-        )
+        ))
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     else:
-        transcript = file_record.transcript
-
-        mindmap_data = generate_mind_map_from_transcript(
-            transcript,
-            llm_client=file_record.llm_client,
-            llm_model=file_record.llm_model
-        )
-        file_record.mind_map = mindmap_data
-        file_record.status = "completed"
-        file_record.completion_time = datetime.utcnow()
-        db.session.commit()
-        
-
-        jsmind_data = convert_to_jsmind(mindmap_data)
-        root_title = jsmind_data.get("meta", {}).get("name", "Mind Map")
-        return render_template("mindmap.html", 
-                               jsmind_data=json.dumps(jsmind_data),
-                                 map_title=root_title,
-                                 filename=file_record.filename,
-                                    creator_name = jsmind_data.get("meta", {}).get("author", "unknown"),
-                                    creation_date = jsmind_data.get("meta", {}).get("created_at", "unknown"),
-        )
+        if not file_record.transcript_available:
+            return "Transcript not found for this file", 400
+        if not file_record.llm_client or not file_record.llm_model:
+            return "No LLM selected for this file, generate the mind map from the dashboard", 400
+
+        # generation can outlast the request timeout, so it runs in the worker
+        enqueue_file_job(generate_mindmap_task, 'mindmap', file_id, file_record.llm_client, file_record.llm_model)
+        return "Mind map is being generated, refresh this page in a moment", 202, {"Refresh": "5"}
@@ -0,0 +1,199 @@
+# cython: language_level=3
+import os
+import uuid
+from flask import request, jsonify, url_for
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.utils import secure_filename
+
+from src.config import app, redis_client, UPLOAD_BLOCK_SIZE
+from src.models import db, TranscriptEntry
+from src.status_cache import uncache_entry
+from src.upload_sessions import session_key, session_files, is_finalized, touch_session, forget_session, remove_session_files
+from transmeet.utils.general_utils import get_logger
+from .upload_routes import queue_audio_upload, is_audio_member
+
+logger = get_logger(__name__)
+
+from . import audio_bp
+
+# Resumable uploads follow the tus protocol loosely: create a session, PATCH
+# byte ranges at the committed offset, then finalize once every byte arrived.
+# Bytes are written straight into the final upload path, so there is no
+# temporary copy, and the offset is committed after every block so a dropped
+# connection resumes where it stopped. Finalize does not read the file again:
+# the worker hashes it for the dedup lookup. Partial files of sessions that
+# expire are removed by the worker's periodic sweep.
+
+
+def load_session(upload_id):
+    session = redis_client.hgetall(session_key(upload_id))
+    if not session:
+        return None
+    session = {k.decode('utf-8'): v.decode('utf-8') for k, v in session.items()} #type: ignore
+    session['offset'] = int(session['offset'])
+    session['length'] = int(session['length'])
+    return session
+
+
+def offset_headers(session):
+    return {
+        'Upload-Offset': str(session['offset']),
+        'Upload-Length': str(session['length']),
+        'Cache-Control': 'no-store',
+    }
+
+
+@audio_bp.route('/uploads', methods=['POST'])
+def create_upload():
+    """Open a resumable upload session and allocate its file in the upload folder"""
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(data.get('filename', ''))
+    length = data.get('length')
+
+    if not filename:
+        return jsonify({'error': "Missing 'filename' in request body"}), 400
+    if not isinstance(length, int) or length <= 0:
+        return jsonify({'error': "'length' must be a positive integer"}), 400
+    if length > app.config['MAX_CONTENT_LENGTH']:
+        return jsonify({'error': f"Upload exceeds the {app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)} MB limit"}), 413
+    if not is_audio_member(filename):
+        return jsonify({'error': f"Unsupported audio file type: {filename}"}), 400
+
+    upload_id = str(uuid.uuid4())
+    path = os.path.join(app.config['UPLOAD_FOLDER'], f"{upload_id}_{filename}")
+    open(path, 'wb').close()
+
+    redis_client.hset(session_key(upload_id), mapping={
+        'path': path,
+        'filename': filename,
+        'length': length,
+        'offset': 0,
+        'transcription_client': data.get('transcription-client') or '',
+        'transcription_model': data.get('transcription-model') or '',
+    })
+    touch_session(upload_id)
+
+    location = url_for('audio.upload_offset', upload_id=upload_id)
+    return jsonify({'id': upload_id, 'offset': 0, 'location': location}), 201, {'Location': location}
+
+
+@audio_bp.route('/uploads/<upload_id>', methods=['HEAD', 'GET'])
+def upload_offset(upload_id):
+    """Report the committed offset so a client can resume"""
+    session = load_session(upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify({'id': upload_id, 'offset': session['offset'], 'length': session['length']}), 200, offset_headers(session)
+
+
+@audio_bp.route('/uploads/<upload_id>', methods=['PATCH'])
+def upload_range(upload_id):
+    """Append bytes at the committed offset"""
+    session = load_session(upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'Missing Upload-Offset header'}), 400
+
+    # one writer per session, otherwise two PATCHes could interleave their bytes
+    lock_key = f"{session_key(upload_id)}:lock"
+    if not redis_client.set(lock_key, 1, nx=True, ex=60):
+        return jsonify({'error': 'Upload is busy'}), 423
+
+    try:
+        # read under the lock: a PATCH that just released it may have moved the offset
+        session = load_session(upload_id)
+        if not session:
+            return jsonify({'error': 'Upload not found'}), 404
+        if offset != session['offset']:
+            return jsonify({'error': 'Offset mismatch', 'offset': session['offset']}), 409, offset_headers(session)
+
+        with open(session['path'], 'r+b') as out:
+            out.seek(offset)
+            while True:
+                block = request.stream.read(UPLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                if offset + len(block) > session['length']:
+                    return jsonify({'error': 'Upload exceeds declared length'}), 413, offset_headers(session)
+                out.write(block)
+                out.flush()
+                offset += len(block)
+                session['offset'] = offset
+                redis_client.hset(session_key(upload_id), 'offset', offset)
+                redis_client.expire(lock_key, 60)
+    except ClientDisconnected:
+        logger.info(f"Upload {upload_id} interrupted at offset {offset}")
+    finally:
+        redis_client.delete(lock_key)
+        if session:
+            touch_session(upload_id)
+
+    return '', 204, offset_headers(session)
+
+
+@audio_bp.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Hand a fully received upload over to the transcription queue"""
+    session = load_session(upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+    if session['offset'] != session['length']:
+        return jsonify({'error': 'Upload incomplete', 'offset': session['offset']}), 409, offset_headers(session)
+
+    # the claim makes a retried finalize a no-op instead of a second queue entry
+    if is_finalized(upload_id) or not redis_client.hsetnx(session_key(upload_id), 'finalized', 1):
+        return jsonify({'error': 'Upload already finalized'}), 409
+
+    try:
+        # no content hash yet: the worker hashes the file before transcribing it
+        result = queue_audio_upload(
+            upload_id,
+            session['filename'],
+            session['path'],
+            None,
+            session['transcription_client'] or None,
+            session['transcription_model'] or None,
+        )
+    except Exception as e:
+        # nothing was queued: release the claim so the client can retry or abort
+        logger.error(f"Could not queue upload {upload_id}: {e}")
+        discard_unqueued_entry(upload_id)
+        redis_client.hdel(session_key(upload_id), 'finalized')
+        return jsonify({'error': 'Could not queue the upload, try again'}), 503
+
+    forget_session(upload_id)
+    return jsonify(result)
+
+
+def discard_unqueued_entry(upload_id):
+    """Remove the entry of a failed finalize whose job never reached the broker."""
+    db.session.rollback()
+    entry = db.session.get(TranscriptEntry, upload_id)
+    if entry is None or entry.status != 'queued':
+        return
+    upload_time = entry.upload_time
+    db.session.delete(entry)
+    db.session.commit()
+    uncache_entry(upload_id, upload_time)
+
+
+@audio_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    """Abandon an upload and remove its partial file, also after its session expired"""
+    try:
+        upload_id = str(uuid.UUID(upload_id))
+    except ValueError:
+        return jsonify({'error': 'Upload not found'}), 404
+
+    session = load_session(upload_id)
+    if (session and session.get('finalized')) or is_finalized(upload_id):
+        return jsonify({'error': 'Upload already finalized'}), 409
+    if not session and not session_files(upload_id):
+        return jsonify({'error': 'Upload not found'}), 404
+
+    remove_session_files(upload_id)
+    forget_session(upload_id)
+    return jsonify({'success': True})
@@ -1,32 +1,52 @@
 # cython: language_level=3
-from flask import jsonify, url_for
+from flask import request, jsonify, url_for
 
-from src.config import redis_client
-from src.models import TranscriptEntry
+from src.config import STATUS_MAX_IDS
+from src.status_cache import get_docs
 from . import audio_bp
 
 
+def status_response(file_record):
+    response = {
+        'id': file_record['id'],
+        'filename': file_record['filename'],
+        'status': file_record['status'],
+        'progress': file_record['progress'],
+        'error': file_record['error_message'],
+        'transcript_available': file_record['transcript_available'],
+        'minutes_available': file_record['minutes_available'],
+        'upload_time': file_record['upload_time'],
+    }
+
+    if file_record['status'] == 'completed':
+        response['view_url'] = url_for('audio.view_minutes', file_id=file_record['id'])
+
+    return response
+
+
 @audio_bp.route('/status/<file_id>', methods=['GET'])
 def status(file_id):
-    file_record = TranscriptEntry.query.get(file_id)
+    file_record, = get_docs([file_id])
     if not file_record:
         return jsonify({'error': 'File not found'}), 404
 
-    progress = redis_client.get(f"file:{file_id}:progress")
-    progress_value = int(progress) if progress else 0 #type: ignore
+    return jsonify(status_response(file_record))
 
-    response = {
-        'id': file_record.id,
-        'filename': file_record.filename,
-        'status': file_record.status,
-        'progress': progress_value,
-        'error': file_record.error_message,
-        'transcript_available': file_record.transcript is not None,
-        'minutes_available': file_record.minutes is not None,
-        'upload_time': file_record.upload_time.isoformat(),
-    }
 
-    if file_record.status == 'completed':
-        response['view_url'] = url_for('audio.view_minutes', file_id=file_record.id)
+@audio_bp.route('/api/status', methods=['POST'])
+def batch_status():
+    """Status of many files in one request: {"ids": [...]} -> {"files": [...], "missing": [...]}."""
+    data = request.get_json(silent=True) or {}
+    file_ids = data.get('ids')
+    if not isinstance(file_ids, list) or not all(isinstance(file_id, str) for file_id in file_ids):
+        return jsonify({'error': 'Expected a JSON body {"ids": [...]} with a list of file IDs'}), 400
+    if len(file_ids) > STATUS_MAX_IDS:
+        return jsonify({'error': f'At most {STATUS_MAX_IDS} IDs per request'}), 400
 
-    return jsonify(response)
+    # one pipeline for the cached documents and progress, one IN query for the misses
+    file_ids = list(dict.fromkeys(file_ids))
+    records = get_docs(file_ids)
+    return jsonify({
+        'files': [status_response(record) for record in records if record],
+        'missing': [file_id for file_id, record in zip(file_ids, records) if not record],
+    })
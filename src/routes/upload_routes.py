@@ -2,55 +2,151 @@
 
 import os
 import uuid
+import hashlib
+import tarfile
+import zipfile
+from datetime import datetime
 from venv import logger
 from flask import request, jsonify
 from werkzeug.utils import secure_filename
+from celery import group
 
 from src.models import db, TranscriptEntry
-from src.celery_worker import process_audio_file, process_transcript_file
-from src.config import app
+from src.celery_worker import process_audio_file, process_transcript_file, estimated_audio_queue
+from src.config import app, UPLOAD_BLOCK_SIZE, AUDIO_EXTENSIONS, MAX_ARCHIVE_UNPACKED
+from src.dedup import find_cached_transcripts, load_transcript_artifacts
+from src.events import publish_file_event, publish_file_events
+from src.extractors import is_extractable
+from src.search import index_entry, copy_entry_document
+from src.status_cache import entry_doc, cache_docs, cache_entries
 from transmeet.utils.general_utils import get_logger
 
 logger  = get_logger(__name__)
 
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
 from . import audio_bp
 
-def save_file(file, tracking_id):
-    filename = secure_filename(file.filename)
+class ArchiveTooLarge(Exception):
+    pass
+
+
+def save_stream(stream, filename, tracking_id, max_bytes=None):
+    """
+    Save a stream block by block, hashing it on the way to disk. Returns
+    (path, size, sha256); raises ArchiveTooLarge once more than max_bytes arrive.
+    """
     unique_name = f"{tracking_id}_{filename}"
     path = os.path.join(app.config['UPLOAD_FOLDER'], unique_name)
-    file.save(path)
-    return path, filename
-
-def extract_text_from_file(file, ext):
-    if ext == '.txt':
-        return file.read().decode('utf-8')
-    elif ext == '.py':
-        return file.read().decode('utf-8')
-    elif ext == '.md':
-        return file.read().decode('utf-8')
-    elif ext == '.pdf':
-        from PyPDF2 import PdfReader
-        reader = PdfReader(file)
-        return "\n".join([page.extract_text() for page in reader.pages])
-
-    else:
-        raise ValueError("Unsupported file type")
-
-
-def create_audio_file_entry(tracking_id, original_filename, filepath, t_client, t_model):
-    new_file = TranscriptEntry(
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, 'wb') as out:
+            for block in iter(lambda: stream.read(UPLOAD_BLOCK_SIZE), b''):
+                size += len(block)
+                if max_bytes is not None and size > max_bytes:
+                    raise ArchiveTooLarge(f"Archive unpacks to more than {max_bytes // (1024 * 1024)} MB")
+                digest.update(block)
+                out.write(block)
+    except Exception:
+        # a partial file (too large, client gone, disk full) is never kept
+        os.remove(path)
+        raise
+    return path, size, digest.hexdigest()
+
+def save_file(file, tracking_id):
+    """Save an upload block by block, hashing it on the way to disk."""
+    filename = secure_filename(file.filename)
+    path, _, content_hash = save_stream(file.stream, filename, tracking_id)
+    return path, filename, content_hash
+
+
+def is_archive(filename):
+    return filename.lower().endswith(ARCHIVE_SUFFIXES)
+
+def iter_archive_members(file):
+    """
+    Yield (name, stream) for every audio file in an uploaded zip or tar archive.
+    Tar archives, compressed or not, are read as a stream straight from the
+    request; zip needs its central directory, so werkzeug's spooled copy is used.
+    """
+    if file.filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(file.stream) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and is_audio_member(info.filename):
+                    with archive.open(info) as member:
+                        yield info.filename, member
+        return
+
+    with tarfile.open(fileobj=file.stream, mode='r|*') as archive:
+        for info in archive:
+            if info.isfile() and is_audio_member(info.name):
+                yield info.name, archive.extractfile(info)
+
+def is_audio_member(name):
+    parts = name.replace('\\', '/').split('/')
+    basename = parts[-1]
+    # skip hidden files and the macOS resource forks Finder puts under __MACOSX/
+    if basename.startswith('.') or '__MACOSX' in parts:
+        return False
+    return os.path.splitext(basename)[1].lower() in AUDIO_EXTENSIONS
+
+def save_archive(file):
+    """
+    Unpack the audio files of an archive into the upload folder. Returns a list of
+    (tracking_id, filename, path, content_hash); on any error nothing is left behind.
+    """
+    saved = []
+    remaining = MAX_ARCHIVE_UNPACKED
+    try:
+        for name, stream in iter_archive_members(file):
+            filename = secure_filename(os.path.basename(name))
+            if not filename:
+                continue
+            tracking_id = str(uuid.uuid4())
+            path, size, content_hash = save_stream(stream, filename, tracking_id, max_bytes=remaining)
+            remaining -= size
+            saved.append((tracking_id, filename, path, content_hash))
+    except Exception:
+        for _, _, path, _ in saved:
+            os.remove(path)
+        raise
+    return saved
+
+def new_audio_file_entry(tracking_id, original_filename, filepath, t_client, t_model, content_hash=None):
+    return TranscriptEntry(
         id=tracking_id, #type: ignore
         filename=original_filename, #type: ignore
         file_path=filepath, #type: ignore
         status="queued", #type: ignore
         transcription_client=t_client, #type: ignore
         transcription_model=t_model, #type: ignore
+        content_hash=content_hash, #type: ignore
     )
-    db.session.add(new_file)
-    db.session.commit()
 
-def create_text_file_entry(tracking_id, original_filename, filepath, llm_client, llm_model, transcription):
+def new_deduplicated_entry(tracking_id, original_filename, cached_entry, transcript_artifact):
+    """
+    A completed entry that shares the stored audio file of a duplicate. Its
+    transcript is a second artifact row: the duplicate's compressed bytes are
+    written again as they are, without being decompressed and compressed again.
+    """
+    entry = TranscriptEntry(
+        id=tracking_id, #type: ignore
+        filename=original_filename, #type: ignore
+        file_path=cached_entry.file_path, #type: ignore
+        status="completed", #type: ignore
+        completion_time=datetime.utcnow(), #type: ignore
+        transcription_client=cached_entry.transcription_client, #type: ignore
+        transcription_model=cached_entry.transcription_model, #type: ignore
+        content_hash=cached_entry.content_hash, #type: ignore
+        transcript_available=True, #type: ignore
+    )
+    entry.artifacts['transcript'] = transcript_artifact.copy()
+    return entry
+
+def create_text_file_entry(tracking_id, original_filename, filepath, llm_client, llm_model, transcription=None):
+    """A queued transcript entry: pasted text, or an uploaded file the worker extracts the text of."""
     new_file = TranscriptEntry(
         id=tracking_id, #type: ignore
         filename=original_filename, #type: ignore
@@ -61,33 +157,111 @@ def create_text_file_entry(tracking_id, original_filename, filepath, llm_client,
         transcript=transcription #type: ignore
     )
     db.session.add(new_file)
+    if transcription is not None:
+        index_entry(new_file, 'transcript')
+    db.session.commit()
+    cache_entries([new_file])
+    publish_file_event(tracking_id, status='queued')
+
+def queue_audio_uploads(uploads, t_client, t_model):
+    """
+    Register saved audio uploads, given as (tracking_id, filename, path, content_hash),
+    in one transaction and queue them as a single Celery group; duplicates of audio
+    already transcribed with the same model are answered from the dedup cache.
+    """
+    # a resumable upload comes without a hash; the worker hashes it and looks it up then
+    content_hashes = [content_hash for *_, content_hash in uploads if content_hash]
+    cached = find_cached_transcripts(content_hashes, t_client, t_model) if content_hashes else {}
+    transcripts = load_transcript_artifacts(cached.values()) if cached else {}
+
+    results, entries, jobs, events = [], [], [], []
+    for tracking_id, original_name, filepath, content_hash in uploads:
+        cached_entry = cached.get(content_hash)
+        if cached_entry and cached_entry.id in transcripts:
+            entry = new_deduplicated_entry(tracking_id, original_name, cached_entry, transcripts[cached_entry.id])
+            result = {'id': tracking_id, 'filename': original_name, 'status': 'completed',
+                      'deduplicated_from': cached_entry.id}
+        else:
+            entry = new_audio_file_entry(tracking_id, original_name, filepath, t_client, t_model, content_hash)
+            jobs.append(process_audio_file.s(tracking_id, filepath, t_client, t_model).set(queue=estimated_audio_queue(filepath))) #type: ignore
+            result = {'id': tracking_id, 'filename': original_name, 'status': 'queued'}
+        entries.append(entry)
+        events.append((tracking_id, {'status': result['status']}))
+        results.append(result)
+
+    db.session.add_all(entries)
+    for (_, _, _, content_hash), entry in zip(uploads, entries):
+        if entry.status == 'completed':
+            # the duplicate's indexed text is copied in the database, never decompressed here
+            copy_entry_document(cached[content_hash].id, entry.id, 'transcript')
+    # flushed values (upload_time) are read before the commit expires them
+    db.session.flush()
+    docs = [entry_doc(entry) for entry in entries]
     db.session.commit()
+    cache_docs(docs)
+
+    # Same audio already transcribed with this model: keep one copy on disk
+    for (_, _, filepath, _), entry in zip(uploads, entries):
+        if entry.status == 'completed' and os.path.exists(filepath):
+            os.remove(filepath)
+
+    publish_file_events(events)
+    if jobs:
+        # one producer connection for the whole batch instead of one per file
+        group(jobs).apply_async()
+    return results
+
+def queue_audio_upload(tracking_id, original_name, filepath, content_hash, t_client, t_model):
+    """Register a single saved audio upload and queue it, or answer it from the dedup cache."""
+    return queue_audio_uploads([(tracking_id, original_name, filepath, content_hash)], t_client, t_model)[0]
 
 
 @audio_bp.route('/upload', methods=['POST'])
 def upload():
-    if 'audio' not in request.files:
-        return jsonify({'error': 'No file part'}), 400
-
-    uploaded_files = request.files.getlist('audio')
+    """
+    Upload any number of recordings as 'audio' and/or zip/tar archives of
+    recordings as 'archive'. Everything in the request is registered in one
+    transaction and queued as one batch.
+    """
+    uploaded_files = [f for f in request.files.getlist('audio') if f.filename]
+    archives = [f for f in request.files.getlist('archive') if f.filename]
     t_client = request.form.get('transcription-client')
     t_model = request.form.get('transcription-model')
 
-    if not uploaded_files or uploaded_files[0].filename == '':
+    if not uploaded_files and not archives:
         return jsonify({'error': 'No selected file'}), 400
 
-    results = []
-    for file in uploaded_files:
-        tracking_id = str(uuid.uuid4())
-        filepath, original_name = save_file(file, tracking_id)
-        create_audio_file_entry(tracking_id, original_name, filepath, t_client, t_model)
-        process_audio_file.delay(tracking_id, filepath, t_client, t_model) #type: ignore
-        results.append({
-            'id': tracking_id,
-            'filename': original_name,
-            'status': 'queued'
-        })
+    uploads, sources = [], []
+    try:
+        for file in uploaded_files:
+            tracking_id = str(uuid.uuid4())
+            filepath, original_name, content_hash = save_file(file, tracking_id)
+            uploads.append((tracking_id, original_name, filepath, content_hash))
+            sources.append(None)
+
+        for archive in archives:
+            if not is_archive(archive.filename):
+                raise ValueError(f"Unsupported archive type: {archive.filename}")
+            members = save_archive(archive)
+            uploads.extend(members)
+            sources.extend([secure_filename(archive.filename)] * len(members))
+    except Exception as e:
+        # nothing of a failed request stays on disk, whatever the failure
+        for _, _, filepath, _ in uploads:
+            os.remove(filepath)
+        if not isinstance(e, (ArchiveTooLarge, ValueError, zipfile.BadZipFile, tarfile.TarError)):
+            raise
+        logger.error(f"Rejected bulk upload: {e}")
+        status = 413 if isinstance(e, ArchiveTooLarge) else 400
+        return jsonify({'error': str(e)}), status
+
+    if not uploads:
+        return jsonify({'error': 'No audio files found in the upload'}), 400
 
+    results = queue_audio_uploads(uploads, t_client, t_model)
+    for result, source in zip(results, sources):
+        if source:
+            result['archive'] = source
     return jsonify(results)
 
 #process_transcript_file(self, file_id, transcription_content, llm_client, llm_model):
@@ -116,25 +290,14 @@ def upload_transcript():
         if not file:
             continue
 
-        filename = secure_filename(file.filename) #type: ignore
-        ext = os.path.splitext(filename)[1].lower()
-        allowed_exts = {'.txt', '.py', '.md', '.pdf', '.docx', '.doc'}
-
-        if ext not in allowed_exts:
-            continue  # skip disallowed files
-
-        # Extract text content
-        try:
-            content = extract_text_from_file(file, ext)  # Your utility to read file contents
-        except Exception as e:
-            logger.error(f"Error reading {filename}: {e}")
-            continue
-
-        if not content.strip():
-            continue
+        if not is_extractable(secure_filename(file.filename)): #type: ignore
+            continue  # skip unsupported files (.doc among them)
 
+        # Saved as uploaded; the worker extracts the text, so a large PDF never
+        # ties up (or fills the memory of) a web worker
         tracking_id = str(uuid.uuid4())
-        create_text_file_entry(tracking_id, filename, '', llm_client, llm_model, content)
+        filepath, filename, _ = save_file(file, tracking_id)
+        create_text_file_entry(tracking_id, filename, filepath, llm_client, llm_model)
         process_transcript_file.delay(tracking_id) #type: ignore
         processed_ids.append({'id': tracking_id, 'source': 'file', 'filename': filename})
 
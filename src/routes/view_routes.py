@@ -1,13 +1,22 @@
 # cython: language_level=3
 from flask import render_template
 
-from src.models import TranscriptEntry
+from src.celery_worker import enqueue_file_job, rerender_minutes
+from src.models import db, TranscriptEntry, Artifact
+from src.utils import RENDERER_VERSION
 from . import audio_bp
 
 @audio_bp.route('/view/<file_id>', methods=['GET'])
 def view_minutes(file_id):
-    file = TranscriptEntry.query.get(file_id)
+    # the only page that shows every artifact body: load them all in one query
+    file = TranscriptEntry.query.options(
+        db.selectinload(TranscriptEntry.artifacts).undefer(Artifact.data)
+    ).get(file_id)
     if not file or file.status != 'completed':
         return render_template('error.html', message="File not found or processing not complete"), 404
 
+    # never render on the request path: serve the stored HTML and refresh it in the background
+    if file.minutes_raw and file.minutes_render_version != RENDERER_VERSION:
+        enqueue_file_job(rerender_minutes, 'render', file_id)
+
     return render_template('view.html', file=file)
@@ -0,0 +1,188 @@
+# cython: language_level=3
+"""
+Micro-benchmark of the single-pass minutes renderer against the previous
+multi-pass pipeline, on a generated minutes document of roughly N pages.
+
+    python -m src.scripts.bench_render --pages 50 --repeat 5
+
+Outputs are compared after normalizing what the old pipeline left
+nondeterministic: class order (it went through a set) and section ids
+(it used id() of the heading).
+"""
+import re
+import time
+import argparse
+
+from markdown import markdown
+from bs4 import BeautifulSoup
+
+from src.utils import TAG_STYLES, HEADING_TAGS, render_minutes_with_tailwind, style_minutes_tree
+
+
+# ---------- previous pipeline, kept as the reference ----------
+
+def legacy_wrap_collapsible_sections(soup):
+    for heading in soup.find_all(HEADING_TAGS):
+        level = int(heading.name[1])
+        toggle_id = f"section-{id(heading)}"
+        content_div = soup.new_tag("div", id=toggle_id, **{"class": "collapsible-content"})
+
+        sibling = heading.find_next_sibling()
+        while sibling:
+            if sibling.name in HEADING_TAGS and int(sibling.name[1]) <= level:
+                break
+            next_sibling = sibling.find_next_sibling()
+            content_div.append(sibling.extract())
+            sibling = next_sibling
+
+        if content_div.contents:
+            heading.insert_after(content_div)
+            toggle_button = soup.new_tag(
+                "button",
+                **{
+                    'class': 'toggle-button text-indigo-700 text-xl font-bold ml-2 focus:outline-none',
+                    'onclick': f"toggleContent('{toggle_id}', this)"
+                }
+            )
+            toggle_button.string = '+'
+            heading.append(toggle_button)
+
+
+def legacy_apply_tailwind_classes(soup):
+    for tag_name, classes in TAG_STYLES.items():
+        for el in soup.find_all(tag_name):
+            if tag_name == 'code' and el.parent.name == 'pre':
+                continue
+            existing_classes = el.get('class', [])
+            el['class'] = list(set(existing_classes + classes.split()))
+            if tag_name == 'a':
+                el['target'] = '_blank'
+                el['rel'] = 'noopener noreferrer'
+
+
+def legacy_handle_special_formatting(soup):
+    for code in soup.find_all('code'):
+        if code.parent.name != 'pre':
+            code['class'] = TAG_STYLES['code'].split()
+
+
+def legacy_group_labelled_list_items(soup):
+    for ul in soup.find_all(['ul', 'ol']):
+        li_list = ul.find_all('li', recursive=False)
+        i = 0
+        while i < len(li_list):
+            li = li_list[i]
+            if li.get_text(strip=True).endswith(':') and (not li.find('ul')):
+                sub_ul = soup.new_tag('ul')
+                j = i + 1
+                while j < len(li_list):
+                    next_li = li_list[j]
+                    if (next_li.find('strong', recursive=False) or
+                        next_li.get_text(strip=True).endswith(':')):
+                        break
+                    sub_ul.append(next_li.extract())
+                    li_list.pop(j)
+                if sub_ul.contents:
+                    li.append(sub_ul)
+            i += 1
+
+
+def legacy_style_minutes_tree(soup):
+    legacy_group_labelled_list_items(soup)
+    legacy_wrap_collapsible_sections(soup)
+    legacy_handle_special_formatting(soup)
+    legacy_apply_tailwind_classes(soup)
+
+
+def legacy_render_minutes_with_tailwind(md_text):
+    html = markdown(md_text, extensions=['fenced_code', 'codehilite', 'tables', 'nl2br', 'extra'])
+    soup = BeautifulSoup(html, 'html.parser')
+    legacy_style_minutes_tree(soup)
+    return str(soup)
+
+
+# ---------- fixtures ----------
+
+def make_minutes(pages):
+    """Minutes markdown shaped like the LLM output, about one page per section."""
+    parts = ["## 📝 Meeting Minutes\n",
+             "- **Meeting Title**: *Quarterly planning*",
+             "- **Participants**: Alice, Bob, Carol\n"]
+    for n in range(pages):
+        parts.append(f"## 📌 Topic {n}\n")
+        parts.append(f"Discussion of item {n} with a [link](https://example.com/{n}) and `inline_code()`.\n")
+        parts.append(f"### Details {n}\n")
+        parts.append("- Decisions:")
+        parts.extend(f"- ✔️ decision {n}.{k} agreed by the team" for k in range(6))
+        parts.append("- **Owner**: Bob")
+        parts.append("- Risks:")
+        parts.extend(f"- risk {n}.{k}" for k in range(4))
+        parts.append("")
+        parts.append("| Task | Assignee | Deadline | Notes |")
+        parts.append("|------|----------|----------|-------|")
+        parts.extend(f"| task {n}.{k} | Carol | TBD | none |" for k in range(5))
+        parts.append("")
+        parts.append(f"> “A memorable quote number {n}”  \n> — **Alice**\n")
+        parts.append("```python\nprint('hello')\n```\n")
+        parts.append("---\n")
+    return "\n".join(parts)
+
+
+def normalize(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    section_ids = {}
+    for el in soup.find_all(True):
+        if el.get('class'):
+            el['class'] = sorted(el['class'])
+        if el.get('id', '').startswith('section-'):
+            section_ids[el['id']] = f"section-{len(section_ids)}"
+    html = str(soup)
+    return re.sub(r"section-\d+", lambda m: section_ids.get(m.group(0), m.group(0)), html)
+
+
+def best_of(func, md_text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(md_text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def best_of_tree_pass(func, html, repeat):
+    """Time only the post-processing of an already parsed document."""
+    timings = []
+    for _ in range(repeat):
+        soup = BeautifulSoup(html, 'html.parser')
+        start = time.perf_counter()
+        func(soup)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    md_text = make_minutes(args.pages)
+    identical = normalize(legacy_render_minutes_with_tailwind(md_text)) == normalize(render_minutes_with_tailwind(md_text))
+
+    legacy = best_of(legacy_render_minutes_with_tailwind, md_text, args.repeat)
+    single = best_of(render_minutes_with_tailwind, md_text, args.repeat)
+
+    html = markdown(md_text, extensions=['fenced_code', 'codehilite', 'tables', 'nl2br', 'extra'])
+    legacy_tree = best_of_tree_pass(legacy_style_minutes_tree, html, args.repeat)
+    single_tree = best_of_tree_pass(style_minutes_tree, html, args.repeat)
+
+    print(f"document: {args.pages} pages, {len(md_text) / 1024:.0f} KB markdown")
+    print(f"end to end   multi-pass:  {legacy * 1000:8.1f} ms")
+    print(f"end to end   single-pass: {single * 1000:8.1f} ms  ({legacy / single:.2f}x)")
+    print(f"tree passes  multi-pass:  {legacy_tree * 1000:8.1f} ms")
+    print(f"tree passes  single-pass: {single_tree * 1000:8.1f} ms  ({legacy_tree / single_tree:.2f}x)")
+    print(f"identical output (normalized): {identical}")
+
+
+if __name__ == "__main__":
+    main()
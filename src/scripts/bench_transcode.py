@@ -0,0 +1,108 @@
+# cython: language_level=3
+"""
+Bytes and provider chunks saved by transcoding uploads to mono 16 kHz before
+transcription. Needs ffmpeg/ffprobe on the PATH.
+
+    python -m src.scripts.bench_transcode meeting.wav [more files...]
+    python -m src.scripts.bench_transcode --synthetic-minutes 60
+
+Chunk counts follow transmeet: audio is decoded and split by the size of its
+raw PCM, and every chunk is uploaded as a WAV of that size.
+"""
+import os
+import json
+import math
+import time
+import wave
+import argparse
+import tempfile
+import subprocess
+
+import numpy as np
+
+from src.audio_preprocessing import TRANSCODE_FORMATS, normalized_audio_path, transcode_audio
+from src.transcription import get_chunk_size_mb
+
+PROVIDERS = ['groq', 'openai']
+
+
+def probe(path):
+    """Sample rate, channels, sample width in bytes and duration of the first audio stream."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0",
+         "-show_entries", "stream=sample_rate,channels,sample_fmt:format=duration",
+         "-of", "json", path],
+        capture_output=True, check=True,
+    )
+    info = json.loads(result.stdout)
+    stream = info["streams"][0]
+    # pydub decodes 8/16/32-bit PCM as is and everything else to 16-bit
+    width = {'u8': 1, 's16': 2, 's16p': 2, 's32': 4, 's32p': 4}.get(stream.get("sample_fmt"), 2)
+    return int(stream["sample_rate"]), int(stream["channels"]), width, float(info["format"]["duration"])
+
+
+def raw_pcm_mb(path):
+    sample_rate, channels, width, duration = probe(path)
+    return sample_rate * channels * width * duration / (1024 * 1024), (sample_rate, channels, duration)
+
+
+def chunk_count(raw_mb, provider):
+    return max(1, math.ceil(raw_mb / get_chunk_size_mb(provider)))
+
+
+def make_synthetic_wav(path, minutes, sample_rate=48000):
+    """Stereo 48 kHz speech-band tone plus noise, written a minute at a time."""
+    rng = np.random.default_rng(0)
+    t = np.arange(sample_rate * 60) / sample_rate
+    with wave.open(path, "wb") as out:
+        out.setnchannels(2)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        for _ in range(minutes):
+            tone = 6000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 800, t.size)
+            frames = np.repeat(tone.astype("<i2")[:, None], 2, axis=1)
+            out.writeframes(frames.tobytes())
+
+
+def report(path, fmt, out_dir):
+    output_path = os.path.join(out_dir, os.path.basename(normalized_audio_path(path, fmt)))
+    start = time.perf_counter()
+    transcode_audio(path, output_path, fmt)
+    elapsed = time.perf_counter() - start
+
+    before_mb, (rate, channels, duration) = raw_pcm_mb(path)
+    after_mb, (new_rate, new_channels, _) = raw_pcm_mb(output_path)
+    file_before = os.path.getsize(path) / (1024 * 1024)
+    file_after = os.path.getsize(output_path) / (1024 * 1024)
+
+    print(f"{os.path.basename(path)}: {duration / 60:.1f} min, {rate} Hz x{channels} -> {new_rate} Hz x{new_channels} {fmt}")
+    print(f"  transcode time:   {elapsed:8.1f} s")
+    print(f"  stored file:      {file_before:8.1f} MB -> {file_after:8.1f} MB  ({file_before / file_after:.1f}x)")
+    print(f"  decoded / upload: {before_mb:8.1f} MB -> {after_mb:8.1f} MB  ({before_mb / after_mb:.1f}x)")
+    for provider in PROVIDERS:
+        before, after = chunk_count(before_mb, provider), chunk_count(after_mb, provider)
+        print(f"  {provider} chunks: {before:>8} -> {after:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--format', choices=sorted(TRANSCODE_FORMATS), default='flac')
+    parser.add_argument('--synthetic-minutes', type=int, default=0,
+                        help="also benchmark a generated 48 kHz stereo WAV of this length")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = list(args.files)
+        if args.synthetic_minutes:
+            synthetic = os.path.join(tmp, f"synthetic_{args.synthetic_minutes}min.wav")
+            make_synthetic_wav(synthetic, args.synthetic_minutes)
+            files.append(synthetic)
+        if not files:
+            parser.error("pass audio files or --synthetic-minutes")
+        for path in files:
+            report(path, args.format, tmp)
+
+
+if __name__ == "__main__":
+    main()
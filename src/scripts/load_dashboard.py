@@ -0,0 +1,141 @@
+# cython: language_level=3
+"""
+Load test of the web tier with simulated dashboard clients. Each client does
+what an open dashboard does: keeps the /api/events SSE stream open, reloads
+the file list and polls the status of files every few seconds.
+
+    python -m src.scripts.load_dashboard --url http://localhost:5000 --clients 50,200,500,1000
+
+Run it once against `WEB_WORKER_CLASS=gthread` and once against the default
+gevent workers to compare. For every step it reports how many clients kept
+their stream open, request latency percentiles and errors; a step where
+clients fail to connect or p95 explodes is past what the container serves.
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import json
+import time
+import argparse
+import http.client
+from urllib.parse import urlsplit
+
+import gevent
+from gevent.event import Event
+from gevent.pool import Pool
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.streams_open = 0
+        self.stream_failures = 0
+        self.events = 0
+
+
+def connection(url, timeout):
+    parts = urlsplit(url)
+    return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+
+
+def timed_get(conn, path, stats):
+    start = time.perf_counter()
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        body = response.read()
+        if response.status >= 400:
+            stats.errors += 1
+            return None
+        stats.latencies.append(time.perf_counter() - start)
+        return body
+    except Exception:
+        stats.errors += 1
+        conn.close()
+        return None
+
+
+def follow_events(url, stats, stop, timeout):
+    """Hold an SSE connection open and count what arrives on it."""
+    conn = connection(url, timeout)
+    try:
+        conn.request('GET', '/api/events', headers={'Accept': 'text/event-stream'})
+        response = conn.getresponse()
+        if response.status != 200:
+            stats.stream_failures += 1
+            return
+        stats.streams_open += 1
+        while not stop.is_set():
+            line = response.fp.readline()
+            if not line:
+                break
+            if line.startswith(b'data:'):
+                stats.events += 1
+        stats.streams_open -= 1
+    except Exception:
+        stats.stream_failures += 1
+    finally:
+        conn.close()
+
+
+def dashboard_client(url, stats, stop, poll_seconds, status_polls, timeout):
+    stream = gevent.spawn(follow_events, url, stats, stop, timeout)
+    conn = connection(url, timeout)
+    while not stop.is_set():
+        body = timed_get(conn, '/api/files?limit=50', stats)
+        files = json.loads(body).get('files', []) if body else []
+        for file in files[:status_polls]:
+            timed_get(conn, f"/status/{file['id']}", stats)
+        stop.wait(poll_seconds)
+    conn.close()
+    stream.kill()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_step(url, clients, duration, poll_seconds, status_polls, timeout):
+    stats = Stats()
+    stop = Event()
+    pool = Pool(clients)
+    for _ in range(clients):
+        pool.spawn(dashboard_client, url, stats, stop, poll_seconds, status_polls, timeout)
+
+    gevent.sleep(duration)
+    streams_open = stats.streams_open
+    stop.set()
+    pool.join(timeout=timeout)
+    pool.kill()
+
+    print(
+        f"{clients:>6} {streams_open:>8} {stats.stream_failures:>8} {len(stats.latencies) / duration:>8.1f} "
+        f"{percentile(stats.latencies, 0.5) * 1000:>8.1f} {percentile(stats.latencies, 0.95) * 1000:>8.1f} "
+        f"{percentile(stats.latencies, 0.99) * 1000:>8.1f} {stats.errors:>7} {stats.events:>7}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', default='50,200,500,1000', help='comma-separated client counts, one step each')
+    parser.add_argument('--duration', type=float, default=30, help='seconds per step')
+    parser.add_argument('--poll-seconds', type=float, default=3, help='dashboard refresh interval')
+    parser.add_argument('--status-polls', type=int, default=5, help='status requests per refresh')
+    parser.add_argument('--timeout', type=float, default=30)
+    args = parser.parse_args()
+
+    print(f"{'clients':>6} {'streams':>8} {'refused':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7} {'events':>7}")
+    for clients in (int(value) for value in args.clients.split(',')):
+        run_step(args.url, clients, args.duration, args.poll_seconds, args.status_polls, args.timeout)
+        # let the server close the previous step's connections
+        gevent.sleep(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+# cython: language_level=3
+"""
+Full-text index over transcripts and minutes. SQLite uses an FTS5 table,
+Postgres a tsvector column with a GIN index; both are kept up to date by the
+code that stores a transcript or minutes, in the same transaction.
+"""
+import re
+from html import escape
+
+from sqlalchemy import text, bindparam
+
+from src.models import db
+
+# documents kept in the index, by the artifact they are built from
+SEARCH_KINDS = {'transcript': 'transcript', 'minutes': 'minutes_raw'}
+
+# tables owned by the search index, not by the SQLAlchemy models
+SEARCH_TABLE_PREFIXES = ('search_index', 'search_document')
+
+SNIPPET_TOKENS = 16
+# control characters mark the matches, so the snippet can be escaped before highlighting
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def is_search_table(name):
+    return name.startswith(SEARCH_TABLE_PREFIXES)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Alembic autogenerate filter: the search tables are written by hand in migrations."""
+    table = object if type_ == 'table' else getattr(object, 'table', None)
+    return table is None or not is_search_table(table.name)
+
+
+def dialect():
+    return db.session.get_bind().dialect.name
+
+
+def index_document(entry_id, kind, body):
+    """Replace the indexed text of one document; a body of None only removes it."""
+    if dialect() == 'postgresql':
+        db.session.execute(text("DELETE FROM search_document WHERE entry_id = :entry_id AND kind = :kind"),
+                           {'entry_id': entry_id, 'kind': kind})
+        if body:
+            db.session.execute(text("INSERT INTO search_document (entry_id, kind, body) VALUES (:entry_id, :kind, :body)"),
+                               {'entry_id': entry_id, 'kind': kind, 'body': body})
+        return
+
+    db.session.execute(text("DELETE FROM search_index WHERE entry_id = :entry_id AND kind = :kind"),
+                       {'entry_id': entry_id, 'kind': kind})
+    if body:
+        db.session.execute(text("INSERT INTO search_index (entry_id, kind, body) VALUES (:entry_id, :kind, :body)"),
+                           {'entry_id': entry_id, 'kind': kind, 'body': body})
+
+
+def index_entry(file_record, *kinds):
+    """(Re)index the given kinds of an entry from its current artifacts; call before commit."""
+    # the entry row must exist first where the index references it (Postgres)
+    db.session.flush()
+    for kind in kinds or SEARCH_KINDS:
+        index_document(file_record.id, kind, getattr(file_record, SEARCH_KINDS[kind]))
+
+
+def copy_entry_document(source_id, entry_id, kind):
+    """Index an entry with the document already indexed for another entry, without reading its artifact."""
+    table = 'search_document' if dialect() == 'postgresql' else 'search_index'
+    db.session.flush()
+    db.session.execute(text(
+        f"INSERT INTO {table} (entry_id, kind, body) "
+        f"SELECT :entry_id, kind, body FROM {table} WHERE entry_id = :source_id AND kind = :kind"
+    ), {'entry_id': entry_id, 'source_id': source_id, 'kind': kind})
+
+
+def remove_entry(entry_id):
+    table = 'search_document' if dialect() == 'postgresql' else 'search_index'
+    db.session.execute(text(f"DELETE FROM {table} WHERE entry_id = :entry_id"), {'entry_id': entry_id})
+
+
+def fts5_query(query):
+    """User input as an FTS5 query: every word must appear, the last one as a prefix."""
+    tokens = TOKEN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlight(snippet):
+    return escape(snippet or '').replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+def search(query, limit=20, date_from=None, date_to=None, model=None):
+    """
+    Ranked matches, best first, as dicts with entry id, filename, kind, upload
+    time, score and an HTML snippet with <mark>ed matches. date_from/date_to
+    bound the upload time and model matches the transcription or LLM model.
+    """
+    filters, params = [], {'limit': limit}
+    if date_from:
+        filters.append("t.upload_time >= :date_from")
+        params['date_from'] = date_from
+    if date_to:
+        filters.append("t.upload_time < :date_to")
+        params['date_to'] = date_to
+    if model:
+        filters.append("(t.transcription_model = :model OR t.llm_model = :model)")
+        params['model'] = model
+    where = ''.join(f" AND {f}" for f in filters)
+
+    if dialect() == 'postgresql':
+        params['query'] = query
+        # rank on the index first; ts_headline re-parses the body, so only for the page returned
+        sql = f"""
+            SELECT m.entry_id, m.kind, m.score, m.filename, m.upload_time,
+                   ts_headline('english', m.body, m.tsq,
+                               'StartSel="{MATCH_START}", StopSel="{MATCH_END}", MaxWords=35, MinWords=15') AS snippet
+            FROM (
+                SELECT d.entry_id, d.kind, d.body, q.tsq, ts_rank_cd(d.tsv, q.tsq) AS score,
+                       t.filename, t.upload_time
+                FROM search_document d
+                CROSS JOIN websearch_to_tsquery('english', :query) AS q(tsq)
+                JOIN transcription t ON t.id = d.entry_id
+                WHERE d.tsv @@ q.tsq{where}
+                ORDER BY score DESC
+                LIMIT :limit
+            ) m
+            ORDER BY m.score DESC
+        """
+    else:
+        params['query'] = fts5_query(query)
+        if params['query'] is None:
+            return []
+        sql = f"""
+            SELECT s.entry_id, s.kind, -bm25(search_index) AS score, t.filename, t.upload_time,
+                   snippet(search_index, 2, '{MATCH_START}', '{MATCH_END}', '…', {SNIPPET_TOKENS}) AS snippet
+            FROM search_index s
+            JOIN transcription t ON t.id = s.entry_id
+            WHERE search_index MATCH :query{where}
+            ORDER BY bm25(search_index)
+            LIMIT :limit
+        """
+
+    # typed binds so dates compare the way the DateTime column stores them
+    dates = [bindparam(name, type_=db.DateTime) for name in ('date_from', 'date_to') if name in params]
+    statement = text(sql).bindparams(*dates).columns(upload_time=db.DateTime)
+    rows = db.session.execute(statement, params).all()
+    return [{
+        'id': row.entry_id,
+        'kind': row.kind,
+        'filename': row.filename,
+        'upload_time': row.upload_time,
+        'score': round(float(row.score), 4),
+        'snippet': highlight(row.snippet),
+    } for row in rows]
@@ -0,0 +1,155 @@
+# cython: language_level=3
+"""
+Read-through cache of the status documents the dashboard polls. The scalar
+columns of each entry live in a Redis hash (file:{id}:doc) that the worker
+rewrites at every state change, and the routes read the documents of all
+visible files in one pipeline; only a miss goes to the database. The listing
+order is a sorted set of "{upload_time}|{id}" members, so a keyset page is a
+single ZREVRANGEBYLEX.
+"""
+import json
+from datetime import datetime
+
+from src.config import redis_client, STATUS_CACHE_TTL
+from src.models import TranscriptEntry
+
+INDEX_KEY = "files:index"
+# set once the index holds every entry; without it the index is rebuilt from the database
+INDEX_READY_KEY = "files:index:ready"
+INDEX_REBUILD_BATCH = 1000
+# fixed width, so members sort like (upload_time, id)
+INDEX_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+DOC_FIELDS = (
+    'id',
+    'filename',
+    'status',
+    'upload_time',
+    'error_message',
+    'transcription_client',
+    'transcription_model',
+    'llm_client',
+    'llm_model',
+    'transcript_available',
+    'minutes_available',
+    'mind_map_available',
+    'mind_map_topic',
+)
+FLAG_FIELDS = ('transcript_available', 'minutes_available', 'mind_map_available')
+
+
+def doc_key(file_id):
+    return f"file:{file_id}:doc"
+
+
+def progress_key(file_id):
+    return f"file:{file_id}:progress"
+
+
+def doc_columns():
+    """Columns of a status document; the artifact bodies are never read."""
+    return tuple(getattr(TranscriptEntry, field) for field in DOC_FIELDS)
+
+
+def index_member(upload_time, file_id):
+    return f"{upload_time.strftime(INDEX_TIME_FORMAT)}|{file_id}"
+
+
+def member_position(member):
+    """(upload_time, id) of an index member, the keyset position of its entry."""
+    upload_time, file_id = member.decode('utf-8').split('|', 1)
+    return datetime.strptime(upload_time, INDEX_TIME_FORMAT), file_id
+
+
+def entry_doc(entry):
+    """Status document of an entry, or of a row selected with doc_columns()."""
+    doc = {field: getattr(entry, field) for field in DOC_FIELDS}
+    doc['upload_time'] = entry.upload_time.isoformat()
+    for flag in FLAG_FIELDS:
+        doc[flag] = bool(doc[flag])
+    return doc
+
+
+def cache_docs(docs):
+    """Store status documents and add their entries to the listing index."""
+    pipe = redis_client.pipeline(transaction=False)
+    for doc in docs:
+        pipe.hset(doc_key(doc['id']), mapping={field: json.dumps(value) for field, value in doc.items()})
+        pipe.expire(doc_key(doc['id']), STATUS_CACHE_TTL)
+        pipe.zadd(INDEX_KEY, {index_member(datetime.fromisoformat(doc['upload_time']), doc['id']): 0})
+    pipe.execute()
+
+
+def cache_entries(entries):
+    """Refresh the cached documents of entries, after their changes are committed."""
+    cache_docs([entry_doc(entry) for entry in entries])
+
+
+def uncache_entry(file_id, upload_time):
+    """Drop a deleted entry's document, progress and place in the listing."""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.delete(doc_key(file_id), progress_key(file_id))
+    pipe.zrem(INDEX_KEY, index_member(upload_time, file_id))
+    pipe.execute()
+
+
+def get_docs(file_ids):
+    """
+    Documents of file_ids, in order, each with its progress; None for an id
+    with no entry. Documents not in Redis are loaded in one query and cached.
+    """
+    if not file_ids:
+        return []
+    pipe = redis_client.pipeline(transaction=False)
+    for file_id in file_ids:
+        pipe.hmget(doc_key(file_id), DOC_FIELDS)
+    pipe.mget([progress_key(file_id) for file_id in file_ids])
+    *cached, progress = pipe.execute()
+
+    docs = {}
+    for file_id, values in zip(file_ids, cached):
+        if values[0] is not None:
+            docs[file_id] = {field: json.loads(value) if value is not None else None
+                             for field, value in zip(DOC_FIELDS, values)}
+
+    misses = [file_id for file_id in file_ids if file_id not in docs]
+    if misses:
+        rows = TranscriptEntry.query.with_entities(*doc_columns()).filter(TranscriptEntry.id.in_(misses)).all()
+        loaded = [entry_doc(row) for row in rows]
+        cache_docs(loaded)
+        docs.update((doc['id'], doc) for doc in loaded)
+
+    results = []
+    for file_id, value in zip(file_ids, progress):
+        doc = docs.get(file_id)
+        if doc is not None:
+            doc = {**doc, 'progress': int(value) if value else 0}
+        results.append(doc)
+    return results
+
+
+def ensure_index():
+    """Rebuild the listing index from the database if Redis lost it (or never had it)."""
+    if redis_client.exists(INDEX_READY_KEY):
+        return
+    rows = TranscriptEntry.query.with_entities(TranscriptEntry.id, TranscriptEntry.upload_time)
+    pipe = redis_client.pipeline(transaction=False)
+    for count, row in enumerate(rows.yield_per(INDEX_REBUILD_BATCH), 1):
+        pipe.zadd(INDEX_KEY, {index_member(row.upload_time, row.id): 0})
+        if count % INDEX_REBUILD_BATCH == 0:
+            pipe.execute()
+    pipe.set(INDEX_READY_KEY, 1)
+    pipe.execute()
+
+
+def index_page(limit, after=None):
+    """Up to limit index members, newest first, after the (upload_time, id) position `after`."""
+    ensure_index()
+    upper = f"({index_member(*after)}" if after else '+'
+    return redis_client.zrevrangebylex(INDEX_KEY, upper, '-', start=0, num=limit)
+
+
+def drop_from_index(members):
+    """Remove members whose entry no longer exists, e.g. one deleted during an index rebuild."""
+    if members:
+        redis_client.zrem(INDEX_KEY, *members)
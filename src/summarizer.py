@@ -0,0 +1,212 @@
+# cython: language_level=3
+import re
+import hashlib
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+from transmeet import generate_meeting_minutes_from_transcript, generate_mind_map_from_transcript
+from transmeet.processor import get_client
+from transmeet.utils.general_utils import get_logger
+
+from src.config import (
+    redis_client,
+    SUMMARIZATION_BACKEND,
+    SUMMARY_MAX_PROMPT_TOKENS,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_MAX_WORKERS,
+    SUMMARY_CHUNK_CACHE_TTL,
+)
+from src.metrics import timed
+from src.rate_limit import throttle
+
+logger = get_logger(__name__)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+# Bump when MAP_PROMPT changes so cached chunk summaries are not reused
+MAP_PROMPT_VERSION = 1
+MAP_PROMPT = (
+    "You are summarizing one part of a longer meeting transcript. Write a dense bullet-point "
+    "summary of this part only. Keep every participant name, decision, action item (with owner "
+    "and deadline), number, product or tool name, and notable quote verbatim. Do not add a title "
+    "or any commentary."
+)
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def normalize_transcript(text):
+    """
+    Pasted or extracted text cleaned up before it is summarized and indexed:
+    NFC, Unix line endings, no control characters, trailing spaces or runs of
+    blank lines.
+    """
+    text = unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n')
+    text = CONTROL_CHARS.sub('', text)
+    text = '\n'.join(line.rstrip() for line in text.split('\n'))
+    return BLANK_LINES.sub('\n\n', text).strip()
+
+
+def count_tokens(text):
+    """Token count of text, estimated at ~4 characters per token without tiktoken."""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def split_units(text, max_tokens):
+    """Break text into pieces no larger than max_tokens: paragraphs, then sentences, then words."""
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            yield paragraph
+            continue
+        for sentence in SENTENCE_END.split(paragraph):
+            if count_tokens(sentence) <= max_tokens:
+                yield sentence
+                continue
+            # a single run-on "sentence" (common in raw transcripts): fall back to words
+            words = sentence.split()
+            step = max(1, len(words) * max_tokens // count_tokens(sentence))
+            start = 0
+            while start < len(words):
+                piece = " ".join(words[start:start + step])
+                # the step assumes words of even size; shrink it for a piece that still doesn't fit
+                while step > 1 and count_tokens(piece) > max_tokens:
+                    step = max(1, min(step - 1, step * max_tokens // count_tokens(piece)))
+                    piece = " ".join(words[start:start + step])
+                yield piece
+                start += step
+
+
+def split_transcript(text, max_tokens=SUMMARY_CHUNK_TOKENS):
+    """Pack paragraphs/sentences greedily into chunks of at most max_tokens tokens."""
+    chunks, current, current_tokens = [], [], 0
+    for unit in split_units(text, max_tokens):
+        unit_tokens = count_tokens(unit)
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def summarize_with_provider(chunk, llm_client, llm_model):
+    client, error = get_client(llm_client)
+    if error:
+        raise RuntimeError(error)
+    throttle('llm', llm_client)
+    response = client.chat.completions.create( #type: ignore
+        model=llm_model,
+        messages=[
+            {"role": "system", "content": MAP_PROMPT},
+            {"role": "user", "content": chunk},
+        ],
+        temperature=0.2,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def summarize_with_fake(chunk, llm_client, llm_model):
+    """Deterministic stand-in for an LLM: the first sentence of every paragraph."""
+    lines = [SENTENCE_END.split(p.strip().lstrip('- '))[0] for p in chunk.split("\n\n") if p.strip()]
+    return "\n".join(f"- {line}" for line in lines)
+
+
+def minutes_with_fake(transcript, llm_client, llm_model):
+    return "## 📝 Meeting Minutes\n\n" + summarize_with_fake(transcript, llm_client, llm_model)
+
+
+def mind_map_with_fake(transcript, llm_client, llm_model):
+    points = summarize_with_fake(transcript, llm_client, llm_model).splitlines()
+    return {"Root Topic": "Meeting", "Summary": [point[2:] for point in points]}
+
+
+def minutes_with_provider(transcript, llm_client, llm_model):
+    throttle('llm', llm_client)
+    return generate_meeting_minutes_from_transcript(transcript, llm_client=llm_client, llm_model=llm_model)
+
+
+def mind_map_with_provider(transcript, llm_client, llm_model):
+    throttle('llm', llm_client)
+    return generate_mind_map_from_transcript(transcript, llm_client=llm_client, llm_model=llm_model)
+
+
+# backend name -> (map, minutes reduce, mind map reduce)
+SUMMARIZATION_BACKENDS = {
+    'provider': (summarize_with_provider, minutes_with_provider, mind_map_with_provider),
+    'fake': (summarize_with_fake, minutes_with_fake, mind_map_with_fake),
+}
+
+
+def get_backend(backend=None):
+    backend = backend or SUMMARIZATION_BACKEND
+    if backend not in SUMMARIZATION_BACKENDS:
+        raise ValueError(f"Unsupported summarization backend: {backend}")
+    return SUMMARIZATION_BACKENDS[backend]
+
+
+def chunk_cache_key(chunk, llm_model):
+    digest = hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+    return f"summary:chunk:v{MAP_PROMPT_VERSION}:{llm_model}:{digest}"
+
+
+def summarize_chunk(chunk, llm_client, llm_model, backend=None):
+    """Map step for one chunk, cached by chunk hash so any reduce prompt can reuse it."""
+    key = chunk_cache_key(chunk, llm_model)
+    cached = redis_client.get(key)
+    if cached is not None:
+        return cached.decode('utf-8') #type: ignore
+
+    with timed('llm_map_chunk', model=llm_model):
+        summary = get_backend(backend)[0](chunk, llm_client, llm_model)
+    redis_client.set(key, summary, ex=SUMMARY_CHUNK_CACHE_TTL)
+    return summary
+
+
+def condense_transcript(transcript, llm_client, llm_model, backend=None):
+    """
+    Shrink a transcript until it fits in one prompt. Chunks are summarized in
+    parallel (bounded by MAX_WORKERS) and, if the joined summaries are still too
+    long, the summaries are summarized again.
+    """
+    text = transcript
+    level = 0
+    while count_tokens(text) > SUMMARY_MAX_PROMPT_TOKENS:
+        chunks = split_transcript(text)
+        logger.info(f"Map-reduce level {level}: summarizing {len(chunks)} chunk(s)")
+        with ThreadPoolExecutor(max_workers=SUMMARY_MAX_WORKERS) as executor:
+            summaries = list(executor.map(
+                lambda chunk: summarize_chunk(chunk, llm_client, llm_model, backend), chunks
+            ))
+        condensed = "\n\n".join(summaries)
+        if count_tokens(condensed) >= count_tokens(text):
+            # the model is not shrinking the text; stop rather than loop forever
+            logger.warning("Chunk summaries are not shorter than their input, stopping map-reduce")
+            break
+        text = condensed
+        level += 1
+    return text
+
+
+def generate_minutes(transcript, llm_client, llm_model, backend=None):
+    """Meeting minutes markdown, reducing long transcripts through chunk summaries first."""
+    condensed = condense_transcript(transcript, llm_client, llm_model, backend)
+    return get_backend(backend)[1](condensed, llm_client, llm_model)
+
+
+def generate_mind_map(transcript, llm_client, llm_model, backend=None):
+    """Mind map dict, reducing long transcripts through chunk summaries first."""
+    condensed = condense_transcript(transcript, llm_client, llm_model, backend)
+    return get_backend(backend)[2](condensed, llm_client, llm_model)
@@ -0,0 +1,81 @@
+# cython: language_level=3
+import os
+import shutil
+
+from pydub import AudioSegment
+from transmeet.processor import get_client
+from transmeet.utils.audio_utils import get_audio_size_mb, split_audio_by_target_size
+from transmeet.utils.general_utils import get_logger
+
+from src.config import CHUNK_FOLDER, TRANSCRIPTION_BACKEND
+from src.rate_limit import throttle
+
+logger = get_logger(__name__)
+
+
+def get_chunk_size_mb(transcription_client):
+    """Largest chunk (in MB of raw audio) the provider accepts in one request."""
+    if transcription_client == "openai":
+        return 24
+    return 18
+
+
+def split_audio_file(file_id, file_path, audio_chunk_size_mb):
+    """Split an audio file into WAV chunks on disk and return their paths in order."""
+    audio = AudioSegment.from_file(file_path)
+    if get_audio_size_mb(audio) > audio_chunk_size_mb:
+        segments = split_audio_by_target_size(audio, audio_chunk_size_mb)
+    else:
+        segments = [audio]
+
+    chunk_dir = os.path.join(CHUNK_FOLDER, file_id)
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    chunk_paths = []
+    for idx, segment in enumerate(segments):
+        chunk_path = os.path.join(chunk_dir, f"chunk_{idx:04d}.wav")
+        segment.export(chunk_path, format="wav")
+        chunk_paths.append(chunk_path)
+
+    logger.info(f"Split {file_path} into {len(chunk_paths)} chunk(s)")
+    return chunk_paths
+
+
+def remove_chunks(file_id):
+    """Delete the chunk directory of a file, if any."""
+    shutil.rmtree(os.path.join(CHUNK_FOLDER, file_id), ignore_errors=True)
+
+
+def transcribe_with_provider(chunk_path, transcription_client, transcription_model):
+    """Transcribe one chunk through the Groq/OpenAI audio transcription API."""
+    client, error = get_client(transcription_client)
+    if error:
+        raise RuntimeError(error)
+
+    throttle('transcription', transcription_client)
+    with open(chunk_path, "rb") as f:
+        response = client.audio.transcriptions.create( #type: ignore
+            file=(os.path.basename(chunk_path), f.read()),
+            model=transcription_model,
+        )
+    return response.text.strip()
+
+
+def transcribe_with_stub(chunk_path, transcription_client, transcription_model):
+    """Offline stand-in for the provider that returns a deterministic placeholder."""
+    duration_s = len(AudioSegment.from_file(chunk_path)) / 1000
+    return f"[{os.path.basename(chunk_path)} {duration_s:.1f}s {transcription_client}/{transcription_model}]"
+
+
+TRANSCRIPTION_BACKENDS = {
+    'provider': transcribe_with_provider,
+    'stub': transcribe_with_stub,
+}
+
+
+def transcribe_chunk_file(chunk_path, transcription_client, transcription_model, backend=None):
+    """Transcribe a single chunk with the configured (or given) backend."""
+    backend = backend or TRANSCRIPTION_BACKEND
+    if backend not in TRANSCRIPTION_BACKENDS:
+        raise ValueError(f"Unsupported transcription backend: {backend}")
+    return TRANSCRIPTION_BACKENDS[backend](chunk_path, transcription_client, transcription_model)
@@ -0,0 +1,68 @@
+# cython: language_level=3
+"""
+Bookkeeping of resumable upload sessions. A session is a Redis hash that
+expires UPLOAD_SESSION_TTL after its last activity; its expiry time is also
+kept in a sorted set, so the partial file of a session that expired can be
+found and removed by the periodic sweep.
+"""
+import glob
+import os
+import time
+
+from src.config import app, redis_client, UPLOAD_SESSION_TTL
+from src.models import db, TranscriptEntry
+
+SESSIONS_KEY = "uploads:sessions"
+
+
+def session_key(upload_id):
+    return f"upload:{upload_id}"
+
+
+def session_files(upload_id):
+    """Files of an upload session in the upload folder, whatever its filename."""
+    return glob.glob(os.path.join(glob.escape(app.config['UPLOAD_FOLDER']), f"{glob.escape(upload_id)}_*"))
+
+
+def is_finalized(upload_id):
+    """A finalized upload's file belongs to the entry that took the session's id."""
+    return db.session.get(TranscriptEntry, upload_id) is not None
+
+
+def remove_session_files(upload_id):
+    for path in session_files(upload_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def touch_session(upload_id):
+    """Push back the expiry of a session, in Redis and in the sweep's sorted set."""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.expire(session_key(upload_id), UPLOAD_SESSION_TTL)
+    pipe.zadd(SESSIONS_KEY, {upload_id: time.time() + UPLOAD_SESSION_TTL})
+    pipe.execute()
+
+
+def forget_session(upload_id):
+    """Drop a finalized or aborted session; its file is no longer a partial upload."""
+    pipe = redis_client.pipeline()
+    pipe.delete(session_key(upload_id))
+    pipe.zrem(SESSIONS_KEY, upload_id)
+    pipe.execute()
+
+
+def sweep_expired_sessions():
+    """Remove the partial files of sessions past their expiry. Returns how many sessions were swept."""
+    swept = 0
+    for member in redis_client.zrangebyscore(SESSIONS_KEY, '-inf', time.time()):
+        upload_id = member.decode('utf-8') #type: ignore
+        ttl = redis_client.ttl(session_key(upload_id))
+        if ttl > 0:
+            # touched since the score was written: track it by its real expiry
+            redis_client.zadd(SESSIONS_KEY, {upload_id: time.time() + ttl}) #type: ignore
+            continue
+        if not is_finalized(upload_id):
+            remove_session_files(upload_id)
+            swept += 1
+        redis_client.zrem(SESSIONS_KEY, upload_id)
+    return swept
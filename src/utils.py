@@ -1,4 +1,6 @@
 # cython: language_level=3
+import json
+import hashlib
 from markdown import markdown
 from bs4 import BeautifulSoup, Tag
 
@@ -26,86 +28,124 @@ TAG_STYLES = {
 
 HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
 
-def wrap_collapsible_sections(soup):
+# Bump RENDERER_REVISION whenever the rendering code changes its output. Style
+# changes are picked up automatically since TAG_STYLES is part of the version.
+RENDERER_REVISION = 2
+RENDERER_VERSION = hashlib.sha1(
+    json.dumps([RENDERER_REVISION, TAG_STYLES], sort_keys=True).encode('utf-8')
+).hexdigest()[:12]
+
+LIST_TAGS = ('ul', 'ol')
+
+
+def style_element(el):
+    """Add the Tailwind classes (and link attributes) for one element."""
+    classes = TAG_STYLES.get(el.name)
+    if classes is None:
+        return
+    if el.name == 'code':
+        # inline code gets exactly the code style; code blocks are styled by their <pre>
+        if el.parent is None or el.parent.name != 'pre':
+            el['class'] = classes.split()
+        return
+    el['class'] = list(dict.fromkeys(el.get('class', []) + classes.split()))
+    if el.name == 'a':
+        el['target'] = '_blank'
+        el['rel'] = 'noopener noreferrer'
+
+
+def group_labelled_list_items(soup, list_el):
     """
-    For each heading (h1-h3), wrap all content until the next heading of same or higher level
-    inside a collapsible div.
+    Nest the items following a "Label:" item under it, up to the next item that is
+    itself a label or starts with <strong>. One pass over the list's items.
     """
-    for heading in soup.find_all(HEADING_TAGS):
-        level = int(heading.name[1])
-        toggle_id = f"section-{id(heading)}"
-        content_div = soup.new_tag("div", id=toggle_id, **{"class": "collapsible-content"})
-
-        # Gather all siblings until the next heading of the same or higher level
-        sibling = heading.find_next_sibling()
-        while sibling:
-            # Stop if next heading of same or higher level
-            if sibling.name in HEADING_TAGS and int(sibling.name[1]) <= level:
+    items = list_el.find_all('li', recursive=False)
+    i, count = 0, len(items)
+    while i < count:
+        li = items[i]
+        i += 1
+        if not li.get_text(strip=True).endswith(':') or li.find('ul'):
+            continue
+        sub_ul = None
+        while i < count:
+            next_li = items[i]
+            if next_li.find('strong', recursive=False) or next_li.get_text(strip=True).endswith(':'):
                 break
-            next_sibling = sibling.find_next_sibling()
-            content_div.append(sibling.extract())
-            sibling = next_sibling
-
-        # Only insert if we actually gathered content
-        if content_div.contents:
-            heading.insert_after(content_div)
-
-            # Add toggle button
-            toggle_button = soup.new_tag(
-                "button",
-                **{
-                    'class': 'toggle-button text-indigo-700 text-xl font-bold ml-2 focus:outline-none',
-                    'onclick': f"toggleContent('{toggle_id}', this)"
-                }
-            )
-            toggle_button.string = '+'
-            heading.append(toggle_button)
-
-def apply_tailwind_classes(soup):
-    for tag_name, classes in TAG_STYLES.items():
-        for el in soup.find_all(tag_name):
-            if tag_name == 'code' and el.parent.name == 'pre':
-                continue
-            existing_classes = el.get('class', [])
-            el['class'] = list(set(existing_classes + classes.split()))
-            if tag_name == 'a':
-                el['target'] = '_blank'
-                el['rel'] = 'noopener noreferrer'
-
-def handle_special_formatting(soup):
-    for code in soup.find_all('code'):
-        if code.parent.name != 'pre':
-            code['class'] = TAG_STYLES['code'].split()
-    # Checkbox syntax left as is
-
-def group_labelled_list_items(soup):
-    for ul in soup.find_all(['ul', 'ol']):
-        li_list = ul.find_all('li', recursive=False)
-        i = 0
-        while i < len(li_list):
-            li = li_list[i]
-            if li.get_text(strip=True).endswith(':') and (not li.find('ul')):
+            if sub_ul is None:
                 sub_ul = soup.new_tag('ul')
-                j = i + 1
-                while j < len(li_list):
-                    next_li = li_list[j]
-                    if (next_li.find('strong', recursive=False) or 
-                        next_li.get_text(strip=True).endswith(':')):
-                        break
-                    sub_ul.append(next_li.extract())
-                    li_list.pop(j)
-                if sub_ul.contents:
-                    li.append(sub_ul)
+            sub_ul.append(next_li.extract())
             i += 1
+        if sub_ul is not None:
+            li.append(sub_ul)
+
+
+def wrap_collapsible_sections(soup, parent, next_section_id):
+    """
+    For each heading among parent's children, wrap the following sibling elements up to the
+    next heading of the same or higher level inside a collapsible div with a toggle button.
+    Text nodes between siblings stay where they are. Returns the next free section number.
+    """
+    children = list(parent.children)
+    i, count = 0, len(children)
+    while i < count:
+        heading = children[i]
+        i += 1
+        if not isinstance(heading, Tag) or heading.name not in HEADING_TAGS:
+            continue
+
+        level = int(heading.name[1])
+        section = []
+        while i < count:
+            sibling = children[i]
+            if isinstance(sibling, Tag):
+                if sibling.name in HEADING_TAGS and int(sibling.name[1]) <= level:
+                    break
+                section.append(sibling)
+            i += 1
+
+        if not section:
+            continue
+
+        toggle_id = f"section-{next_section_id}"
+        next_section_id += 1
+        content_div = soup.new_tag("div", id=toggle_id, **{"class": "collapsible-content"})
+        for el in section:
+            content_div.append(el.extract())
+        heading.insert_after(content_div)
+
+        toggle_button = soup.new_tag(
+            "button",
+            **{
+                'class': 'toggle-button text-indigo-700 text-xl font-bold ml-2 focus:outline-none',
+                'onclick': f"toggleContent('{toggle_id}', this)"
+            }
+        )
+        toggle_button.string = '+'
+        heading.append(toggle_button)
+    return next_section_id
+
+
+def style_minutes_tree(soup):
+    """
+    Group labelled list items, wrap collapsible sections and apply the Tailwind classes
+    in a single depth-first traversal, visiting each element once.
+    """
+    next_section_id = 1
+    stack = [soup]
+    while stack:
+        el = stack.pop()
+        if el is not soup:
+            style_element(el)
+        if el.name in LIST_TAGS:
+            group_labelled_list_items(soup, el)
+        next_section_id = wrap_collapsible_sections(soup, el, next_section_id)
+        stack.extend(reversed([child for child in el.children if isinstance(child, Tag)]))
+
 
 def render_minutes_with_tailwind(md_text: str) -> str:
     html = markdown(md_text, extensions=['fenced_code', 'codehilite', 'tables', 'nl2br', 'extra'])
     soup = BeautifulSoup(html, 'html.parser')
-
-    group_labelled_list_items(soup)
-    wrap_collapsible_sections(soup)
-    handle_special_formatting(soup)
-    apply_tailwind_classes(soup)
+    style_minutes_tree(soup)
     return str(soup)
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+# cython: language_level=3
+import os
+import wave
+import bisect
+
+import numpy as np
+from transmeet.utils.general_utils import get_logger
+
+from src.audio_preprocessing import pcm_blocks
+from src.config import (
+    CHUNK_FOLDER,
+    VAD_MIN_SILENCE_SECONDS,
+    VAD_PADDING_SECONDS,
+    VAD_ENERGY_THRESHOLD_DB,
+    VAD_AGGRESSIVENESS,
+)
+
+logger = get_logger(__name__)
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+VAD_SAMPLE_RATE = 16000
+FRAME_SAMPLES = VAD_SAMPLE_RATE * 30 // 1000  # 30 ms, a frame size webrtcvad accepts
+BLOCK_FRAMES = 1000  # frames decoded and classified at a time (30 s)
+
+
+class EnergyDetector:
+    """
+    Frame classifier on log energy and zero-crossing rate. The noise floor is the
+    lowest 10th-percentile frame energy seen so far, so a block that is all speech
+    does not raise it. Quiet frames that cross zero often (fricatives) still count
+    as speech.
+    """
+
+    def __init__(self, threshold_db=VAD_ENERGY_THRESHOLD_DB):
+        self.threshold_db = threshold_db
+        self.noise_floor_db = 0.0
+
+    def __call__(self, frames):
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1)) + 1e-3
+        energy_db = 20 * np.log10(rms / 32768)
+        signs = np.signbit(samples)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        self.noise_floor_db = min(self.noise_floor_db, float(np.percentile(energy_db, 10)))
+        threshold = max(self.threshold_db, self.noise_floor_db + 10)
+        loud = energy_db > threshold
+        fricative = (energy_db > threshold - 6) & (zcr > 0.25)
+        return loud | fricative
+
+
+class WebrtcDetector:
+    def __init__(self, aggressiveness=VAD_AGGRESSIVENESS):
+        self.vad = webrtcvad.Vad(aggressiveness) #type: ignore
+
+    def __call__(self, frames):
+        return np.fromiter(
+            (self.vad.is_speech(frame.tobytes(), VAD_SAMPLE_RATE) for frame in frames),
+            dtype=bool, count=len(frames),
+        )
+
+
+def get_detector():
+    return WebrtcDetector() if webrtcvad is not None else EnergyDetector()
+
+
+def classify_frames(blocks, detector):
+    """Speech flag per 30 ms frame and the total sample count of a PCM block stream."""
+    flags, total = [], 0
+    for block in blocks:
+        total += len(block)
+        whole = len(block) // FRAME_SAMPLES
+        if whole:
+            flags.append(detector(block[:whole * FRAME_SAMPLES].reshape(whole, FRAME_SAMPLES)))
+        if len(block) % FRAME_SAMPLES:
+            # the trailing partial frame of the stream follows the frame before it
+            flags.append(flags[-1][-1:] if flags else np.ones(1, dtype=bool))
+    return (np.concatenate(flags) if flags else np.zeros(0, dtype=bool)), total
+
+
+def speech_segments(flags, total_samples, min_silence_frames, padding_frames):
+    """
+    Sample ranges to keep: everything except silent runs of at least
+    min_silence_frames, each trimmed by padding_frames of context on the sides
+    that touch speech.
+    """
+    padded = np.concatenate(([False], ~flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = edges[::2], edges[1::2]
+
+    dropped = []
+    for start, end in zip(starts, ends):
+        if end - start < min_silence_frames:
+            continue
+        drop_start = start if start == 0 else start + padding_frames
+        drop_end = end if end == len(flags) else end - padding_frames
+        if drop_end > drop_start:
+            dropped.append((int(drop_start) * FRAME_SAMPLES, min(int(drop_end) * FRAME_SAMPLES, total_samples)))
+
+    segments, position = [], 0
+    for drop_start, drop_end in dropped:
+        if drop_start > position:
+            segments.append((position, drop_start))
+        position = drop_end
+    if position < total_samples:
+        segments.append((position, total_samples))
+    return segments
+
+
+def write_segments(blocks, segments, output_path):
+    """Copy only the samples inside segments from a PCM block stream to a WAV file."""
+    index, position = 0, 0
+    with wave.open(output_path, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(VAD_SAMPLE_RATE)
+        for block in blocks:
+            block_end = position + len(block)
+            while index < len(segments) and segments[index][0] < block_end:
+                start, end = segments[index]
+                out.writeframes(block[max(start - position, 0):min(end, block_end) - position].tobytes())
+                if end > block_end:
+                    break
+                index += 1
+            position = block_end
+
+
+def offset_map(segments):
+    """[trimmed start, original start, duration] in seconds for every kept segment."""
+    mapping, trimmed = [], 0
+    for start, end in segments:
+        mapping.append([
+            round(trimmed / VAD_SAMPLE_RATE, 3),
+            round(start / VAD_SAMPLE_RATE, 3),
+            round((end - start) / VAD_SAMPLE_RATE, 3),
+        ])
+        trimmed += end - start
+    return mapping
+
+
+def to_original_time(seconds, mapping):
+    """Map a timestamp in the trimmed audio back to the original recording."""
+    if not mapping:
+        return seconds
+    index = max(bisect.bisect_right([entry[0] for entry in mapping], seconds) - 1, 0)
+    trimmed_start, original_start, _ = mapping[index]
+    return round(original_start + (seconds - trimmed_start), 3)
+
+
+def trim_silence(file_id, file_path):
+    """
+    Drop long silent spans before transcription. The file is decoded twice, once
+    to classify frames and once to copy the speech, so memory stays bounded
+    whatever the recording length. Returns (path to transcribe, stats) where stats
+    has speech_ratio, silence_seconds_saved and the offset map.
+    """
+    with pcm_blocks(file_path, VAD_SAMPLE_RATE, FRAME_SAMPLES * BLOCK_FRAMES) as blocks:
+        flags, total = classify_frames(blocks, get_detector())
+
+    frames_per_second = VAD_SAMPLE_RATE / FRAME_SAMPLES
+    segments = speech_segments(
+        flags, total,
+        min_silence_frames=int(VAD_MIN_SILENCE_SECONDS * frames_per_second),
+        padding_frames=int(VAD_PADDING_SECONDS * frames_per_second),
+    )
+    kept = sum(end - start for start, end in segments)
+    stats = {
+        'speech_ratio': round(kept / total, 4) if total else 1.0,
+        'silence_seconds_saved': round((total - kept) / VAD_SAMPLE_RATE, 2),
+        'speech_segments': offset_map(segments),
+    }
+    if kept == total or not kept:
+        # nothing to trim, or nothing but silence: transcribe the input as is
+        return file_path, stats
+
+    work_dir = os.path.join(CHUNK_FOLDER, file_id)
+    os.makedirs(work_dir, exist_ok=True)
+    output_path = os.path.join(work_dir, "speech.wav")
+    with pcm_blocks(file_path, VAD_SAMPLE_RATE, FRAME_SAMPLES * BLOCK_FRAMES) as blocks:
+        write_segments(blocks, segments, output_path)
+
+    logger.info(
+        f"Trimmed {stats['silence_seconds_saved']}s of silence from {file_path} "
+        f"(speech ratio {stats['speech_ratio']:.0%})"
+    )
+    return output_path, stats
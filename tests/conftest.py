@@ -0,0 +1,68 @@
+"""
+Test setup: the app reads its API keys and opens its Redis pool when src.config
+is imported, so both are pointed at test doubles first. Redis is fakeredis,
+the database a SQLite file in a temporary directory built by the migrations,
+and Celery runs tasks eagerly.
+"""
+import os
+import shutil
+import tempfile
+from functools import partial
+
+import fakeredis
+import pytest
+import redis
+from sqlalchemy import text
+
+TEST_DIR = tempfile.mkdtemp(prefix="speak2summary-tests-")
+os.environ.setdefault('OPENAI_API_KEY', 'test')
+os.environ.setdefault('GROQ_API_KEY', 'test')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+
+FAKE_REDIS_SERVER = fakeredis.FakeServer()
+redis.BlockingConnectionPool = partial( #type: ignore
+    redis.BlockingConnectionPool, connection_class=fakeredis.FakeRedisConnection, server=FAKE_REDIS_SERVER
+)
+
+from flask_migrate import upgrade  # noqa: E402
+
+from src.app import app as flask_app  # noqa: E402
+from src.celery_worker import celery  # noqa: E402
+from src.config import redis_client, MIGRATIONS_DIR  # noqa: E402
+from src.models import db  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def app():
+    flask_app.config.update(TESTING=True, UPLOAD_FOLDER=os.path.join(TEST_DIR, 'uploads'))
+    os.makedirs(flask_app.config['UPLOAD_FOLDER'], exist_ok=True)
+    celery.conf.update(task_always_eager=True, result_backend='cache+memory://')
+    with flask_app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+    yield flask_app
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_state(app):
+    """Every test starts with an empty Redis and empty tables."""
+    redis_client.flushall()
+    yield
+    with app.app_context():
+        db.session.remove()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        # the full-text index is created by its migration, outside the models
+        db.session.execute(text("DELETE FROM search_index"))
+        db.session.commit()
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
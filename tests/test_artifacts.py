@@ -0,0 +1,73 @@
+import hashlib
+
+import pytest
+from sqlalchemy import inspect
+
+from src.compression import CODECS, compress, decompress, resolve_codec
+from src.models import db, Artifact, TranscriptEntry
+
+TRANSCRIPT = "Alice: let's ship search this quarter. " * 200 + "Bob: agreed ✔️"
+
+
+def new_entry(entry_id='file-1'):
+    entry = TranscriptEntry(id=entry_id, filename='meeting.mp3', file_path='/uploads/meeting.mp3', status='completed')
+    db.session.add(entry)
+    return entry
+
+
+@pytest.mark.parametrize('codec', CODECS)
+def test_codecs_round_trip(codec):
+    raw = TRANSCRIPT.encode('utf-8')
+    codec = resolve_codec(codec)
+
+    assert decompress(compress(raw, codec), codec) == raw
+
+
+def test_bodies_are_stored_compressed_with_size_and_digest(app_context):
+    entry = new_entry()
+    entry.transcript = TRANSCRIPT
+    entry.mind_map = {"Root Topic": "Planning", "Goals": ["Ship search"]}
+    db.session.commit()
+
+    artifact = entry.artifacts['transcript']
+    raw = TRANSCRIPT.encode('utf-8')
+    assert artifact.size == len(raw)
+    assert artifact.digest == hashlib.sha256(raw).hexdigest()
+    assert len(artifact.data) < len(raw)
+    assert entry.transcript_available and entry.mind_map_topic == "Planning"
+
+
+def test_listing_artifacts_does_not_load_their_bodies(app_context):
+    new_entry().transcript = TRANSCRIPT
+    db.session.commit()
+    db.session.expunge_all()
+
+    artifact = db.session.get(TranscriptEntry, 'file-1').artifacts['transcript']
+
+    assert 'data' in inspect(artifact).unloaded
+    assert artifact.get_text() == TRANSCRIPT
+
+
+def test_copy_reuses_the_compressed_body(app_context):
+    source = new_entry()
+    source.transcript = TRANSCRIPT
+    target = new_entry('file-2')
+    target.artifacts['transcript'] = source.artifacts['transcript'].copy()
+    db.session.commit()
+    db.session.expunge_all()
+
+    source, target = (db.session.get(TranscriptEntry, entry_id) for entry_id in ('file-1', 'file-2'))
+    assert target.artifacts['transcript'].data == source.artifacts['transcript'].data
+    assert target.transcript == TRANSCRIPT
+
+
+def test_clearing_a_result_deletes_its_artifact(app_context):
+    entry = new_entry()
+    entry.minutes = "## Minutes"
+    db.session.commit()
+
+    entry.minutes = None
+    db.session.commit()
+
+    assert not entry.minutes_available
+    assert Artifact.query.filter_by(entry_id='file-1', kind='minutes').count() == 0
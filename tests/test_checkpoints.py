@@ -0,0 +1,79 @@
+import random
+import threading
+import time
+
+import pytest
+
+from src import celery_worker
+from src.checkpoints import load_checkpoint, start_checkpoint, save_chunk
+
+FILE_ID = 'file-1'
+CHUNKS = 8
+
+
+@pytest.fixture
+def chunked(monkeypatch, app_context):
+    """Split into CHUNKS fake chunks; transcription answers 'text-<index>' and records each call."""
+    calls = []
+    failing = set()
+    lock = threading.Lock()
+
+    def transcribe(file_id, chunk_path, client, model, size=None):
+        index = int(chunk_path.rsplit('-', 1)[1])
+        with lock:
+            calls.append(index)
+        # finish out of order
+        time.sleep(random.uniform(0, 0.01))
+        if index in failing:
+            raise RuntimeError(f"provider error on chunk {index}")
+        return f"text-{index}"
+
+    monkeypatch.setattr(celery_worker, 'split_audio_file',
+                        lambda file_id, path, size_mb: [f"/chunks/{file_id}/chunk-{i}" for i in range(CHUNKS)])
+    monkeypatch.setattr(celery_worker, 'transcribe_chunk_timed', transcribe)
+    return calls, failing
+
+
+def transcribe():
+    return celery_worker.transcribe_chunks_checkpointed(FILE_ID, '/audio.mp3', 'groq', 'whisper')
+
+
+def test_chunks_are_joined_in_index_order(chunked):
+    calls, _ = chunked
+    assert transcribe() == " ".join(f"text-{i}" for i in range(CHUNKS))
+    assert sorted(calls) == list(range(CHUNKS))
+
+
+def test_failed_job_keeps_the_other_chunks_checkpointed(chunked):
+    _, failing = chunked
+    failing.add(5)
+
+    with pytest.raises(RuntimeError, match="chunk 5"):
+        transcribe()
+
+    done = load_checkpoint(FILE_ID, CHUNKS)
+    assert 5 not in done
+    assert all(done[i] == f"text-{i}" for i in done)
+
+
+def test_resume_sends_only_the_missing_chunks(chunked):
+    calls, failing = chunked
+    failing.add(5)
+    with pytest.raises(RuntimeError):
+        transcribe()
+    missing = [i for i in range(CHUNKS) if i not in load_checkpoint(FILE_ID, CHUNKS)]
+    assert 5 in missing
+
+    calls.clear()
+    failing.clear()
+    assert transcribe() == " ".join(f"text-{i}" for i in range(CHUNKS))
+    assert sorted(calls) == missing
+
+
+def test_checkpoint_of_another_split_is_dropped(chunked):
+    calls, _ = chunked
+    start_checkpoint(FILE_ID, CHUNKS + 1)
+    save_chunk(FILE_ID, 0, 'stale')
+
+    assert transcribe().startswith("text-0 ")
+    assert sorted(calls) == list(range(CHUNKS))
@@ -0,0 +1,73 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src import celery_worker
+from src.checkpoints import checkpoint_key, save_chunk, start_checkpoint
+from src.config import redis_client
+from src.models import db, TranscriptEntry
+
+FILE_ID = 'file-1'
+
+
+@pytest.fixture
+def entry(app_context):
+    entry = TranscriptEntry(id=FILE_ID, filename='meeting.mp3', file_path='/uploads/meeting.mp3', status='processing')
+    db.session.add(entry)
+    db.session.commit()
+    start_checkpoint(FILE_ID, 3)
+    redis_client.set(f"file:{FILE_ID}:chunks_total", 3)
+    return entry
+
+
+def test_finalize_joins_chunks_in_index_order(entry):
+    results = [{'index': i, 'text': f"text-{i}"} for i in range(3)]
+    random.shuffle(results)
+
+    assert celery_worker.finalize_chunked_transcription.run(results, FILE_ID)['status'] == 'success'
+
+    entry = db.session.get(TranscriptEntry, FILE_ID)
+    assert entry.status == 'completed'
+    assert entry.transcript == "text-0 text-1 text-2"
+    assert not redis_client.exists(checkpoint_key(FILE_ID), f"file:{FILE_ID}:chunks_total")
+
+
+def test_finalize_does_not_complete_with_skipped_chunks(entry):
+    results = [{'index': 0, 'text': 'text-0'}, {'index': 1, 'text': None, 'skipped': True}]
+
+    assert celery_worker.finalize_chunked_transcription.run(results, FILE_ID)['status'] == 'error'
+    assert db.session.get(TranscriptEntry, FILE_ID).status == 'processing'
+
+
+def test_error_callback_fails_the_entry_and_cleans_up(entry):
+    save_chunk(FILE_ID, 0, 'text-0')
+
+    celery_worker.chunked_transcription_failed.run(
+        SimpleNamespace(id='chunk-task'), RuntimeError('provider down'), None, FILE_ID
+    )
+
+    entry = db.session.get(TranscriptEntry, FILE_ID)
+    assert entry.status == 'failed'
+    assert 'provider down' in entry.error_message
+    assert not redis_client.exists(checkpoint_key(FILE_ID), f"file:{FILE_ID}:chunks_total")
+
+
+def test_chunks_of_a_failed_file_are_not_sent(entry, monkeypatch):
+    sent = []
+    monkeypatch.setattr(celery_worker, 'transcribe_chunk_timed', lambda *args, **kwargs: sent.append(args) or 'text')
+    celery_worker.update_file_status(FILE_ID, 'failed', 'chunk 0 failed')
+
+    result = celery_worker.transcribe_chunk.run(FILE_ID, 1, '/chunks/chunk-1', 'groq', 'whisper')
+
+    assert result == {'index': 1, 'text': None, 'skipped': True}
+    assert sent == []
+
+
+def test_checkpointed_chunk_is_not_sent_again(entry, monkeypatch):
+    monkeypatch.setattr(celery_worker, 'transcribe_chunk_timed', lambda *args, **kwargs: pytest.fail("chunk sent"))
+    save_chunk(FILE_ID, 2, 'text-2')
+
+    assert celery_worker.transcribe_chunk.run(FILE_ID, 2, '/chunks/chunk-2', 'groq', 'whisper') == {
+        'index': 2, 'text': 'text-2'
+    }
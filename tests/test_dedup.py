@@ -0,0 +1,93 @@
+import io
+import os
+from datetime import datetime
+
+import pytest
+
+from src import celery_worker
+from src.dedup import find_cached_transcripts, get_dedup_stats, is_file_shared
+from src.models import db, Artifact, TranscriptEntry
+
+AUDIO = b"ID3 weekly sync recording"
+WHISPER = {'transcription-client': 'groq', 'transcription-model': 'whisper-large-v3'}
+
+
+@pytest.fixture
+def transcribed(monkeypatch):
+    """Stands in for the provider: the audio files that were sent for transcription."""
+    sent = []
+    monkeypatch.setattr(celery_worker, 'transcribe_chunks_checkpointed',
+                        lambda *args, **kwargs: sent.append(args) or "hello world")
+    return sent
+
+
+def upload(client, form=WHISPER, data=AUDIO):
+    result, = client.post('/upload', data={'audio': (io.BytesIO(data), 'sync.mp3'), **form}).json
+    return result
+
+
+def add_entry(entry_id, client='groq', model='whisper-large-v3', status='completed', transcript="hello world",
+              upload_time=datetime(2026, 3, 1)):
+    entry = TranscriptEntry(
+        id=entry_id, filename='sync.mp3', file_path=f"/uploads/{entry_id}.mp3", status=status,
+        content_hash='abc', transcription_client=client, transcription_model=model, upload_time=upload_time,
+    )
+    entry.transcript = transcript
+    db.session.add(entry)
+    db.session.commit()
+    return entry
+
+
+def test_lookup_is_scoped_by_client_and_model(app_context):
+    add_entry('later', upload_time=datetime(2026, 3, 2))
+    add_entry('first')
+    add_entry('openai', client='openai')
+    add_entry('other-model', model='whisper-large-v3-turbo')
+    add_entry('failed', status='failed', upload_time=datetime(2026, 1, 1))
+    add_entry('no-transcript', transcript=None, upload_time=datetime(2026, 1, 1))
+
+    assert find_cached_transcripts(['abc'], 'groq', 'whisper-large-v3')['abc'].id == 'first'
+    assert find_cached_transcripts(['abc'], 'openai', 'whisper-large-v3')['abc'].id == 'openai'
+    assert find_cached_transcripts(['abc'], 'openai', 'whisper-1') == {}
+    assert find_cached_transcripts(['abc', 'def'], 'groq', 'whisper-large-v3-turbo').keys() == {'abc'}
+    assert get_dedup_stats() == {'hits': 3, 'misses': 2, 'hit_ratio': 0.6}
+
+
+def test_same_audio_with_another_model_is_transcribed_again(client, app_context, transcribed):
+    first = upload(client)
+    other_model = upload(client, {**WHISPER, 'transcription-model': 'whisper-large-v3-turbo'})
+    other_client = upload(client, {**WHISPER, 'transcription-client': 'openai'})
+    same = upload(client)
+
+    assert [r['status'] for r in (first, other_model, other_client)] == ['queued'] * 3
+    assert same['status'] == 'completed' and same['deduplicated_from'] == first['id']
+    assert len(transcribed) == 3
+
+
+def test_duplicate_stores_its_own_copy_of_the_compressed_transcript(client, app_context, transcribed):
+    first = upload(client)
+    duplicate = upload(client)
+
+    db.session.expire_all()
+    original, copy = (db.session.get(TranscriptEntry, r['id']) for r in (first, duplicate))
+    assert copy.file_path == original.file_path
+    assert Artifact.query.filter_by(kind='transcript').count() == 2
+    assert copy.artifacts['transcript'].id != original.artifacts['transcript'].id
+    assert copy.artifacts['transcript'].data == original.artifacts['transcript'].data
+    assert copy.transcript == "hello world"
+
+
+def test_a_shared_file_is_kept_until_its_last_entry_is_deleted(client, app_context, transcribed):
+    first = upload(client)
+    duplicate = upload(client)
+    db.session.expire_all()
+    path = db.session.get(TranscriptEntry, first['id']).file_path
+    assert is_file_shared(path, first['id']) and is_file_shared(path, duplicate['id'])
+
+    assert client.post(f"/delete/{first['id']}").status_code == 200
+    assert os.path.exists(path)
+    assert not is_file_shared(path, duplicate['id'])
+    assert client.get(f"/status/{duplicate['id']}").json['status'] == 'completed'
+
+    assert client.post(f"/delete/{duplicate['id']}").status_code == 200
+    assert not os.path.exists(path)
@@ -0,0 +1,117 @@
+import io
+import zipfile
+
+import pytest
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from src import extractors
+from src.extractors import UnsupportedFormat, extract_text, is_extractable
+from src.models import db, TranscriptEntry
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '<w:p><w:r><w:t>Agenda</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Alice</w:t><w:tab/><w:t xml:space="preserve">budget </w:t></w:r>'
+    '<w:r><w:t>approved</w:t><w:br/><w:t>next line</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+
+def write_pdf(path, pages):
+    """A PDF with one line of Helvetica text per page."""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    }))
+    for line in pages:
+        page = PageObject.create_blank_page(width=612, height=792)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td ({line}) Tj ET".encode('latin-1'))
+        page[NameObject('/Contents')] = writer._add_object(content)
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): font}),
+        })
+        writer.add_page(page)
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+def write_docx(path, document_xml=DOCUMENT_XML):
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr('word/document.xml', document_xml)
+
+
+def test_characters_split_across_blocks_are_decoded_whole(tmp_path, monkeypatch):
+    monkeypatch.setattr(extractors, 'UPLOAD_BLOCK_SIZE', 3)
+    text = "Zoë said: ship it ✔️ — 会议纪要"
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(b'\xef\xbb\xbf' + text.encode('utf-8'))
+
+    assert extract_text(str(path)) == text
+
+
+def test_invalid_bytes_are_replaced(tmp_path):
+    path = tmp_path / 'notes.md'
+    path.write_bytes(b'caf\xe9 notes')
+
+    assert extract_text(str(path)) == "caf� notes"
+
+
+def test_pdf_pages_are_joined_by_lines(tmp_path):
+    path = tmp_path / 'minutes.pdf'
+    write_pdf(path, ["First page", "Second page", "Third page"])
+
+    assert extract_text(str(path)).splitlines() == ["First page", "Second page", "Third page"]
+
+
+def test_docx_keeps_tabs_breaks_and_paragraphs(tmp_path):
+    path = tmp_path / 'minutes.docx'
+    write_docx(path)
+
+    assert extract_text(str(path)) == "Agenda\nAlice\tbudget approved\nnext line\n"
+
+
+def test_docx_without_a_document_is_unsupported(tmp_path):
+    path = tmp_path / 'minutes.docx'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('readme.txt', 'not a word file')
+    (tmp_path / 'broken.docx').write_bytes(b'PK not really')
+
+    for name in ('minutes.docx', 'broken.docx'):
+        with pytest.raises(UnsupportedFormat):
+            extract_text(str(tmp_path / name))
+
+
+def test_unknown_extensions_are_unsupported(tmp_path):
+    assert is_extractable('Minutes.PDF') and not is_extractable('minutes.doc')
+    with pytest.raises(UnsupportedFormat):
+        extract_text(str(tmp_path / 'minutes.doc'))
+
+
+def test_upload_transcript_skips_unsupported_files(client, app_context, tmp_path):
+    docx = tmp_path / 'minutes.docx'
+    write_docx(docx)
+
+    response = client.post('/upload_transcript', data={'transcript_file': [
+        (io.BytesIO("Zoë: hello".encode('utf-8')), 'notes.txt'),
+        (io.BytesIO(b'\xd0\xcf\x11\xe0 legacy word'), 'minutes.doc'),
+        (io.BytesIO(docx.read_bytes()), 'minutes.docx'),
+        (io.BytesIO(b'MZ'), 'setup.exe'),
+    ]})
+
+    assert response.status_code == 200
+    processed = response.json['processed']
+    assert [item['filename'] for item in processed] == ['notes.txt', 'minutes.docx']
+    transcripts = {item['filename']: db.session.get(TranscriptEntry, item['id']).transcript for item in processed}
+    assert transcripts == {'notes.txt': "Zoë: hello", 'minutes.docx': "Agenda\nAlice\tbudget approved\nnext line"}
+
+
+def test_upload_transcript_with_only_unsupported_files(client, app_context):
+    response = client.post('/upload_transcript', data={'transcript_file': (io.BytesIO(b'MZ'), 'setup.exe')})
+
+    assert response.status_code == 400
+    assert TranscriptEntry.query.count() == 0
@@ -0,0 +1,97 @@
+import pytest
+
+from src import celery_worker, summarizer
+from src.celery_worker import generate_mindmap_task, generate_minutes_task, issued_job_file, job_lock_key
+from src.config import redis_client
+from src.models import db, TranscriptEntry
+
+FILE_ID = 'file-1'
+BODY = {'id': FILE_ID, 'llm-client': 'groq', 'llm-model': 'llama'}
+
+
+@pytest.fixture
+def entry(app_context, monkeypatch):
+    monkeypatch.setattr(summarizer, 'SUMMARIZATION_BACKEND', 'fake')
+    entry = TranscriptEntry(id=FILE_ID, filename='meeting.mp3', file_path='/uploads/meeting.mp3', status='completed')
+    entry.transcript = "Alice opened the meeting. Bob agreed."
+    db.session.add(entry)
+    db.session.commit()
+    return entry
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Jobs handed to the broker but not picked up by a worker yet."""
+    jobs = []
+    for task in (generate_minutes_task, generate_mindmap_task):
+        monkeypatch.setattr(task, 'apply_async', lambda args, task_id, task=task: jobs.append((task.name, args, task_id)))
+    return jobs
+
+
+@pytest.mark.parametrize('route, kind', [('/api/generate_meeting_minutes', 'minutes'), ('/api/generate_mindmap', 'mindmap')])
+def test_a_pending_job_is_joined_instead_of_queued_again(client, entry, published, route, kind):
+    first = client.post(route, json=BODY)
+    second = client.post(route, json=BODY)
+
+    assert first.status_code == second.status_code == 202
+    assert second.json['job_id'] == first.json['job_id']
+    assert first.json['message'] == f"{kind} generation queued"
+    assert second.json['message'] == f"{kind} generation already in progress"
+    assert len(published) == 1
+    assert redis_client.get(job_lock_key(kind, FILE_ID)).decode() == first.json['job_id']
+
+
+def test_jobs_of_different_kinds_are_independent(client, entry, published):
+    minutes = client.post('/api/generate_meeting_minutes', json=BODY).json['job_id']
+    mind_map = client.post('/api/generate_mindmap', json=BODY).json['job_id']
+
+    assert minutes != mind_map
+    assert len(published) == 2
+
+
+def test_accepted_job_points_at_its_status(client, entry):
+    response = client.post('/api/generate_meeting_minutes', json=BODY)
+
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+    assert response.headers['Location'] == response.json['status_url'] == f"/api/jobs/{job_id}"
+    assert issued_job_file(job_id) == FILE_ID
+
+    status = client.get(response.headers['Location']).json
+    assert (status['job_id'], status['file_id']) == (job_id, FILE_ID)
+    # the eager task committed through its own session
+    db.session.expire_all()
+    assert db.session.get(TranscriptEntry, FILE_ID).minutes_available
+
+
+def test_a_finished_job_releases_its_lock(client, entry):
+    client.post('/api/generate_mindmap', json=BODY)
+
+    assert not redis_client.exists(job_lock_key('mindmap', FILE_ID))
+    db.session.expire_all()
+    assert client.post('/api/generate_mindmap', json=BODY).json['message'] == "Mind map already exists"
+
+
+def test_lock_that_expires_between_set_and_get_is_retried(entry, published, monkeypatch):
+    redis_client.set(job_lock_key('minutes', FILE_ID), 'old-job')
+    real_get = redis_client.get
+
+    def old_job_finishes(key):
+        # released right after our SET NX lost to it
+        redis_client.delete(key)
+        return real_get(key)
+
+    monkeypatch.setattr(redis_client, 'get', old_job_finishes)
+
+    job_id, created = celery_worker.enqueue_file_job(generate_minutes_task, 'minutes', FILE_ID, 'groq', 'llama')
+
+    assert created and job_id != 'old-job'
+    assert [task_id for _, _, task_id in published] == [job_id]
+
+
+@pytest.mark.parametrize('job_id', ['never-issued', '00000000-0000-0000-0000-000000000000'])
+def test_unissued_job_ids_are_not_found(client, job_id):
+    response = client.get(f"/api/jobs/{job_id}")
+
+    assert response.status_code == 404
+    assert response.json == {'error': 'Job not found', 'job_id': job_id}
@@ -0,0 +1,101 @@
+import pytest
+
+from src.config import redis_client, QUEUE_SHORT
+from src.dedup import DEDUP_HITS_KEY, DEDUP_MISSES_KEY
+from src.metrics import (
+    METRIC_NAME,
+    clear_stage_timings,
+    job_stage_timings,
+    record_stage,
+    size_label,
+    stages_key,
+    timed,
+)
+
+MB = 1024 * 1024
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    samples = {}
+    for line in response.text.splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return response.text, samples
+
+
+@pytest.mark.parametrize('size, label', [(None, ''), (0, '0-10'), (10 * MB - 1, '0-10'), (10 * MB, '10-50'), (500 * MB, '200+')])
+def test_size_label(size, label):
+    assert size_label(size) == label
+
+
+def test_repeated_stages_add_up_for_the_job():
+    record_stage('file-1', 'transcribe_chunk', 1.25, 'whisper', '0-10')
+    record_stage('file-1', 'transcribe_chunk', 2.5, 'whisper', '0-10')
+    record_stage('file-1', 'db_commit', 0.0004)
+    record_stage(None, 'db_commit', 0.01)
+
+    assert job_stage_timings('file-1') == {'transcribe_chunk': 3.75, 'db_commit': 0.0}
+    assert redis_client.ttl(stages_key('file-1')) > 0
+
+
+def test_taking_the_timings_clears_them():
+    record_stage('file-1', 'normalize', 0.5)
+
+    assert job_stage_timings('file-1', clear=True) == {'normalize': 0.5}
+    assert job_stage_timings('file-1') == {}
+
+    record_stage('file-1', 'normalize', 0.5)
+    clear_stage_timings('file-1')
+    assert job_stage_timings('file-1') == {}
+
+
+def test_a_failed_block_is_not_recorded():
+    with pytest.raises(RuntimeError):
+        with timed('llm_minutes', 'file-1', 'llama'):
+            raise RuntimeError("provider down")
+    with timed('render', 'file-1'):
+        pass
+
+    assert list(job_stage_timings('file-1')) == ['render']
+
+
+def test_histograms_are_cumulative(client):
+    for seconds in (0.2, 3, 45, 7200):
+        record_stage('file-1', 'transcribe_chunk', seconds, 'whisper-large', '10-50')
+
+    text, samples = scrape(client)
+
+    labels = 'stage="transcribe_chunk",model="whisper-large",size_mb="10-50"'
+    assert f"# TYPE {METRIC_NAME} histogram" in text
+    assert samples[f'{METRIC_NAME}_bucket{{{labels},le="0.1"}}'] == 0
+    assert samples[f'{METRIC_NAME}_bucket{{{labels},le="0.25"}}'] == 1
+    assert samples[f'{METRIC_NAME}_bucket{{{labels},le="5"}}'] == 2
+    assert samples[f'{METRIC_NAME}_bucket{{{labels},le="3600"}}'] == 3
+    assert samples[f'{METRIC_NAME}_bucket{{{labels},le="+Inf"}}'] == 4
+    assert samples[f'{METRIC_NAME}_sum{{{labels}}}'] == pytest.approx(7248.2)
+    assert samples[f'{METRIC_NAME}_count{{{labels}}}'] == 4
+
+
+def test_label_values_are_escaped(client):
+    record_stage(None, 'llm_minutes', 1, 'model "x"\\v2')
+
+    text, _ = scrape(client)
+
+    assert 'model="model \\"x\\"\\\\v2"' in text
+
+
+def test_queue_lengths_and_dedup_counters(client):
+    redis_client.rpush(QUEUE_SHORT, 'task-1', 'task-2')
+    redis_client.incrby(DEDUP_HITS_KEY, 1)
+    redis_client.incrby(DEDUP_MISSES_KEY, 2)
+
+    _, samples = scrape(client)
+
+    assert samples[f'speak2summary_queue_length{{queue="{QUEUE_SHORT}"}}'] == 2
+    assert samples['speak2summary_queue_length{queue="llm"}'] == 0
+    assert samples['speak2summary_dedup_lookups_total{result="hit"}'] == 1
+    assert samples['speak2summary_dedup_lookups_total{result="miss"}'] == 2
@@ -0,0 +1,97 @@
+"""
+Databases made by db.create_all() before the migrations existed (at any commit
+from the baseline up to the one that introduced them) must upgrade to the
+current models: the migrations skip what such a database already has.
+"""
+import os
+
+import pytest
+import sqlalchemy as sa
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask import Flask
+from flask_migrate import Migrate, upgrade
+
+from src.config import MIGRATIONS_DIR
+from src.models import db, TranscriptEntry
+from src.search import include_object
+
+# columns and indexes create_all() added to the baseline table, by the request that introduced them
+HISTORY = [
+    ('baseline', [], []),
+    ('user-001', [], [('ix_transcription_upload_time_id', ['upload_time', 'id'])]),
+    ('user-004', [sa.Column('content_hash', sa.String(64))], [('ix_transcription_content_hash', ['content_hash'])]),
+    ('user-008', [sa.Column('minutes_render_version', sa.String(16))], []),
+    ('user-013', [
+        sa.Column('speech_ratio', sa.Float),
+        sa.Column('silence_seconds_saved', sa.Float),
+        sa.Column('speech_segments', sa.JSON),
+    ], []),
+]
+
+
+def create_all_at(step):
+    """The transcription table as db.create_all() made it at a commit of the history."""
+    metadata = sa.MetaData()
+    columns = [
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('filename', sa.String(255), nullable=False),
+        sa.Column('file_path', sa.String(512), nullable=False),
+        sa.Column('status', sa.String(50)),
+        sa.Column('upload_time', sa.DateTime),
+        sa.Column('completion_time', sa.DateTime),
+        sa.Column('mind_map', sa.JSON),
+        sa.Column('transcription_client', sa.String(50)),
+        sa.Column('transcription_model', sa.String(50)),
+        sa.Column('llm_client', sa.String(50)),
+        sa.Column('llm_model', sa.String(50)),
+        sa.Column('transcript', sa.Text),
+        sa.Column('minutes_raw', sa.Text),
+        sa.Column('minutes', sa.Text),
+        sa.Column('error_message', sa.Text),
+    ]
+    indexes = []
+    for _, extra_columns, extra_indexes in HISTORY[:step + 1]:
+        columns.extend(column.copy() for column in extra_columns)
+        indexes.extend(extra_indexes)
+    table = sa.Table('transcription', metadata, *columns)
+    for name, column_names in indexes:
+        sa.Index(name, *(table.c[column] for column in column_names))
+    return metadata
+
+
+@pytest.fixture
+def legacy_app(tmp_path, app):
+    """A second app on its own SQLite file, so the migrations run against a legacy database."""
+    legacy = Flask(__name__)
+    legacy.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(tmp_path, 'legacy.db')}",
+        ARTIFACT_COMPRESSION=app.config['ARTIFACT_COMPRESSION'],
+    )
+    db.init_app(legacy)
+    Migrate(legacy, db, directory=MIGRATIONS_DIR, render_as_batch=True, include_object=include_object)
+    return legacy
+
+
+@pytest.mark.parametrize('step', range(len(HISTORY)), ids=[name for name, _, _ in HISTORY])
+def test_create_all_database_upgrades_to_the_current_models(legacy_app, step):
+    with legacy_app.app_context():
+        create_all_at(step).create_all(db.engine)
+        with db.engine.begin() as conn:
+            conn.execute(sa.text(
+                "INSERT INTO transcription (id, filename, file_path, status, transcript, mind_map) "
+                "VALUES ('file-1', 'meeting.mp3', '/uploads/meeting.mp3', 'completed', 'hello world', "
+                "'{\"Root Topic\": \"Planning\"}')"
+            ))
+
+        upgrade(directory=MIGRATIONS_DIR)
+
+        with db.engine.connect() as conn:
+            context = MigrationContext.configure(conn, opts={'include_object': include_object})
+            assert compare_metadata(context, db.metadata) == []
+
+        entry = db.session.get(TranscriptEntry, 'file-1')
+        assert entry.transcript == 'hello world'
+        assert entry.mind_map_topic == 'Planning'
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,60 @@
+import copy
+from datetime import datetime
+
+import pytest
+
+from src.models import db, TranscriptEntry
+from src.routes import mindmap_route
+from src.routes.mindmap_route import convert_to_jsmind, convert_to_jsmind_cached
+
+MIND_MAP = {
+    "Root Topic": "Planning",
+    "Goals": {"Q1": ["Ship search", "Hire"], "Q2": ["Scale workers"]},
+    "Risks": ["Budget", "Latency"],
+    "Owners": {"Alice": {"Search": ["Index", "API"]}},
+}
+
+
+def test_same_input_gives_the_same_ids():
+    assert convert_to_jsmind(copy.deepcopy(MIND_MAP)) == convert_to_jsmind(copy.deepcopy(MIND_MAP))
+
+
+def test_ids_follow_the_path_in_the_tree():
+    nodes = {node['topic']: node for node in convert_to_jsmind(MIND_MAP)['data']}
+
+    assert nodes['Planning']['id'] == 'root'
+    assert nodes['Goals']['id'] == 'n-1'
+    assert nodes['Q2']['id'] == 'n-1-1'
+    assert (nodes['Scale workers']['id'], nodes['Scale workers']['parentid']) == ('n-1-1-0', 'n-1-1')
+    assert nodes['API']['parentid'] == nodes['Search']['id']
+
+
+def test_input_is_not_modified():
+    data = copy.deepcopy(MIND_MAP)
+
+    convert_to_jsmind(data)
+
+    assert data == MIND_MAP
+
+
+def test_deep_maps_do_not_hit_the_recursion_limit():
+    data = leaf = {}
+    for depth in range(5000):
+        leaf[f"level {depth}"] = leaf = {}
+
+    assert len(convert_to_jsmind(data)['data']) == 5001
+
+
+def test_conversion_is_memoized_by_the_stored_mind_map(app_context, monkeypatch):
+    entry = TranscriptEntry(id='file-1', filename='meeting.mp3', file_path='/uploads/meeting.mp3', status='completed')
+    entry.mind_map = MIND_MAP
+    db.session.add(entry)
+    db.session.commit()
+    created_at = datetime(2026, 1, 2, 3, 4, 5)
+
+    first = convert_to_jsmind_cached(entry, created_at)
+    monkeypatch.setattr(mindmap_route, 'convert_to_jsmind', lambda *args, **kwargs: pytest.fail("converted again"))
+    second = convert_to_jsmind_cached(entry, created_at)
+
+    assert first == second
+    assert second['meta']['created_at'] == "2026-01-02 03:04:05"
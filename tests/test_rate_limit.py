@@ -0,0 +1,141 @@
+import httpx
+import groq
+import openai
+import pytest
+
+from src import rate_limit
+from src.config import RATE_LIMITS, RATE_LIMIT_BACKOFF, RATE_LIMIT_BACKOFF_MAX
+from src.rate_limit import (
+    RateLimited,
+    acquire,
+    backoff_seconds,
+    is_rate_limit_error,
+    provider_error,
+    retry_after,
+    throttle,
+)
+
+
+class Clock:
+    """Stands in for the time module: sleeping moves the clock on."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    # one request a second, a bucket of 60
+    monkeypatch.setitem(RATE_LIMITS['llm'], 'groq', 60)
+    return clock
+
+
+def response(status, headers=None):
+    return httpx.Response(status, headers=headers, request=httpx.Request('POST', 'https://api.example.com/v1'))
+
+
+class StatusError(Exception):
+    def __init__(self, message, status_code=None, response=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = response
+
+
+def test_bucket_is_exhausted_then_refills(clock):
+    assert all(acquire('llm', 'groq') == 0 for _ in range(60))
+    assert acquire('llm', 'groq') == pytest.approx(1)
+
+    clock.now += 2.5
+    assert acquire('llm', 'groq', tokens=2) == 0
+    assert acquire('llm', 'groq') == pytest.approx(0.5)
+
+
+def test_refill_stops_at_capacity(clock):
+    acquire('llm', 'groq', tokens=60)
+    clock.now += 3600
+
+    assert acquire('llm', 'groq', tokens=60) == 0
+    assert acquire('llm', 'groq') == pytest.approx(1)
+
+
+def test_unlisted_clients_are_not_throttled(clock):
+    assert all(acquire('llm', 'local') == 0 for _ in range(1000))
+
+
+def test_throttle_sleeps_for_the_next_token(clock):
+    acquire('llm', 'groq', tokens=60)
+
+    throttle('llm', 'groq', tokens=3, max_wait=10)
+
+    assert clock.slept == [pytest.approx(3)]
+
+
+def test_throttle_gives_up_past_the_wait_limit(clock):
+    acquire('llm', 'groq', tokens=60)
+
+    with pytest.raises(RateLimited) as raised:
+        throttle('llm', 'groq', tokens=5, max_wait=4)
+
+    assert raised.value.retry_after == pytest.approx(5)
+    assert clock.slept == []
+    assert is_rate_limit_error(raised.value)
+
+
+@pytest.mark.parametrize('error', [
+    openai.RateLimitError("slow down", response=response(429), body=None),
+    groq.RateLimitError("slow down", response=response(429), body=None),
+    StatusError("quota", status_code=429),
+    StatusError("quota", response=response(429)),
+    RuntimeError("Error: Rate limit reached for model whisper-large-v3"),
+    RuntimeError("Error code: 429 - {'error': 'busy'}"),
+    RuntimeError("Too Many Requests"),
+    "Error: status 429",
+], ids=['openai', 'groq', 'status_code', 'response', 'rate limit', 'error code', 'too many', 'string'])
+def test_rate_limit_errors(error):
+    assert is_rate_limit_error(error)
+
+
+@pytest.mark.parametrize('error', [
+    openai.InternalServerError("boom", response=response(500), body=None),
+    StatusError("rate limit exceeded", status_code=503),
+    StatusError("bad request", response=response(400)),
+    RuntimeError("Error: file meeting-429.mp3 is not audio"),
+    RuntimeError("transcript has 429 tokens"),
+], ids=['sdk 500', 'status wins over text', 'response 400', 'file name', 'token count'])
+def test_other_errors(error):
+    assert not is_rate_limit_error(error)
+
+
+def test_provider_error_keeps_429s_retryable():
+    assert isinstance(provider_error("Error: rate_limit_exceeded"), RateLimited)
+    assert type(provider_error("Error: invalid audio")) is RuntimeError
+
+
+def test_backoff_grows_with_jitter_up_to_the_ceiling(monkeypatch):
+    monkeypatch.setattr(rate_limit.random, 'uniform', lambda low, high: high)
+    assert backoff_seconds(0) == RATE_LIMIT_BACKOFF
+    assert backoff_seconds(2) == RATE_LIMIT_BACKOFF * 4
+    assert backoff_seconds(30) == RATE_LIMIT_BACKOFF_MAX
+
+    monkeypatch.setattr(rate_limit.random, 'uniform', lambda low, high: low)
+    assert backoff_seconds(2) == RATE_LIMIT_BACKOFF * 2
+
+
+def test_backoff_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limit.random, 'uniform', lambda low, high: low)
+    error = openai.RateLimitError("slow down", response=response(429, {'retry-after': '120'}), body=None)
+
+    assert retry_after(error) == 120
+    assert backoff_seconds(0, error) == 120
+    assert backoff_seconds(0, RateLimited("local", retry_after=45)) == 45
+    assert retry_after(StatusError("x", response=response(429, {'retry-after': 'soon'}))) is None
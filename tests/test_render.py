@@ -0,0 +1,28 @@
+import pytest
+
+from src.scripts.bench_render import make_minutes, normalize, legacy_render_minutes_with_tailwind
+from src.utils import render_minutes_with_tailwind
+
+
+@pytest.mark.parametrize('pages', [1, 5])
+def test_single_pass_renderer_matches_the_legacy_pipeline(pages):
+    md_text = make_minutes(pages)
+
+    assert normalize(render_minutes_with_tailwind(md_text)) == normalize(legacy_render_minutes_with_tailwind(md_text))
+
+
+@pytest.mark.parametrize('md_text', [
+    "",
+    "Just a paragraph.",
+    "## Heading only",
+    "- Item:\n- first\n- second\n- **Owner**: Bob",
+    "Inline `code` and\n\n```\nblock code\n```",
+])
+def test_edge_cases_match_the_legacy_pipeline(md_text):
+    assert normalize(render_minutes_with_tailwind(md_text)) == normalize(legacy_render_minutes_with_tailwind(md_text))
+
+
+def test_rendering_is_deterministic():
+    md_text = make_minutes(3)
+
+    assert render_minutes_with_tailwind(md_text) == render_minutes_with_tailwind(md_text)
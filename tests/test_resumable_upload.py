@@ -0,0 +1,203 @@
+import os
+
+import pytest
+
+from src import celery_worker
+from src.config import redis_client
+from src.models import db, TranscriptEntry
+from src.routes import resumable_upload_routes, upload_routes
+from src.upload_sessions import SESSIONS_KEY, session_key, sweep_expired_sessions
+
+AUDIO = b"0123456789"
+
+
+@pytest.fixture
+def upload(client):
+    """An open session for AUDIO, as (location, upload id)."""
+    response = client.post('/uploads', json={'filename': 'meeting.mp3', 'length': len(AUDIO)})
+    assert response.status_code == 201
+    return response.json['location'], response.json['id']
+
+
+def patch(client, location, offset, data):
+    return client.patch(location, data=data, headers={'Upload-Offset': str(offset)})
+
+
+def upload_path(app, upload_id):
+    return os.path.join(app.config['UPLOAD_FOLDER'], f"{upload_id}_meeting.mp3")
+
+
+def test_ranges_are_appended_at_the_committed_offset(client, upload, app):
+    location, upload_id = upload
+
+    assert patch(client, location, 0, AUDIO[:4]).status_code == 204
+    response = patch(client, location, 4, AUDIO[4:])
+
+    assert response.status_code == 204
+    assert response.headers['Upload-Offset'] == str(len(AUDIO))
+    with open(upload_path(app, upload_id), 'rb') as f:
+        assert f.read() == AUDIO
+
+
+def test_a_replayed_range_is_rejected_with_the_current_offset(client, upload, app):
+    location, upload_id = upload
+    patch(client, location, 0, AUDIO[:4])
+
+    response = patch(client, location, 0, b"XXXX")
+
+    assert response.status_code == 409
+    assert response.json['offset'] == 4
+    assert response.headers['Upload-Offset'] == '4'
+    with open(upload_path(app, upload_id), 'rb') as f:
+        assert f.read() == AUDIO[:4]
+
+
+def test_a_range_racing_another_writer_is_rejected(client, upload):
+    location, upload_id = upload
+    redis_client.set(f"{session_key(upload_id)}:lock", 1)
+
+    assert patch(client, location, 0, AUDIO).status_code == 423
+
+
+def test_the_offset_is_checked_after_the_lock_is_taken(client, upload, monkeypatch):
+    location, upload_id = upload
+    real_set = redis_client.set
+
+    def set_then_commit_a_range(name, *args, **kwargs):
+        # another PATCH commits its bytes right before this one gets the lock
+        acquired = real_set(name, *args, **kwargs)
+        redis_client.hset(session_key(upload_id), 'offset', 4)
+        return acquired
+
+    monkeypatch.setattr(redis_client, 'set', set_then_commit_a_range)
+    response = patch(client, location, 0, AUDIO)
+
+    assert response.status_code == 409
+    assert response.json['offset'] == 4
+
+
+def test_bytes_beyond_the_declared_length_are_refused(client, upload):
+    location, _ = upload
+
+    assert patch(client, location, 0, AUDIO + b"extra").status_code == 413
+
+
+@pytest.mark.parametrize('body, status', [
+    ({'filename': 'notes.txt', 'length': 10}, 400),
+    ({'filename': 'meeting.mp3', 'length': 0}, 400),
+    ({'length': 10}, 400),
+])
+def test_invalid_sessions_are_refused(client, body, status):
+    assert client.post('/uploads', json=body).status_code == status
+
+
+def test_a_session_larger_than_the_upload_limit_is_refused(client, app):
+    body = {'filename': 'meeting.mp3', 'length': app.config['MAX_CONTENT_LENGTH'] + 1}
+
+    assert client.post('/uploads', json=body).status_code == 413
+
+
+def test_finalize_requires_every_byte(client, upload):
+    location, _ = upload
+    patch(client, location, 0, AUDIO[:4])
+
+    response = client.post(f"{location}/finalize")
+
+    assert response.status_code == 409
+    assert response.json['offset'] == 4
+
+
+def test_finalized_upload_is_transcribed_and_hashed_by_the_worker(client, upload, monkeypatch, app_context):
+    monkeypatch.setattr(celery_worker, 'transcribe_chunks_checkpointed', lambda *args, **kwargs: "hello world")
+    location, upload_id = upload
+    patch(client, location, 0, AUDIO)
+
+    assert client.post(f"{location}/finalize").json['status'] == 'queued'
+    assert client.post(f"{location}/finalize").status_code == 404
+
+    entry = db.session.get(TranscriptEntry, upload_id)
+    assert entry.status == 'completed'
+    assert entry.content_hash is not None
+    assert client.delete(location).status_code == 409
+
+
+def test_a_duplicate_upload_is_answered_from_the_first_transcript(client, app, monkeypatch, app_context):
+    transcribed = []
+    monkeypatch.setattr(celery_worker, 'transcribe_chunks_checkpointed',
+                        lambda *args, **kwargs: transcribed.append(args) or "hello world")
+
+    ids = []
+    for _ in range(2):
+        created = client.post('/uploads', json={'filename': 'meeting.mp3', 'length': len(AUDIO)}).json
+        patch(client, created['location'], 0, AUDIO)
+        client.post(f"{created['location']}/finalize")
+        ids.append(created['id'])
+
+    first, second = (db.session.get(TranscriptEntry, upload_id) for upload_id in ids)
+    assert len(transcribed) == 1
+    assert second.status == 'completed'
+    assert second.transcript == "hello world"
+    assert second.file_path == first.file_path
+    assert not os.path.exists(upload_path(app, ids[1]))
+
+
+def test_abort_removes_the_partial_file(client, upload, app):
+    location, upload_id = upload
+    patch(client, location, 0, AUDIO[:4])
+
+    assert client.delete(location).status_code == 200
+    assert not os.path.exists(upload_path(app, upload_id))
+    assert client.delete(location).status_code == 404
+
+
+def test_abort_after_the_session_expired_still_removes_the_file(client, upload, app):
+    location, upload_id = upload
+    redis_client.delete(session_key(upload_id))
+
+    assert client.delete(location).status_code == 200
+    assert not os.path.exists(upload_path(app, upload_id))
+
+
+def test_sweep_removes_only_the_files_of_expired_sessions(client, app, app_context):
+    expired, live = (client.post('/uploads', json={'filename': 'meeting.mp3', 'length': 10}).json['id']
+                     for _ in range(2))
+    redis_client.delete(session_key(expired))
+    redis_client.zadd(SESSIONS_KEY, {expired: 0, live: 0})
+
+    assert sweep_expired_sessions() == 1
+    assert not os.path.exists(upload_path(app, expired))
+    assert os.path.exists(upload_path(app, live))
+    # the live session is tracked again by its real expiry
+    assert redis_client.zscore(SESSIONS_KEY, live) > 0
+
+
+def test_a_failed_finalize_can_be_retried(client, upload, monkeypatch, app_context):
+    monkeypatch.setattr(celery_worker, 'transcribe_chunks_checkpointed', lambda *args, **kwargs: "hello world")
+    location, upload_id = upload
+    patch(client, location, 0, AUDIO)
+
+    class BrokerDown:
+        def __init__(self, jobs):
+            pass
+
+        def apply_async(self):
+            raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr(upload_routes, 'group', BrokerDown)
+    assert client.post(f"{location}/finalize").status_code == 503
+    assert db.session.get(TranscriptEntry, upload_id) is None
+
+    monkeypatch.undo()
+    monkeypatch.setattr(celery_worker, 'transcribe_chunks_checkpointed', lambda *args, **kwargs: "hello world")
+    assert client.post(f"{location}/finalize").json['status'] == 'queued'
+    assert db.session.get(TranscriptEntry, upload_id).status == 'completed'
+
+
+def test_a_failed_finalize_can_be_aborted(client, upload, monkeypatch, app):
+    location, upload_id = upload
+    patch(client, location, 0, AUDIO)
+    monkeypatch.setattr(resumable_upload_routes, 'queue_audio_upload', lambda *args: 1 / 0)
+
+    assert client.post(f"{location}/finalize").status_code == 503
+    assert client.delete(location).status_code == 200
+    assert not os.path.exists(upload_path(app, upload_id))
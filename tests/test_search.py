@@ -0,0 +1,136 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from src import search as search_module
+from src.models import db, TranscriptEntry
+from src.search import copy_entry_document, fts5_query, highlight, index_entry, remove_entry, search
+
+
+def add_entry(entry_id, transcript, minutes=None, upload_time=datetime(2026, 3, 10), model='whisper-large'):
+    entry = TranscriptEntry(
+        id=entry_id, filename=f"{entry_id}.mp3", file_path=f"/uploads/{entry_id}.mp3", status='completed',
+        upload_time=upload_time, transcription_model=model, llm_model='llama',
+    )
+    entry.transcript = transcript
+    entry.minutes_raw = minutes
+    db.session.add(entry)
+    index_entry(entry)
+    db.session.commit()
+    return entry
+
+
+def indexed(entry_id):
+    return db.session.execute(text("SELECT kind FROM search_index WHERE entry_id = :id"), {'id': entry_id}).scalars().all()
+
+
+@pytest.fixture
+def entries(app_context):
+    add_entry('budget', "We approved the budget for the migration project.", minutes="## Budget approved")
+    add_entry('hiring', "Hiring two engineers next quarter.", upload_time=datetime(2026, 5, 1), model='nova-2')
+    add_entry('roadmap', "The roadmap covers search and migrations <b>soon</b>.", upload_time=datetime(2026, 6, 1))
+
+
+def test_fts5_query_requires_every_word_and_prefixes_the_last():
+    assert fts5_query("budget migra") == '"budget" "migra"*'
+    assert fts5_query('"foo') == '"foo"*'
+    assert fts5_query("AND") == '"AND"*'
+    assert fts5_query("!!! ---") is None
+
+
+def test_matches_are_ranked_and_cover_transcripts_and_minutes(entries):
+    results = search("budget")
+
+    assert {(result['id'], result['kind']) for result in results} == {('budget', 'transcript'), ('budget', 'minutes')}
+    assert results == sorted(results, key=lambda result: -result['score'])
+
+
+def test_last_word_matches_as_a_prefix(entries):
+    assert {result['id'] for result in search("migrat")} == {'budget', 'roadmap'}
+
+
+def test_snippets_are_escaped_and_highlighted(entries):
+    snippet, = (result['snippet'] for result in search("roadmap"))
+
+    assert '<mark>roadmap</mark>' in snippet
+    assert '&lt;b&gt;soon&lt;/b&gt;' in snippet
+    assert highlight(None) == ''
+
+
+def test_date_and_model_filters(entries):
+    assert {r['id'] for r in search("migrations", date_from=datetime(2026, 4, 1))} == {'roadmap'}
+    assert {r['id'] for r in search("migrations", date_to=datetime(2026, 4, 1))} == {'budget'}
+    assert [r['id'] for r in search("engineers", model='nova-2')] == ['hiring']
+    assert [r['id'] for r in search("engineers", model='llama')] == ['hiring']
+    assert search("engineers", model='whisper-large') == []
+
+
+def test_copied_document_is_searchable_for_the_duplicate(entries):
+    duplicate = TranscriptEntry(id='copy', filename='copy.mp3', file_path='/uploads/budget.mp3', status='completed')
+    db.session.add(duplicate)
+    copy_entry_document('budget', 'copy', 'transcript')
+    db.session.commit()
+
+    assert {r['id'] for r in search("approved") if r['kind'] == 'transcript'} == {'budget', 'copy'}
+
+
+def test_removed_entry_is_no_longer_found(entries):
+    remove_entry('budget')
+    db.session.commit()
+
+    assert indexed('budget') == []
+    assert all(result['id'] != 'budget' for result in search("budget"))
+
+
+def test_reindexing_replaces_the_document(entries):
+    entry = db.session.get(TranscriptEntry, 'hiring')
+    entry.transcript = "Hiring is paused."
+    index_entry(entry, 'transcript')
+    db.session.commit()
+
+    assert search("engineers") == []
+    assert [r['id'] for r in search("paused")] == ['hiring']
+
+
+def test_postgres_query_uses_websearch_syntax_and_the_filters(app_context, monkeypatch):
+    executed = []
+
+    class Result:
+        def all(self):
+            return []
+
+    monkeypatch.setattr(search_module, 'dialect', lambda: 'postgresql')
+    monkeypatch.setattr(db.session, 'execute', lambda statement, params: executed.append((str(statement), params)) or Result())
+
+    assert search('"foo AND', limit=5, date_from=datetime(2026, 1, 1), model='nova-2') == []
+
+    sql, params = executed[0]
+    assert "websearch_to_tsquery('english', :query)" in sql
+    assert "t.upload_time >= :date_from" in sql and ":date_to" not in sql
+    assert params == {'limit': 5, 'query': '"foo AND', 'date_from': datetime(2026, 1, 1), 'model': 'nova-2'}
+
+
+@pytest.mark.parametrize('query', ['"foo', 'AND', 'NEAR(', 'budget OR', '*', 'col:value', '^'])
+def test_malformed_queries_do_not_fail(client, entries, query):
+    response = client.get('/api/search', query_string={'q': query})
+
+    assert response.status_code == 200
+    assert isinstance(response.json['results'], list)
+
+
+def test_search_route(client, entries):
+    response = client.get('/api/search', query_string={'q': 'hiring', 'from': '2026-05-01', 'to': '2026-05-01'})
+
+    result, = response.json['results']
+    assert result['id'] == 'hiring'
+    assert result['view_url'].endswith('/hiring')
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search', query_string={'q': 'x', 'from': 'yesterday'}).status_code == 400
+
+
+def test_deleting_a_file_removes_its_documents(client, entries):
+    assert client.post('/delete/budget').status_code == 200
+
+    assert indexed('budget') == []
+    assert client.get('/api/search', query_string={'q': 'budget'}).json['results'] == []
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import celery_worker
+from src.config import redis_client
+from src.models import db, TranscriptEntry
+from src.status_cache import (
+    INDEX_KEY,
+    INDEX_READY_KEY,
+    doc_key,
+    ensure_index,
+    get_docs,
+    index_member,
+    index_page,
+    member_position,
+    progress_key,
+)
+
+START = datetime(2026, 3, 1, 9, 0, 0, 123456)
+
+
+@pytest.fixture
+def entries(app_context):
+    """Five entries an hour apart, the last two uploaded at the same instant; ids newest first."""
+    times = [START + timedelta(hours=n) for n in range(4)] + [START + timedelta(hours=3)]
+    for n, upload_time in enumerate(times):
+        db.session.add(TranscriptEntry(
+            id=f"file-{n}", filename=f"meeting-{n}.mp3", file_path=f"/uploads/{n}.mp3",
+            status='queued', upload_time=upload_time,
+        ))
+    db.session.commit()
+    return ['file-4', 'file-3', 'file-2', 'file-1', 'file-0']
+
+
+def list_all(client, limit):
+    ids, cursor = [], None
+    while True:
+        page = client.get('/api/files', query_string={'limit': limit, **({'cursor': cursor} if cursor else {})}).json
+        assert len(page['files']) <= limit
+        ids.extend(f['id'] for f in page['files'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return ids
+
+
+def test_member_round_trips_its_position():
+    member = index_member(START, 'file-1').encode('utf-8')
+
+    assert member_position(member) == (START, 'file-1')
+
+
+def test_pages_walk_the_index_newest_first(client, entries):
+    assert list_all(client, limit=2) == entries
+    assert list_all(client, limit=200) == entries
+
+
+def test_page_after_a_position_excludes_it(entries, app_context):
+    ensure_index()
+    first, second = index_page(2)
+
+    assert index_page(2, after=member_position(first))[0] == second
+
+
+def test_index_is_rebuilt_after_redis_loses_it(client, entries):
+    assert list_all(client, limit=3) == entries
+    redis_client.flushall()
+
+    assert list_all(client, limit=3) == entries
+    assert redis_client.exists(INDEX_READY_KEY)
+    assert redis_client.zcard(INDEX_KEY) == len(entries)
+
+
+def test_members_of_deleted_entries_are_dropped(client, entries):
+    list_all(client, limit=10)
+    # deleted behind the cache's back
+    TranscriptEntry.query.filter_by(id='file-2').delete()
+    db.session.commit()
+    redis_client.delete(doc_key('file-2'))
+
+    assert 'file-2' not in list_all(client, limit=10)
+    assert redis_client.zscore(INDEX_KEY, index_member(START + timedelta(hours=2), 'file-2')) is None
+
+
+def test_misses_are_read_through_and_cached(entries):
+    assert not redis_client.exists(doc_key('file-0'))
+
+    doc, missing = get_docs(['file-0', 'nope'])
+
+    assert doc['status'] == 'queued' and doc['progress'] == 0
+    assert missing is None
+    assert redis_client.exists(doc_key('file-0'))
+
+
+def test_cached_documents_are_served_without_the_database(entries):
+    get_docs(['file-0'])
+    TranscriptEntry.query.filter_by(id='file-0').update({'status': 'failed'})
+    db.session.commit()
+
+    assert get_docs(['file-0'])[0]['status'] == 'queued'
+
+
+def test_status_changes_refresh_the_cached_document(client, entries):
+    get_docs(['file-1'])
+
+    celery_worker.update_file_status('file-1', 'processing')
+    celery_worker.update_progress('file-1', 40)
+
+    doc = client.get('/status/file-1').json
+    assert (doc['status'], doc['progress']) == ('processing', 40)
+    assert redis_client.get(progress_key('file-1')) == b'40'
+
+
+def test_batch_status_reports_missing_ids(client, entries):
+    response = client.post('/api/status', json={'ids': ['file-0', 'nope', 'file-0']}).json
+
+    assert [f['id'] for f in response['files']] == ['file-0']
+    assert response['missing'] == ['nope']
+
+
+def test_deleting_a_file_removes_it_from_the_cache(client, entries):
+    list_all(client, limit=10)
+
+    client.post('/delete/file-3')
+
+    assert not redis_client.exists(doc_key('file-3'))
+    assert list_all(client, limit=10) == ['file-4', 'file-2', 'file-1', 'file-0']
+    assert client.get('/status/file-3').status_code == 404
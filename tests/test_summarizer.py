@@ -0,0 +1,73 @@
+import pytest
+
+from src import summarizer
+from src.config import redis_client
+
+
+def paragraph(n, sentences=5):
+    return " ".join(f"Speaker {n} makes point number {k} about the roadmap." for k in range(sentences))
+
+
+@pytest.fixture
+def counting_backend(monkeypatch):
+    """The fake backend, counting the map calls that reach the 'LLM'."""
+    calls = []
+
+    def summarize(chunk, llm_client, llm_model):
+        calls.append(chunk)
+        return summarizer.summarize_with_fake(chunk, llm_client, llm_model)
+
+    fake = summarizer.SUMMARIZATION_BACKENDS['fake']
+    monkeypatch.setitem(summarizer.SUMMARIZATION_BACKENDS, 'counting', (summarize,) + fake[1:])
+    return calls
+
+
+def test_split_keeps_every_chunk_under_the_limit_and_the_text_in_order():
+    text = "\n\n".join(paragraph(n) for n in range(40))
+
+    chunks = summarizer.split_transcript(text, max_tokens=100)
+
+    assert len(chunks) > 1
+    assert all(summarizer.count_tokens(chunk) <= 100 for chunk in chunks)
+    assert "\n\n".join(chunks) == text
+
+
+def test_split_breaks_run_on_text_by_words():
+    text = " ".join(f"word{k}" for k in range(2000))
+
+    chunks = summarizer.split_transcript(text, max_tokens=50)
+
+    assert all(summarizer.count_tokens(chunk) <= 50 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_short_transcript_is_not_condensed(counting_backend):
+    text = paragraph(0)
+
+    assert summarizer.condense_transcript(text, 'groq', 'llama', backend='counting') == text
+    assert counting_backend == []
+
+
+def test_long_transcript_is_condensed_below_the_prompt_limit(counting_backend, monkeypatch):
+    monkeypatch.setattr(summarizer, 'SUMMARY_MAX_PROMPT_TOKENS', 300)
+    monkeypatch.setattr(summarizer, 'SUMMARY_CHUNK_TOKENS', 100)
+    text = "\n\n".join(paragraph(n) for n in range(40))
+
+    condensed = summarizer.condense_transcript(text, 'groq', 'llama', backend='counting')
+
+    assert summarizer.count_tokens(condensed) <= 300
+    assert counting_backend
+
+
+def test_chunk_summary_is_cached_per_model(counting_backend):
+    chunk = paragraph(1)
+
+    first = summarizer.summarize_chunk(chunk, 'groq', 'llama', backend='counting')
+    second = summarizer.summarize_chunk(chunk, 'groq', 'llama', backend='counting')
+
+    assert first == second
+    assert len(counting_backend) == 1
+    assert redis_client.get(summarizer.chunk_cache_key(chunk, 'llama')).decode('utf-8') == first
+
+    summarizer.summarize_chunk(chunk, 'groq', 'another-model', backend='counting')
+    assert len(counting_backend) == 2
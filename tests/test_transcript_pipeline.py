@@ -0,0 +1,123 @@
+import pytest
+
+from src import celery_worker, summarizer
+from src.metrics import record_stage
+from src.models import db, TranscriptEntry
+from src.rate_limit import RateLimited
+
+FILE_ID = 'notes-1'
+TRANSCRIPT = (
+    "Alice opened the planning meeting. She asked for updates.\n\n"
+    "Bob said the search feature ships next week. Tests are green."
+)
+
+
+class Backend:
+    """The fake summarization backend, recording which generations ran; tests swap in failing ones."""
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+        self.calls = []
+        monkeypatch.setattr(summarizer, 'SUMMARIZATION_BACKEND', 'fake')
+        self.use()
+
+    def use(self, minutes=summarizer.minutes_with_fake, mind_map=summarizer.mind_map_with_fake):
+        self.monkeypatch.setitem(
+            summarizer.SUMMARIZATION_BACKENDS, 'fake',
+            (summarizer.summarize_with_fake, self.recorded('minutes', minutes), self.recorded('mind_map', mind_map)),
+        )
+
+    def recorded(self, name, generate):
+        def run(*args):
+            self.calls.append(name)
+            return generate(*args)
+        return run
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    return Backend(monkeypatch)
+
+
+def throttled_once(backend):
+    """A mind map generation the provider rate-limits the first time."""
+    def generate(*args):
+        if backend.calls.count('mind_map') == 1:
+            raise RateLimited("llm rate limit for groq", retry_after=1)
+        return summarizer.mind_map_with_fake(*args)
+    return generate
+
+
+@pytest.fixture
+def entry(app_context):
+    entry = TranscriptEntry(
+        id=FILE_ID, filename='notes.txt', file_path='/uploads/notes.txt', status='queued',
+        llm_client='groq', llm_model='llama',
+    )
+    entry.transcript = TRANSCRIPT
+    db.session.add(entry)
+    db.session.commit()
+    return entry
+
+
+def run():
+    result = celery_worker.process_transcript_file.apply(args=[FILE_ID]).get()
+    db.session.expire_all()
+    return result, db.session.get(TranscriptEntry, FILE_ID)
+
+
+def test_both_outputs_are_stored(entry, backend):
+    result, entry = run()
+
+    assert result['status'] == 'success'
+    assert entry.status == 'completed' and entry.error_message is None
+    assert "Alice opened the planning meeting" in entry.minutes_raw
+    assert entry.mind_map == {"Root Topic": "Meeting", "Summary": [
+        "Alice opened the planning meeting.", "Bob said the search feature ships next week.",
+    ]}
+    assert sorted(backend.calls) == ['mind_map', 'minutes']
+
+
+def test_failed_mind_map_still_completes_with_the_minutes(entry, backend):
+    backend.use(mind_map=lambda *args: "Error: the model returned invalid JSON")
+
+    result, entry = run()
+
+    assert result['status'] == 'success'
+    assert entry.status == 'completed' and entry.error_message is None
+    assert entry.minutes_available and not entry.mind_map_available
+
+
+def test_failed_minutes_fail_the_entry_but_keep_the_mind_map(entry, backend):
+    backend.use(minutes=lambda *args: "Error: context length exceeded")
+
+    result, entry = run()
+
+    assert result == {'status': 'error', 'file_id': FILE_ID, 'error_message': 'Error: context length exceeded'}
+    assert entry.status == 'failed'
+    assert entry.error_message.startswith('Error: context length exceeded')
+    assert entry.mind_map_available and not entry.minutes_available
+
+
+def test_retry_only_generates_the_missing_output(entry, backend):
+    backend.use(mind_map=throttled_once(backend))
+
+    result, entry = run()
+
+    assert result['status'] == 'success'
+    assert entry.status == 'completed'
+    assert entry.minutes_available and entry.mind_map_available
+    assert backend.calls.count('minutes') == 1 and backend.calls.count('mind_map') == 2
+
+
+def test_stage_timings_of_earlier_attempts_are_dropped(entry, backend):
+    # left by an attempt that died; this run never extracts (the transcript is stored)
+    record_stage(FILE_ID, 'extract_text', 100)
+
+    backend.use(mind_map=throttled_once(backend))
+
+    _, entry = run()
+
+    assert 'extract_text' not in entry.stage_timings
+    # the minutes were stored by the first attempt, the mind map by the retry
+    assert {'llm_minutes', 'render', 'llm_mind_map'} <= set(entry.stage_timings)
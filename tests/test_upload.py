@@ -0,0 +1,166 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from src import celery_worker
+from src.models import db, TranscriptEntry
+from src.routes import upload_routes
+
+AUDIO = b"ID3 first recording"
+OTHER_AUDIO = b"ID3 second recording"
+
+
+@pytest.fixture
+def transcribed(monkeypatch):
+    """Stands in for the provider: the audio files that were sent for transcription."""
+    sent = []
+    monkeypatch.setattr(celery_worker, 'transcribe_chunks_checkpointed',
+                        lambda *args, **kwargs: sent.append(args) or "hello world")
+    return sent
+
+
+def zip_of(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def tar_of(members, mode='w:gz'):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+def remove_uploaded_files(app):
+    for name in uploaded_files(app):
+        os.remove(os.path.join(app.config['UPLOAD_FOLDER'], name))
+
+
+def uploaded_files(app):
+    folder = app.config['UPLOAD_FOLDER']
+    return sorted(name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name)))
+
+
+@pytest.fixture(autouse=True)
+def empty_upload_folder(app):
+    remove_uploaded_files(app)
+    yield
+    remove_uploaded_files(app)
+
+
+def test_several_files_are_queued_in_one_request(client, app_context, transcribed):
+    response = client.post('/upload', data={'audio': [
+        (io.BytesIO(AUDIO), 'monday.mp3'), (io.BytesIO(OTHER_AUDIO), 'tuesday.wav'),
+    ]})
+
+    assert response.status_code == 200
+    assert [(r['filename'], r['status']) for r in response.json] == [('monday.mp3', 'queued'), ('tuesday.wav', 'queued')]
+    assert len(transcribed) == 2
+    assert all(db.session.get(TranscriptEntry, r['id']).status == 'completed' for r in response.json)
+
+
+def test_zip_members_are_unpacked_and_tagged_with_the_archive(client, transcribed):
+    archive = zip_of({
+        'week/monday.mp3': AUDIO,
+        'week/notes.txt': b"not audio",
+        '__MACOSX/week/._monday.mp3': b"resource fork",
+        '__MACOSX/week/monday.mp3': b"resource fork",
+        'week/.hidden.mp3': b"hidden",
+    })
+
+    response = client.post('/upload', data={'archive': (archive, 'week.zip'), 'audio': (io.BytesIO(OTHER_AUDIO), 'extra.m4a')})
+
+    assert [(r['filename'], r.get('archive')) for r in response.json] == [('extra.m4a', None), ('monday.mp3', 'week.zip')]
+    assert len(transcribed) == 2
+
+
+@pytest.mark.parametrize('mode', ['w', 'w:gz', 'w:bz2'])
+def test_tar_archives_are_streamed(client, transcribed, mode):
+    archive = tar_of({'a.mp3': AUDIO, 'b.ogg': OTHER_AUDIO, '__MACOSX/._a.mp3': b"fork"}, mode)
+
+    response = client.post('/upload', data={'archive': (archive, 'meetings.tar.gz')})
+
+    assert sorted(r['filename'] for r in response.json) == ['a.mp3', 'b.ogg']
+    assert all(r['archive'] == 'meetings.tar.gz' for r in response.json)
+
+
+def test_archive_over_the_unpacked_limit_leaves_nothing_behind(client, app, app_context, monkeypatch, transcribed):
+    monkeypatch.setattr(upload_routes, 'MAX_ARCHIVE_UNPACKED', len(AUDIO) + 5)
+    archive = zip_of({'a.mp3': AUDIO, 'b.mp3': OTHER_AUDIO})
+
+    response = client.post('/upload', data={'audio': (io.BytesIO(AUDIO), 'single.mp3'), 'archive': (archive, 'big.zip')})
+
+    assert response.status_code == 413
+    assert uploaded_files(app) == []
+    assert TranscriptEntry.query.count() == 0 and transcribed == []
+
+
+@pytest.mark.parametrize('name, data', [
+    ('broken.zip', b"PK not a zip"),
+    ('broken.tar', b"not a tar archive at all" * 40),
+    ('archive.rar', b"Rar!"),
+])
+def test_invalid_archives_are_rejected(client, app, name, data):
+    response = client.post('/upload', data={'audio': (io.BytesIO(AUDIO), 'single.mp3'), 'archive': (io.BytesIO(data), name)})
+
+    assert response.status_code == 400
+    assert uploaded_files(app) == []
+
+
+def test_saved_files_are_removed_on_any_error(client, app, monkeypatch):
+    def disk_full(file):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(upload_routes, 'save_archive', disk_full)
+
+    with pytest.raises(OSError):
+        client.post('/upload', data={
+            'audio': (io.BytesIO(AUDIO), 'single.mp3'), 'archive': (zip_of({'a.mp3': AUDIO}), 'week.zip'),
+        })
+
+    assert uploaded_files(app) == []
+
+
+def test_a_partial_file_is_removed_when_the_stream_fails(app_context, app):
+    class Disconnected(io.BytesIO):
+        def read(self, size=-1):
+            if self.tell():
+                raise ConnectionResetError("client went away")
+            return super().read(4)
+
+    with pytest.raises(ConnectionResetError):
+        upload_routes.save_stream(Disconnected(AUDIO), 'meeting.mp3', 'file-1')
+
+    assert uploaded_files(app) == []
+
+
+def test_archive_members_already_transcribed_are_answered_from_the_cache(client, app, app_context, transcribed):
+    first, = client.post('/upload', data={'audio': (io.BytesIO(AUDIO), 'monday.mp3')}).json
+
+    response = client.post('/upload', data={'archive': (zip_of({'copy.mp3': AUDIO, 'new.mp3': OTHER_AUDIO}), 'week.zip')})
+
+    duplicate, new = response.json
+    assert duplicate['status'] == 'completed' and duplicate['deduplicated_from'] == first['id']
+    assert new['status'] == 'queued'
+    assert len(transcribed) == 2
+    assert db.session.get(TranscriptEntry, duplicate['id']).transcript == "hello world"
+    assert not any(name.startswith(duplicate['id']) for name in uploaded_files(app))
+
+
+def test_audio_member_names():
+    assert upload_routes.is_audio_member('week/Monday.MP3')
+    assert not upload_routes.is_audio_member('week/._Monday.mp3')
+    assert not upload_routes.is_audio_member('__MACOSX/week/Monday.mp3')
+    assert not upload_routes.is_audio_member('week\\__MACOSX\\Monday.mp3')
+    assert not upload_routes.is_audio_member('week/notes.txt')
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from src.vad import (
+    FRAME_SAMPLES,
+    VAD_SAMPLE_RATE,
+    EnergyDetector,
+    classify_frames,
+    offset_map,
+    speech_segments,
+    to_original_time,
+)
+
+SPEECH, SILENCE = True, False
+
+
+def frames(*runs):
+    """Speech flags from (flag, frame count) runs."""
+    return np.concatenate([np.full(count, flag) for flag, count in runs])
+
+
+def test_long_silence_is_dropped_with_padding_kept():
+    flags = frames((SPEECH, 10), (SILENCE, 20), (SPEECH, 10))
+
+    segments = speech_segments(flags, 40 * FRAME_SAMPLES, min_silence_frames=10, padding_frames=2)
+
+    assert segments == [(0, 12 * FRAME_SAMPLES), (28 * FRAME_SAMPLES, 40 * FRAME_SAMPLES)]
+
+
+def test_short_silence_is_kept():
+    flags = frames((SPEECH, 10), (SILENCE, 5), (SPEECH, 10))
+
+    assert speech_segments(flags, 25 * FRAME_SAMPLES, min_silence_frames=10, padding_frames=2) == [
+        (0, 25 * FRAME_SAMPLES)
+    ]
+
+
+def test_leading_and_trailing_silence_need_no_padding_on_the_outer_side():
+    flags = frames((SILENCE, 20), (SPEECH, 10), (SILENCE, 20))
+
+    segments = speech_segments(flags, 50 * FRAME_SAMPLES, min_silence_frames=10, padding_frames=2)
+
+    assert segments == [(18 * FRAME_SAMPLES, 32 * FRAME_SAMPLES)]
+
+
+def test_only_silence_keeps_nothing():
+    assert speech_segments(frames((SILENCE, 30)), 30 * FRAME_SAMPLES, min_silence_frames=10, padding_frames=2) == []
+
+
+def test_trimmed_timestamps_map_back_to_the_original_recording():
+    # keep 0-1 s and 3-4 s of a 4 s recording
+    mapping = offset_map([(0, VAD_SAMPLE_RATE), (3 * VAD_SAMPLE_RATE, 4 * VAD_SAMPLE_RATE)])
+
+    assert mapping == [[0.0, 0.0, 1.0], [1.0, 3.0, 1.0]]
+    assert to_original_time(0.5, mapping) == 0.5
+    assert to_original_time(1.25, mapping) == 3.25
+    assert to_original_time(2.0, mapping) == 4.0
+
+
+def test_untrimmed_timestamps_are_unchanged():
+    assert to_original_time(12.5, []) == 12.5
+
+
+def test_energy_detector_separates_silence_from_a_tone():
+    rng = np.random.default_rng(0)
+    silence = rng.normal(0, 3, VAD_SAMPLE_RATE)
+    tone = 8000 * np.sin(2 * np.pi * 220 * np.arange(VAD_SAMPLE_RATE) / VAD_SAMPLE_RATE)
+    # an odd block size, so frames straddle the blocks
+    audio = np.concatenate([silence, tone]).astype(np.int16)
+    blocks = [audio[i:i + 7 * FRAME_SAMPLES] for i in range(0, len(audio), 7 * FRAME_SAMPLES)]
+
+    flags, total = classify_frames(blocks, EnergyDetector())
+
+    assert total == len(audio)
+    frames_per_second = VAD_SAMPLE_RATE // FRAME_SAMPLES
+    assert not flags[:frames_per_second - 1].any()
+    assert flags[frames_per_second + 1:].all()
+
+
+@pytest.mark.parametrize('total_samples', [0, FRAME_SAMPLES - 1])
+def test_empty_or_sub_frame_audio_is_kept_whole(total_samples):
+    flags, total = classify_frames([np.zeros(total_samples, dtype=np.int16)], EnergyDetector())
+
+    expected = [(0, total_samples)] if total_samples else []
+    assert speech_segments(flags, total, min_silence_frames=10, padding_frames=2) == expected